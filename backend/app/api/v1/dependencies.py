@@ -2,12 +2,14 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2AuthorizationCodeBearer
 from jose import JWTError, jwt
 from pydantic import BaseModel
+from backend.app.utils.jwks_cache import get_jwks_cache, jwks_url_for
 import os
 
 # Auth0 configuration (replace with your Auth0 settings)
 AUTH0_DOMAIN = os.getenv("AUTH0_DOMAIN", "dev-i263g127pvf7d11w.us.auth0.com")
 AUTH0_AUDIENCE = os.getenv("AUTH0_AUDIENCE", "https://deepcardio-api")
 ALGORITHMS = ["RS256"]
+jwks_cache = get_jwks_cache(jwks_url_for(AUTH0_DOMAIN))
 
 # OAuth2 scheme for Auth0
 oauth2_scheme = OAuth2AuthorizationCodeBearer(
@@ -24,14 +26,8 @@ class User(BaseModel):
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
-        jwks_url = f"https://{AUTH0_DOMAIN}/.well-known/jwks.json"
-        import requests
-        jwks = requests.get(jwks_url).json()
-        public_key = None
-        for key in jwks["keys"]:
-            if key["alg"] == "RS256":
-                public_key = key
-                break
+        kid = jwt.get_unverified_header(token).get("kid")
+        public_key = await jwks_cache.get_key_async(kid)
         if not public_key:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,12 +1,26 @@
 # File: app/api/v1/endpoints/appointments.py
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import func
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from datetime import date, datetime
+from datetime import date, datetime, time, timedelta
 
-from backend.app.core.deps import get_db
+from backend.app.core.deps import get_db, get_async_db, get_async_read_db
 from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.services.audit_service import record_audit_event, audit_row
+from backend.app.core.deps_access import ensure_patient_access, ensure_patient_access_async, get_accessible_patient
+from backend.app.services.appointment_calendar import (
+    APPOINTMENT_BULK_MAX,
+    APPOINTMENT_DURATION,
+    APPOINTMENT_DURATION_MINUTES,
+    as_naive,
+    expand_recurrence,
+    get_calendar_range_async,
+    get_doctor_calendar,
+    lock_doctor_calendars,
+    read_calendar_range,
+)
 from backend.app.models import Patient
 from backend.app.models.doctor import Doctor
 from backend.app.models.doctor_patient import DoctorPatient
@@ -14,6 +28,7 @@ from backend.app.models.appointment import Appointment
 from backend.app.models.audit_log import AuditLog
 from backend.app.models.appointment_schema import (
     AppointmentCreate,
+    AppointmentBulkCreate,
     AppointmentUpdate,
     AppointmentResponse,
     AppointmentToday,
@@ -21,14 +36,34 @@ from backend.app.models.appointment_schema import (
 
 appointments_router = APIRouter(prefix="/appointments", tags=["appointments"])
 
-def ensure_patient_belongs_to_doctor(db: Session, doctor: Doctor, patient_id: int):
-    link = (
-        db.query(DoctorPatient)
-        .filter_by(doctor_id=doctor.id, patient_id=patient_id)
-        .first()
-    )
-    if not link:
-        raise HTTPException(status_code=403, detail="Patient not assigned to you")
+def find_conflicts(db: Session, doctor: Doctor, patient_id: int, starts: list, exclude_id: int = None) -> dict:
+    """
+    DoctorCalendar.conflicts for proposed start times of `patient_id`'s appointments. The
+    cached calendar turns most clashes away cheaply; when it finds none the check is repeated
+    in SQL under the doctor locks, which stay held until the caller commits, so two workers
+    can't both book the same slot.
+    """
+    conflicts = get_doctor_calendar(db, doctor.id).conflicts(starts, exclude_id=exclude_id)
+    if not conflicts:
+        lock_doctor_calendars(db, [patient_id])
+        calendar = read_calendar_range(db, doctor.id, min(starts), max(starts) + APPOINTMENT_DURATION)
+        conflicts = calendar.conflicts(starts, exclude_id=exclude_id)
+    return conflicts
+
+def ensure_no_conflict(db: Session, doctor: Doctor, patient_id: int, start: datetime, exclude_id: int = None):
+    """
+    409 if an appointment starting at `start` would overlap one already on the doctor's calendar.
+    """
+    conflicts = find_conflicts(db, doctor, patient_id, [as_naive(start)], exclude_id=exclude_id)
+    if conflicts:
+        ids = ", ".join(str(appt_id) for hits in conflicts.values() for _, appt_id, _ in hits)
+        raise HTTPException(status_code=409, detail=f"Overlaps existing appointment(s): {ids}")
+
+def day_bounds(start_date: date, end_date: date):
+    """
+    Half-open [start of start_date, start of the day after end_date) so the datetime index is usable.
+    """
+    return datetime.combine(start_date, time.min), datetime.combine(end_date + timedelta(days=1), time.min)
 
 @appointments_router.post(
     "",
@@ -38,10 +73,13 @@ def ensure_patient_belongs_to_doctor(db: Session, doctor: Doctor, patient_id: in
 )
 def create_appointment(
         data: AppointmentCreate,
+        allow_overlap: bool = Query(False, description="Book even if it overlaps another appointment"),
         db: Session = Depends(get_db),
         doctor: Doctor = Depends(get_current_doctor),
 ):
-    ensure_patient_belongs_to_doctor(db, doctor, data.patient_id)
+    ensure_patient_access(db, doctor, data.patient_id)
+    if not allow_overlap:
+        ensure_no_conflict(db, doctor, data.patient_id, data.datetime)
     appt = Appointment(**data.model_dump())  # Pydantic v2 method
     db.add(appt)
     db.commit()
@@ -52,7 +90,8 @@ def create_appointment(
     patient_name = f"{patient.first_name} {patient.last_name}" if patient else "Unknown Patient"
 
     # Log the creation in audit_logs
-    audit_log = AuditLog(
+    record_audit_event(
+        db,
         patient_id=data.patient_id,
         doctor_id=doctor.id,
         action_type="CREATE",
@@ -66,50 +105,120 @@ def create_appointment(
         description=f"Created appointment for {patient_name}",
         created_at=datetime.utcnow()
     )
-    db.add(audit_log)
-    db.commit()
 
     return appt
 
+@appointments_router.post(
+    "/bulk",
+    response_model=List[AppointmentResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Schedule several or recurring appointments for one patient",
+)
+def create_appointments_bulk(
+        data: AppointmentBulkCreate,
+        allow_overlap: bool = Query(False, description="Book even if some overlap other appointments"),
+        db: Session = Depends(get_db),
+        doctor: Doctor = Depends(get_current_doctor),
+):
+    """
+    Books every time in `datetimes` plus every occurrence of `recurrence`, e.g.
+    {"start": "...", "every": 3, "unit": "months", "until": "<start + 2 years>"}.
+    Nothing is booked if any of them overlaps an existing appointment (or another one in
+    the request), unless allow_overlap is set. Appointments and their audit rows are written
+    in one transaction.
+    """
+    patient = get_accessible_patient(db, doctor, data.patient_id)
+
+    starts = [as_naive(dt) for dt in data.datetimes]
+    if len(starts) > APPOINTMENT_BULK_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {APPOINTMENT_BULK_MAX} appointments per request")
+    if data.recurrence:
+        r = data.recurrence
+        try:
+            # Bounded by the request maximum on its own; the running total is checked below
+            starts += expand_recurrence(as_naive(r.start), r.every, r.unit, r.count, r.until and as_naive(r.until))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if not starts:
+        raise HTTPException(status_code=400, detail="No appointment times given")
+    if len(starts) > APPOINTMENT_BULK_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {APPOINTMENT_BULK_MAX} appointments per request")
+
+    if not allow_overlap:
+        conflicts = find_conflicts(db, doctor, data.patient_id, starts)
+        if conflicts:
+            raise HTTPException(status_code=409, detail={
+                "message": "Some appointments overlap existing ones",
+                "conflicts": [
+                    {"datetime": start.isoformat(), "appointment_ids": [appt_id for _, appt_id, _ in hits if appt_id]}
+                    for start, hits in sorted(conflicts.items())
+                ],
+            })
+
+    appts = [Appointment(patient_id=data.patient_id, datetime=start, type=data.type) for start in sorted(starts)]
+    db.add_all(appts)
+    db.flush()
+
+    patient_name = f"{patient.first_name} {patient.last_name}"
+    now = datetime.utcnow()
+    db.execute(insert(AuditLog), [
+        audit_row(
+            doctor.id, "CREATE", "APPOINTMENT", data.patient_id,
+            description=f"Created appointment for {patient_name}",
+            action_details={
+                "appointment_id": appt.id,
+                "patient_id": appt.patient_id,
+                "datetime": str(appt.datetime),
+                "type": appt.type
+            },
+            created_at=now
+        )
+        for appt in appts
+    ])
+    # Serialized before commit: SessionLocal expires on commit, and reading each expired
+    # appointment afterwards would cost one SELECT per booking
+    booked = [AppointmentResponse.model_validate(appt) for appt in appts]
+    db.commit()
+
+    return booked
+
 @appointments_router.get(
     "",
     response_model=List[AppointmentResponse],
     summary="List all appointments for this doctor's patients",
 )
-def list_appointments(
-        db: Session = Depends(get_db),
+async def list_appointments(
+        db: AsyncSession = Depends(get_async_db),
         doctor: Doctor = Depends(get_current_doctor),
 ):
     patient_ids = (
-        db.query(DoctorPatient.patient_id)
-        .filter_by(doctor_id=doctor.id)
-        .subquery()
+        select(DoctorPatient.patient_id)
+        .where(DoctorPatient.doctor_id == doctor.id)
     )
-    appts = (
-        db.query(Appointment)
-        .filter(Appointment.patient_id.in_(patient_ids))
+    appts = await db.execute(
+        select(Appointment)
+        .where(Appointment.patient_id.in_(patient_ids))
         .order_by(Appointment.datetime)
-        .all()
     )
-    return appts
+    return appts.scalars().all()
 
 @appointments_router.get(
     "/by-patient/{patient_id}",
     response_model=List[AppointmentResponse],
     summary="List appointments for a specific patient",
 )
-def get_appointments_by_patient(
+async def get_appointments_by_patient(
         patient_id: int,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         doctor: Doctor = Depends(get_current_doctor),
 ):
-    ensure_patient_belongs_to_doctor(db, doctor, patient_id)
-    return (
-        db.query(Appointment)
-        .filter(Appointment.patient_id == patient_id)
+    await ensure_patient_access_async(db, doctor, patient_id)
+    appts = await db.execute(
+        select(Appointment)
+        .where(Appointment.patient_id == patient_id)
         .order_by(Appointment.datetime)
-        .all()
     )
+    return appts.scalars().all()
 
 @appointments_router.put(
     "/{id}",
@@ -119,13 +228,16 @@ def get_appointments_by_patient(
 def update_appointment(
         id: int,
         data: AppointmentUpdate,
+        allow_overlap: bool = Query(False, description="Move it even if it overlaps another appointment"),
         db: Session = Depends(get_db),
         doctor: Doctor = Depends(get_current_doctor),
 ):
     appt = db.query(Appointment).get(id)
     if not appt:
         raise HTTPException(status_code=404, detail="Appointment not found")
-    ensure_patient_belongs_to_doctor(db, doctor, appt.patient_id)
+    ensure_patient_access(db, doctor, appt.patient_id)
+    if not allow_overlap:
+        ensure_no_conflict(db, doctor, appt.patient_id, data.datetime, exclude_id=appt.id)
 
     # Capture old values for audit log
     old_values = {
@@ -153,7 +265,8 @@ def update_appointment(
         "datetime": str(appt.datetime),
         "type": appt.type
     }
-    audit_log = AuditLog(
+    record_audit_event(
+        db,
         patient_id=appt.patient_id,
         doctor_id=doctor.id,
         action_type="UPDATE",
@@ -165,8 +278,6 @@ def update_appointment(
         description=f"Updated appointment for {patient_name}",
         created_at=datetime.utcnow()
     )
-    db.add(audit_log)
-    db.commit()
 
     return appt
 
@@ -183,7 +294,7 @@ def delete_appointment(
     appt = db.query(Appointment).get(id)
     if not appt:
         raise HTTPException(status_code=404, detail="Appointment not found")
-    ensure_patient_belongs_to_doctor(db, doctor, appt.patient_id)
+    ensure_patient_access(db, doctor, appt.patient_id)
 
     # Capture appointment details for audit log
     appt_details = {
@@ -197,9 +308,13 @@ def delete_appointment(
     patient = db.query(Patient).filter(Patient.patient_id == appt.patient_id).first()
     patient_name = f"{patient.first_name} {patient.last_name}" if patient else "Unknown Patient"
 
+    db.delete(appt)
+    db.commit()
+
     # Log the deletion in audit_logs
-    audit_log = AuditLog(
-        patient_id=appt.patient_id,
+    record_audit_event(
+        db,
+        patient_id=appt_details["patient_id"],
         doctor_id=doctor.id,
         action_type="DELETE",
         entity_type="APPOINTMENT",
@@ -207,18 +322,14 @@ def delete_appointment(
         description=f"Deleted appointment for {patient_name}",
         created_at=datetime.utcnow()
     )
-    db.add(audit_log)
-
-    db.delete(appt)
-    db.commit()
 
 @appointments_router.get(
     "/today",
     response_model=List[AppointmentToday],
     summary="Get this doctor's appointments scheduled for today (with patient names)",
 )
-def read_todays_appointments(
-        db: Session = Depends(get_db),
+async def read_todays_appointments(
+        db: AsyncSession = Depends(get_async_db),
         doctor: Doctor = Depends(get_current_doctor),
 ):
     """
@@ -227,13 +338,13 @@ def read_todays_appointments(
     patient_first_name and patient_last_name.
     """
     # 1) Find all patient_ids that belong to this doctor:
-    subq = db.query(DoctorPatient.patient_id).filter_by(doctor_id=doctor.id).subquery()
+    subq = select(DoctorPatient.patient_id).where(DoctorPatient.doctor_id == doctor.id)
 
-    # 2) Use func.date(...) == date.today() to compare only the date portion:
-    today_date = date.today()
+    # 2) Today as a half-open datetime range, so the (patient_id, appointment_datetime) index is used:
+    day_start, day_end = day_bounds(date.today(), date.today())
 
-    rows = (
-        db.query(
+    rows = await db.execute(
+        select(
             Appointment.id,
             Appointment.patient_id,
             Appointment.datetime,
@@ -242,10 +353,10 @@ def read_todays_appointments(
             Patient.last_name.label("patient_last_name"),
         )
         .join(Patient, Patient.patient_id == Appointment.patient_id)
-        .filter(Appointment.patient_id.in_(subq))
-        .filter(func.date(Appointment.datetime) == today_date)
+        .where(Appointment.patient_id.in_(subq))
+        .where(Appointment.datetime >= day_start)
+        .where(Appointment.datetime < day_end)
         .order_by(Appointment.datetime)
-        .all()
     )
 
     # Convert each row into a dict for Pydantic
@@ -258,7 +369,7 @@ def read_todays_appointments(
             "patient_first_name": r.patient_first_name,
             "patient_last_name": r.patient_last_name,
         }
-        for r in rows
+        for r in rows.all()
     ]
     return result
 
@@ -267,10 +378,10 @@ def read_todays_appointments(
     response_model=List[AppointmentToday],
     summary="Get this doctor's appointments for a date range (with patient names)",
 )
-def read_appointments_by_range(
+async def read_appointments_by_range(
         start_date: date = Query(..., description="Start date (YYYY-MM-DD)"),
         end_date: date = Query(..., description="End date (YYYY-MM-DD)"),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_read_db),
         doctor: Doctor = Depends(get_current_doctor),
 ):
     """
@@ -279,10 +390,11 @@ def read_appointments_by_range(
     patient_first_name and patient_last_name.
     """
     # 1) Find all patient_ids that belong to this doctor:
-    subq = db.query(DoctorPatient.patient_id).filter_by(doctor_id=doctor.id).subquery()
+    subq = select(DoctorPatient.patient_id).where(DoctorPatient.doctor_id == doctor.id)
+    range_start, range_end = day_bounds(start_date, end_date)
 
-    rows = (
-        db.query(
+    rows = await db.execute(
+        select(
             Appointment.id,
             Appointment.patient_id,
             Appointment.datetime,
@@ -291,11 +403,10 @@ def read_appointments_by_range(
             Patient.last_name.label("patient_last_name"),
         )
         .join(Patient, Patient.patient_id == Appointment.patient_id)
-        .filter(Appointment.patient_id.in_(subq))
-        .filter(func.date(Appointment.datetime) >= start_date)
-        .filter(func.date(Appointment.datetime) <= end_date)
+        .where(Appointment.patient_id.in_(subq))
+        .where(Appointment.datetime >= range_start)
+        .where(Appointment.datetime < range_end)
         .order_by(Appointment.datetime)
-        .all()
     )
 
     # Convert each row into a dict for Pydantic
@@ -308,6 +419,31 @@ def read_appointments_by_range(
             "patient_first_name": r.patient_first_name,
             "patient_last_name": r.patient_last_name,
         }
-        for r in rows
+        for r in rows.all()
     ]
-    return result
\ No newline at end of file
+    return result
+
+@appointments_router.get(
+    "/free-slots",
+    response_model=List[datetime],
+    summary="Find free appointment start times on this doctor's calendar",
+)
+async def read_free_slots(
+        day: date = Query(..., description="Day to search (YYYY-MM-DD)"),
+        start_hour: int = Query(8, ge=0, le=23, description="First possible start hour"),
+        end_hour: int = Query(18, ge=1, le=24, description="Hour the working day ends"),
+        duration_minutes: int = Query(APPOINTMENT_DURATION_MINUTES, ge=5, le=480, description="Length of the slot"),
+        db: AsyncSession = Depends(get_async_read_db),
+        doctor: Doctor = Depends(get_current_doctor),
+):
+    """
+    Returns start times on `day` between start_hour and end_hour where an appointment of
+    duration_minutes fits without overlapping any appointment of the doctor's patients.
+    """
+    if end_hour <= start_hour:
+        raise HTTPException(status_code=400, detail="end_hour must be after start_hour")
+
+    day_start = datetime.combine(day, time.min)
+    start, end = day_start + timedelta(hours=start_hour), day_start + timedelta(hours=end_hour)
+    calendar = await get_calendar_range_async(db, doctor.id, start, end)
+    return calendar.free_slots(start, end, duration=timedelta(minutes=duration_minutes))
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, union_all, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from enum import Enum
-from backend.app.core.deps import get_db
+from backend.app.core.deps import get_async_read_db
 from backend.app.core.deps_doctor import get_current_doctor
 from backend.app.models.doctor import Doctor
-from backend.app.models.doctor_patient import DoctorPatient
-from backend.app.models.audit_log import AuditLog
+from backend.app.core.deps_access import get_doctor_patient_ids_async
+from backend.app.models.audit_log import AuditLog, AuditLogArchive
+from backend.app.utils.audit_codec import decode_action_details
+import base64
 import datetime
 
 audit_logs_router = APIRouter(prefix="/audit-logs", tags=["Audit Logs"])
@@ -40,38 +43,94 @@ class AuditLogResponse(BaseModel):
     class Config:
         from_attributes = True
 
+    @field_validator("action_details", mode="before")
+    @classmethod
+    def decode_details(cls, value):
+        # Stored compactly (see utils/audit_codec.py); always returned in the expanded shape
+        return decode_action_details(value) or {}
+
+def encode_cursor(created_at: datetime.datetime, log_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{log_id}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(created_at), int(log_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def audit_page_query(model, patient_ids, patient_id, action_type, entity_type, start_date, end_date, after, limit):
+    """
+    One keyset page from `model` (audit_logs or audit_logs_archive), newest first on (created_at, id).
+    """
+    query = select(model).where(model.patient_id.in_(patient_ids))
+
+    if patient_id is not None:
+        query = query.where(model.patient_id == patient_id)
+    if action_type is not None:
+        query = query.where(model.action_type == action_type)
+    if entity_type is not None:
+        query = query.where(model.entity_type == entity_type)
+    # Half-open datetime bounds so the created_at index is used
+    if start_date is not None:
+        query = query.where(model.created_at >= datetime.datetime.combine(start_date, datetime.time.min))
+    if end_date is not None:
+        query = query.where(model.created_at < datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min))
+    if after is not None:
+        after_created_at, after_id = after
+        query = query.where(or_(
+            model.created_at < after_created_at,
+            and_(model.created_at == after_created_at, model.id < after_id)
+        ))
+
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+
 @audit_logs_router.get(
     "",
     response_model=List[AuditLogResponse],
     summary="Retrieve audit logs for doctor's patients",
-    description="Get audit logs filtered by patient ID, doctor ID, action type, or entity type. Only returns logs for patients assigned to the logged-in doctor."
+    description="Get audit logs filtered by patient ID, action type, entity type or date range, newest first. "
+                "Only returns logs for patients assigned to the logged-in doctor. Results are paginated: "
+                "when more rows exist, the X-Next-Cursor response header holds the cursor for the next page."
 )
-def get_audit_logs(
+async def get_audit_logs(
+        response: Response,
         patient_id: Optional[int] = Query(None, description="Filter by patient ID"),
         action_type: Optional[ActionType] = Query(None, description="Filter by action type (CREATE, UPDATE, DELETE)"),
         entity_type: Optional[EntityType] = Query(None, description="Filter by entity type"),
-        db: Session = Depends(get_db),
+        start_date: Optional[datetime.date] = Query(None, description="Only logs created on or after this date (YYYY-MM-DD)"),
+        end_date: Optional[datetime.date] = Query(None, description="Only logs created on or before this date (YYYY-MM-DD)"),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+        limit: int = Query(100, ge=1, le=1000, description="Maximum number of logs per page"),
+        include_archived: bool = Query(False, description="Also search logs moved to the archive table"),
+        db: AsyncSession = Depends(get_async_read_db),
         doctor: Doctor = Depends(get_current_doctor)
 ):
     # Restrict to patients assigned to the logged-in doctor
-    patient_ids = db.query(DoctorPatient.patient_id).filter_by(doctor_id=doctor.id).subquery()
-
-    query = db.query(AuditLog).filter(AuditLog.patient_id.in_(patient_ids))
-
-    # Apply filters
-    if patient_id is not None:
-        query = query.filter(AuditLog.patient_id == patient_id)
-    if action_type is not None:
-        query = query.filter(AuditLog.action_type == action_type)
-    if entity_type is not None:
-        query = query.filter(AuditLog.entity_type == entity_type)
+    patient_ids = await get_doctor_patient_ids_async(db, doctor.id)
+    after = decode_cursor(cursor) if cursor else None
+    filters = (patient_ids, patient_id, action_type, entity_type, start_date, end_date, after, limit + 1)
 
-    # Order by most recent first
-    query = query.order_by(AuditLog.created_at.desc())
+    if patient_ids and (patient_id is None or patient_id in patient_ids):
+        if include_archived:
+            # Each side is an index-ordered top-N; merging them keeps the keyset order across both tables
+            hot = audit_page_query(AuditLog, *filters).subquery()
+            archived = audit_page_query(AuditLogArchive, *filters).subquery()
+            combined = union_all(select(hot), select(archived)).subquery()
+            rows = (await db.execute(
+                select(combined).order_by(combined.c.created_at.desc(), combined.c.id.desc()).limit(limit + 1)
+            )).mappings().all()
+            logs = [AuditLogResponse.model_validate(dict(row)) for row in rows]
+        else:
+            logs = (await db.execute(audit_page_query(AuditLog, *filters))).scalars().all()
+    else:
+        logs = []
 
-    logs = query.all()
-
-    if not logs:
+    if not logs and cursor is None:
         raise HTTPException(status_code=404, detail="No audit logs found")
 
-    return logs
\ No newline at end of file
+    if len(logs) > limit:
+        logs = logs[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(logs[-1].created_at, logs[-1].id)
+
+    return logs
@@ -1,12 +1,22 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 import httpx
+import json
 import jwt
-from auth0.authentication.token_verifier import TokenVerifier, AsymmetricSignatureVerifier
-from jwt import PyJWKClient
 import os
+import uuid
 from dotenv import load_dotenv
 import logging
+from backend.app.utils.jwks_cache import get_jwks_cache, jwks_url_for
+from backend.app.services.llm_client import llm_client, OPENAI_KEY
+from backend.app.services.patient_context import get_patient_context, conversation_store
+from backend.app.core.deps import get_async_db
+from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.core.deps_access import get_accessible_patient_async
+from backend.app.models.doctor import Doctor
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -16,11 +26,6 @@ load_dotenv()
 
 router = APIRouter()
 
-# OpenAI configuration
-OPENAI_KEY = os.getenv("OPENAI_KEY")
-OPENAI_ENDPOINT = "https://api.openai.com/v1/chat/completions"
-MODEL = "gpt-4o-mini"
-
 # Auth0 configuration
 AUTH0_DOMAIN = os.getenv("AUTH0_DOMAIN")
 AUTH0_AUDIENCE = os.getenv("AUTH0_AUDIENCE")
@@ -36,11 +41,17 @@ if not AUTH0_CLIENT_ID:
     logger.error("AUTH0_CLIENT_ID is not set")
     raise HTTPException(status_code=500, detail="Server configuration error: AUTH0_CLIENT_ID not set")
 
+# Shared with utils/auth and api/v1/dependencies when they point at the same tenant
+jwks_cache = get_jwks_cache(jwks_url_for(AUTH0_DOMAIN))
+
 # Pydantic model for request body
 class ChatRequest(BaseModel):
     patient_id: int
     message: str
-    patient_context: dict
+    # Optional: when omitted the server builds the context from the patient's record
+    patient_context: Optional[dict] = None
+    # Send back the conversation_id from the previous answer to continue a conversation
+    conversation_id: Optional[str] = None
 
 # Dependency to verify Auth0 token
 async def verify_token(authorization: str = Header(...)):
@@ -48,21 +59,23 @@ async def verify_token(authorization: str = Header(...)):
         raise HTTPException(status_code=401, detail="Authorization header missing")
     try:
         token = authorization.split("Bearer ")[1]
-        jwks_url = f"https://{AUTH0_DOMAIN}/.well-known/jwks.json"
         issuer = f"https://{AUTH0_DOMAIN}/"
         
-        # Use PyJWKClient to fetch JWKS and get signing key
-        jwks_client = PyJWKClient(jwks_url)
-        signing_key = jwks_client.get_signing_key_from_jwt(token).key
+        # Signing key from the shared JWKS cache (no network call unless the kid is new)
+        kid = jwt.get_unverified_header(token).get("kid")
+        jwk = await jwks_cache.get_key_async(kid)
+        if not jwk:
+            raise HTTPException(status_code=401, detail="Invalid token: signing key not found")
+        signing_key = jwt.PyJWK(jwk).key
         
-        # Decode token to inspect claims
+        # Decode and fully verify: signature, issuer, audience, exp/iat and subject
         decoded = jwt.decode(
             token,
             signing_key,
             algorithms=["RS256"],
             issuer=issuer,
             audience=AUTH0_AUDIENCE,
-            options={"verify_aud": True, "verify_iss": True}
+            options={"verify_aud": True, "verify_iss": True, "require": ["exp", "iat", "sub"]}
         )
         
         # Verify audience explicitly
@@ -81,12 +94,9 @@ async def verify_token(authorization: str = Header(...)):
         
         # Log token claims for debugging
         logger.info(f"Token claims: aud={aud}, azp={decoded.get('azp')}, iss={decoded.get('iss')}")
-
-        # Perform full verification with TokenVerifier
-        sv = AsymmetricSignatureVerifier(jwks_url)
-        tv = TokenVerifier(signature_verifier=sv, issuer=issuer, audience=AUTH0_AUDIENCE)
-        tv.verify(token)
         return token
+    except HTTPException:
+        raise
     except IndexError:
         raise HTTPException(status_code=401, detail="Invalid Authorization header format")
     except jwt.InvalidAudienceError:
@@ -96,46 +106,92 @@ async def verify_token(authorization: str = Header(...)):
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
 
+SYSTEM_PROMPT = (
+    "You are DeepCardio Copilot, an AI assistant for cardiology consultations. "
+    "Provide concise, professional responses based on the patient context and message. "
+    "Focus on cardiovascular health and avoid providing non-medical advice."
+)
+
+async def build_messages(request: ChatRequest, conversation_id: str, db: AsyncSession, doctor: Doctor) -> list:
+    patient = await get_accessible_patient_async(db, doctor, request.patient_id)
+    if request.patient_context is not None:
+        context = json.dumps(request.patient_context, sort_keys=True, separators=(",", ":"), default=str)
+    else:
+        context = await get_patient_context(db, patient)
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "system", "content": f"Patient ID: {request.patient_id}\nPatient Context:\n{context}"},
+        *conversation_store.history(doctor.id, conversation_id),
+        {"role": "user", "content": request.message},
+    ]
+
 @router.post("/chat")
-async def chat(request: ChatRequest, token: str = Depends(verify_token)):
+async def chat(
+        request: ChatRequest,
+        token: str = Depends(verify_token),
+        db: AsyncSession = Depends(get_async_db),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    if not OPENAI_KEY:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+
+    conversation_id = request.conversation_id or uuid.uuid4().hex
+    messages = await build_messages(request, conversation_id, db, doctor)
+    try:
+        answer = await llm_client.complete(messages)
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=500, detail=f"OpenAI error: {e.response.text}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    conversation_store.append(doctor.id, conversation_id, request.message, answer)
+    return {"response": answer, "conversation_id": conversation_id}
+
+def sse_event(data: dict, event: str = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@router.post("/chat/stream")
+async def chat_stream(
+        request: ChatRequest,
+        token: str = Depends(verify_token),
+        db: AsyncSession = Depends(get_async_db),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    """
+    Same as /chat, but relays the answer as Server-Sent Events while it is generated:
+    `data: {"delta": "..."}` per chunk, then `data: [DONE]`. An upstream failure is sent as
+    an `error` event, since the 200 status has already gone out. The conversation id is
+    returned in the X-Conversation-Id header.
+    """
     if not OPENAI_KEY:
         raise HTTPException(status_code=500, detail="OpenAI API key not configured")
 
-    async with httpx.AsyncClient() as client:
+    conversation_id = request.conversation_id or uuid.uuid4().hex
+    # Built before streaming starts, while the request's session is still open
+    messages = await build_messages(request, conversation_id, db, doctor)
+    doctor_id = doctor.id
+
+    async def events():
+        answer = []
         try:
-            response = await client.post(
-                OPENAI_ENDPOINT,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {OPENAI_KEY}",
-                },
-                json={
-                    "model": MODEL,
-                    "temperature": 0,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": (
-                                "You are DeepCardio Copilot, an AI assistant for cardiology consultations. "
-                                "Provide concise, professional responses based on the patient context and message. "
-                                "Focus on cardiovascular health and avoid providing non-medical advice."
-                            ),
-                        },
-                        {
-                            "role": "user",
-                            "content": (
-                                f"Patient ID: {request.patient_id}\n"
-                                f"Patient Context: {request.patient_context}\n"
-                                f"Message: {request.message}"
-                            ),
-                        },
-                    ],
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            return {"response": data["choices"][0]["message"]["content"]}
+            async for delta in llm_client.stream(messages):
+                answer.append(delta)
+                yield sse_event({"delta": delta})
         except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=500, detail=f"OpenAI error: {e.response.text}")
+            yield sse_event({"detail": f"OpenAI error: {e.response.text}"}, event="error")
+            return
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
\ No newline at end of file
+            logger.error(f"Chat stream failed: {e}")
+            yield sse_event({"detail": f"Internal server error: {str(e)}"}, event="error")
+            return
+        conversation_store.append(doctor_id, conversation_id, request.message, "".join(answer))
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Conversation-Id": conversation_id},
+    )
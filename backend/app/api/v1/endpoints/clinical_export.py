@@ -0,0 +1,56 @@
+import asyncio
+import os
+from enum import Enum
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.models.doctor import Doctor
+from backend.app.services.clinical_export import (
+    DEFAULT_EXPORT_FORMAT,
+    EXPORT_DATASETS,
+    EXPORT_MAX_CONCURRENT,
+    export_clinical_zip,
+    format_available,
+)
+
+clinical_export_router = APIRouter()
+
+class ExportFormat(str, Enum):
+    PARQUET = "parquet"
+    ARROW = "arrow"
+    CSV = "csv"
+
+ExportDataset = Enum("ExportDataset", {name.upper(): name for name in EXPORT_DATASETS}, type=str)
+
+# Each export holds a connection and a worker thread for its whole run
+_export_slots = asyncio.Semaphore(EXPORT_MAX_CONCURRENT)
+
+@clinical_export_router.get(
+    "/exports/clinical-data",
+    summary="Bulk export of the doctor's clinical data",
+    description="One file per dataset in a ZIP: Parquet or Arrow when pyarrow is installed, gzip CSV otherwise. "
+                "Read from a replica with server-side cursors and written in chunks."
+)
+async def export_clinical_data(
+        format: Optional[ExportFormat] = Query(None, description=f"Defaults to {DEFAULT_EXPORT_FORMAT}"),
+        datasets: Optional[List[ExportDataset]] = Query(None, description="Defaults to every dataset"),
+        anonymous: bool = Query(False, description="Leave out names, contact and social details, and any typed-in text"),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    export_format = format.value if format is not None else DEFAULT_EXPORT_FORMAT
+    if not format_available(export_format):
+        raise HTTPException(status_code=400, detail=f"The {export_format} format is not available on this server; use format=csv")
+    if _export_slots.locked():
+        raise HTTPException(status_code=429, detail="Too many exports running, try again later")
+
+    selected = tuple(dict.fromkeys(d.value for d in datasets)) if datasets else EXPORT_DATASETS
+    async with _export_slots:
+        zip_path = await asyncio.to_thread(export_clinical_zip, doctor.id, export_format, selected, anonymous)
+    return FileResponse(
+        zip_path,
+        media_type="application/zip",
+        filename=f"clinical_data_{export_format}.zip",
+        background=BackgroundTask(os.remove, zip_path),
+    )
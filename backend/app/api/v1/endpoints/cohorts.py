@@ -0,0 +1,45 @@
+# File: backend/app/api/v1/endpoints/cohorts.py
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.core.deps import get_async_read_db
+from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.models.doctor import Doctor
+from backend.app.models.cohort_schema import CohortDimension, CohortBucket, CohortBreakdown, CohortSummary
+from backend.app.services.cohort_rollups import doctor_cohorts_query
+
+cohorts_router = APIRouter(prefix="/cohorts")
+
+def _breakdowns(rows, dimensions) -> list:
+    buckets = {dimension.value: [] for dimension in dimensions}
+    for row in rows:
+        if row.dimension in buckets:
+            buckets[row.dimension].append(CohortBucket(bucket=row.bucket, patient_count=row.patient_count))
+    return [CohortBreakdown(dimension=dimension, buckets=buckets[dimension.value]) for dimension in dimensions]
+
+@cohorts_router.get(
+    "",
+    response_model=CohortSummary,
+    summary="Patient counts by age group, risk level, symptom and abnormal vital",
+    description="Read from per-doctor counters kept current in the background; no patient is loaded."
+)
+async def read_cohort_summary(
+        db: AsyncSession = Depends(get_async_read_db),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    rows = (await db.execute(doctor_cohorts_query(doctor.id))).all()
+    # Every patient has exactly one age group
+    total = sum(row.patient_count for row in rows if row.dimension == CohortDimension.AGE_GROUP.value)
+    return CohortSummary(
+        total_patients=total,
+        updated_at=max((row.updated_at for row in rows), default=None),
+        dimensions=_breakdowns(rows, list(CohortDimension)),
+    )
+
+@cohorts_router.get("/{dimension}", response_model=CohortBreakdown, summary="Patient counts for one cohort dimension")
+async def read_cohort_dimension(
+        dimension: CohortDimension,
+        db: AsyncSession = Depends(get_async_read_db),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    rows = (await db.execute(doctor_cohorts_query(doctor.id, dimension.value))).all()
+    return _breakdowns(rows, [dimension])[0]
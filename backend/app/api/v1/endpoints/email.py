@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
 from pydantic import BaseModel, EmailStr
-import resend
 from ..dependencies import get_current_user, User
 from ..db import get_db
 from sqlalchemy.orm import Session
+from typing import Optional
+from backend.app.models.email_job import EmailJob
+from backend.app.models.doctor import Doctor
+from backend.app.core.deps_access import ensure_patient_access
+from backend.app.services.email_outbox import enqueue_email
+from backend.app.services.patient_report import cached_report, render_report
+from backend.app.api.v1.endpoints.patient import map_patient
 import logging
-import os
 import traceback
 
 # Configure logging
@@ -20,27 +25,33 @@ class EmailRequest(BaseModel):
     body: str
     patient_id: int
 
-@router.post("/send-email")
-async def send_email(
+@router.post("/send-email", status_code=status.HTTP_202_ACCEPTED)
+def send_email(
         to_email: EmailStr = Form(...),
         body: str = Form(...),
         patient_id: int = Form(...),
-        pdf_file: UploadFile = File(...),
+        pdf_file: Optional[UploadFile] = File(None),
         current_user: User = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
+    """
+    Queues the email in the outbox and returns right away; a background sender delivers it
+    and retries on failure. Poll GET /send-email/{job_id} for the delivery status.
+    Without pdf_file the patient summary report is rendered on the server (and cached).
+    """
     logger.info(f"Processing email request for patient_id: {patient_id} to {to_email}")
     try:
-        # Validate PDF file
-        if pdf_file.content_type != "application/pdf":
-            logger.error(f"Invalid file type: {pdf_file.content_type}")
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be a PDF")
+        if pdf_file is not None:
+            # Validate PDF file
+            if pdf_file.content_type != "application/pdf":
+                logger.error(f"Invalid file type: {pdf_file.content_type}")
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File must be a PDF")
 
-        # Read PDF content
-        pdf_bytes = await pdf_file.read()
-        if not pdf_bytes:
-            logger.error("Empty PDF file uploaded")
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="PDF file is empty")
+            # Read PDF content (sync endpoint, so this runs in the threadpool, not on the event loop)
+            pdf_bytes = pdf_file.file.read()
+            if not pdf_bytes:
+                logger.error("Empty PDF file uploaded")
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="PDF file is empty")
 
         # Fetch patient data for naming
         logger.info("Fetching patient data")
@@ -50,21 +61,15 @@ async def send_email(
             logger.error(f"Patient not found for patient_id: {patient_id}")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
 
-        # Configure Resend
-        logger.info("Configuring Resend API")
-        resend_api_key = os.getenv("RESEND_API_KEY")
-        if not resend_api_key:
-            logger.error("Resend API key not configured")
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Resend API key not configured")
-        resend.api_key = resend_api_key
+        if pdf_file is None:
+            pdf_bytes = server_rendered_report(db, patient, current_user)
 
-        # Prepare email parameters
         filename = f"{patient.first_name or 'patient'}_{patient.last_name or 'none'}_report.pdf"
-        params = {
-            "from": "DeepCardio <onboarding@resend.dev>",
-            "to": [to_email],
-            "subject": f"Patient Summary for {patient.first_name or 'Patient'} {patient.last_name or ''}",
-            "html": f"""
+        job_id = enqueue_email(
+            db,
+            to_email=to_email,
+            subject=f"Patient Summary for {patient.first_name or 'Patient'} {patient.last_name or ''}",
+            html=f"""
             <div style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
                 <h2 style="color: #4B40EE;">Patient Summary</h2>
                 <p>{body}</p>
@@ -72,21 +77,49 @@ async def send_email(
                 <p style="margin-top: 20px;">Best regards,<br><strong>DeepCardio Team</strong></p>
             </div>
             """,
-            "attachments": [
-                {
-                    "filename": filename,
-                    "content": list(pdf_bytes),  # Convert bytes to list for Resend
-                    "content_type": "application/pdf"
-                }
-            ]
-        }
-
-        # Send email
-        logger.info(f"Sending email to {to_email}")
-        response = resend.Emails.send(params)
-        logger.info(f"Email sent successfully to {to_email}, email_id: {response['id']}")
-        return {"message": "Email sent successfully", "email_id": response["id"]}
+            attachment=pdf_bytes,
+            attachment_filename=filename,
+            attachment_content_type="application/pdf",
+            patient_id=patient_id,
+            requested_by=current_user.sub,
+        )
+        logger.info(f"Email to {to_email} queued as job {job_id}")
+        return {"message": "Email queued", "job_id": job_id}
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error sending email to {to_email}: {str(e)}\n{traceback.format_exc()}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to send email: {str(e)}")
\ No newline at end of file
+        logger.error(f"Error queueing email to {to_email}: {str(e)}\n{traceback.format_exc()}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to send email: {str(e)}")
+
+def server_rendered_report(db: Session, patient, current_user: User) -> bytes:
+    doctor = db.query(Doctor).filter(Doctor.username == current_user.sub).first()
+    if not doctor:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Doctor profile not found")
+    ensure_patient_access(db, doctor, patient.patient_id)
+    path = cached_report(patient.patient_id, patient.revision, doctor.id, anonymous=False)
+    if not path:
+        path = render_report(map_patient(patient, db).model_dump(mode="json"), patient.revision, doctor)
+    with open(path, "rb") as f:
+        return f.read()
+
+@router.get("/send-email/{job_id}")
+def get_email_status(
+        job_id: int,
+        current_user: User = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    job = db.query(
+        EmailJob.id, EmailJob.status, EmailJob.attempts, EmailJob.last_error,
+        EmailJob.created_at, EmailJob.sent_at, EmailJob.requested_by
+    ).filter(EmailJob.id == job_id).first()
+    if not job or job.requested_by != current_user.sub:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Email job not found")
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+        "created_at": job.created_at,
+        "sent_at": job.sent_at,
+    }
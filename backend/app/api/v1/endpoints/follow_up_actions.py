@@ -2,11 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from backend.app.models.patient_follow_up_action import PatientFollowUpAction
 from backend.app.models.follow_up_actions_catalog import FollowUpActionCatalog
-from backend.app.models.patient import Patient
-from backend.app.models.doctor_patient import DoctorPatient
 from backend.app.models.doctor import Doctor
 from backend.app.core.deps import get_db
 from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.core.deps_access import ensure_patient_access
 from pydantic import BaseModel
 
 follow_up_actions_router = APIRouter(prefix="/follow-up-actions", tags=["Follow-up Actions"])
@@ -43,17 +42,7 @@ def update_follow_up_action(
                 raise HTTPException(status_code=404, detail="Catalog item not found")
             
             # Verify the patient belongs to this doctor
-            patient = db.query(Patient).filter(Patient.patient_id == data.patient_id).first()
-            if not patient:
-                raise HTTPException(status_code=404, detail="Patient not found")
-            
-            # Check if doctor has access to this patient
-            doctor_patient_relation = db.query(DoctorPatient).filter(
-                DoctorPatient.doctor_id == doctor.id,
-                DoctorPatient.patient_id == data.patient_id
-            ).first()
-            if not doctor_patient_relation:
-                raise HTTPException(status_code=403, detail="Access denied to this patient")
+            ensure_patient_access(db, doctor, data.patient_id, detail="Access denied to this patient")
             
             # Find the existing auto-generated item in patient_follow_up_actions
             existing_auto_generated = db.query(PatientFollowUpAction).filter(
@@ -1,7 +1,8 @@
 from fastapi import APIRouter
+from typing import List
 
-from backend.app.models.health import HealthResponse
-from backend.app.services.health_service import get_status
+from backend.app.models.health import HealthResponse, DbPoolResponse, DbReplicaResponse
+from backend.app.services.health_service import get_status, get_db_pool_status, get_db_replica_status
 
 router = APIRouter()
 
@@ -9,3 +10,13 @@ router = APIRouter()
 @router.get("/health", response_model=HealthResponse)
 def health_check():
     return get_status()
+
+
+@router.get("/health/db-pool", response_model=DbPoolResponse)
+def db_pool_status():
+    return get_db_pool_status()
+
+
+@router.get("/health/db-replicas", response_model=List[DbReplicaResponse])
+async def db_replica_status():
+    return await get_db_replica_status()
@@ -2,9 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from backend.app.core.deps import get_db
 from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.core.deps_access import doctor_can_access
 from backend.app.models.patient_ignored_auto_generated import PatientIgnoredAutoGeneratedItem
 from backend.app.models.patient_ignored_auto_generated_schema import PatientIgnoredAutoGeneratedItemCreate, PatientIgnoredAutoGeneratedItemResponse
-from backend.app.models.doctor_patient import DoctorPatient
 from typing import List
 
 ignored_router = APIRouter()
@@ -22,12 +22,7 @@ def mark_item_as_ignored(
     print(f"[DEBUG] mark_item_as_ignored: Received request - patient_id={data.patient_id}, doctor_id={doctor.id}, entity_type={data.entity_type}, catalog_item_key='{data.catalog_item_key}'")
     
     # Verify the doctor has access to this patient
-    link = db.query(DoctorPatient).filter_by(
-        doctor_id=doctor.id, 
-        patient_id=data.patient_id
-    ).first()
-    
-    if not link:
+    if not doctor_can_access(db, doctor.id, data.patient_id):
         print(f"[DEBUG] mark_item_as_ignored: Access denied - doctor {doctor.id} not assigned to patient {data.patient_id}")
         raise HTTPException(status_code=403, detail="This patient is not assigned to you")
     
@@ -70,12 +65,7 @@ def get_ignored_items(
     print(f"[DEBUG] get_ignored_items: Request for patient_id={patient_id}, doctor_id={doctor.id}")
     
     # Verify the doctor has access to this patient
-    link = db.query(DoctorPatient).filter_by(
-        doctor_id=doctor.id, 
-        patient_id=patient_id
-    ).first()
-    
-    if not link:
+    if not doctor_can_access(db, doctor.id, patient_id):
         print(f"[DEBUG] get_ignored_items: Access denied - doctor {doctor.id} not assigned to patient {patient_id}")
         raise HTTPException(status_code=403, detail="This patient is not assigned to you")
     
@@ -1,13 +1,16 @@
 # File: backend/app/api/v1/endpoints/patient.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.app.models.doctor_patient import DoctorPatient
 from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.services.audit_service import record_audit_event
+from backend.app.services.patient_search import get_patient_search_index, index_new_patient, reindex_patient, unindex_patient
+from backend.app.core.deps_access import get_accessible_patient, get_accessible_patient_async, invalidate_patient_access
 from typing import List, Optional
 from backend.app.models import Patient
 from backend.app.models.doctor import Doctor
-from backend.app.models.audit_log import AuditLog
 from backend.app.models.patient_schema import (
     PatientResponse,
     PatientBasic,
@@ -29,7 +32,6 @@ from backend.app.models.patient_schema import (
 )
 from backend.app.services.patient_service import (
     get_all_patients,
-    get_patient_by_id,
     get_patient_symptoms,
     get_patient_personal_history,
     get_patient_vital_signs,
@@ -39,7 +41,10 @@ from backend.app.services.patient_service import (
     get_risks_from_tests,
     get_risks_from_vital_signs,
 )
-from backend.app.core.deps import get_db
+from backend.app.core.deps import get_db, get_async_db, get_async_read_db
+from backend.app.core.config import DB_POOL_SIZE
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from backend.app.services import patient_service_async
 from typing import List
 from datetime import date, datetime
 from backend.app.models.patient_follow_up_action import PatientFollowUpAction
@@ -51,42 +56,38 @@ from backend.app.models.patient_tests_to_order import PatientTestsToOrder
 
 patient_router = APIRouter()
 
+# Upper bound on patients mapped at once by read_my_patients (each holds an async connection)
+PATIENT_MAPPING_CONCURRENCY = DB_POOL_SIZE
+
 @patient_router.get(
     "/patients/search",
     response_model=List[PatientBasic],
     summary="Search patients by name and/or date of birth",
+    description="`first_name` / `last_name` match the start of that name; each word of `q` must match the start "
+                "of a first or last name word. Matching ignores case and accents; `phonetic` also accepts names "
+                "that sound alike. Best matches come first."
 )
 def search_patients(
         first_name: Optional[str] = Query(None),
         last_name: Optional[str] = Query(None),
         dob: Optional[date] = Query(None),
+        q: Optional[str] = Query(None, description="Free-text name search, e.g. typeahead input"),
+        phonetic: bool = Query(False, description="Also match names that sound alike (Soundex)"),
+        limit: int = Query(20, ge=1, le=200, description="Maximum number of results"),
         db: Session = Depends(get_db),
         doctor: Doctor = Depends(get_current_doctor),
 ):
-    patient_ids = (
-        select(DoctorPatient.patient_id)
-        .where(DoctorPatient.doctor_id == doctor.id)
-    )
-
-    query = db.query(Patient).filter(Patient.patient_id.in_(patient_ids))
-
-    if first_name:
-        query = query.filter(Patient.first_name.ilike(f"{first_name}%"))
-    if last_name:
-        query = query.filter(Patient.last_name.ilike(f"{last_name}%"))
-    if dob:
-        query = query.filter(Patient.dob == dob)
-
-    patients = query.all()
+    index = get_patient_search_index(db, doctor.id)
+    matches = index.search(q=q, first_name=first_name, last_name=last_name, dob=dob, phonetic=phonetic, limit=limit)
     return [
         PatientBasic(
-            id=p.patient_id,
-            first_name=p.first_name,
-            last_name=p.last_name,
-            gender=p.gender,
-            dob=p.dob
+            id=patient_id,
+            first_name=p_first_name,
+            last_name=p_last_name,
+            gender=gender,
+            dob=p_dob
         )
-        for p in patients
+        for patient_id, p_first_name, p_last_name, gender, p_dob in matches
     ]
 
 def calculate_age(dob: date) -> int:
@@ -94,72 +95,22 @@ def calculate_age(dob: date) -> int:
     age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
     return age
 
-def map_patient(patient, db: Session, basic: bool = False, doctor_id: int = None) -> PatientResponse:
-    if basic:
-        return PatientResponse(
-            id=patient.patient_id,
-            demographics=Demographics(
-                first_name=patient.first_name,
-                last_name=patient.last_name,
-                gender=patient.gender,
-                date_of_birth=patient.dob,
-                age=calculate_age(patient.dob),
-                ethnicity=patient.ethnicity,
-                weight=patient.weight,
-                height=patient.height,
-                smoke=patient.smoke,
-                alco=patient.alco,
-                active=patient.active
-            ),
-            contact_info=ContactInfo(
-                phone=patient.phone,
-                email=patient.email
-            ),
-            social_info=SocialInfo(
-                marital_status=patient.marital_status,
-                occupation=patient.occupation,
-                insurance_provider=patient.insurance_provider,
-                address=patient.address
-            ),
-            symptoms=[],
-            personal_history=[],
-            vital_signs=[],
-            tests=[],
-            follow_up_actions=[],
-            recommendations=[],
-            referrals=[],
-            risks=[],
-            life_style_advice=[],
-            presumptive_diagnoses=[],
-            tests_to_order=[]
-        )
-
-    symptoms = get_patient_symptoms(db, patient.patient_id)
-    personal_history = get_patient_personal_history(db, patient.patient_id)
-    vital_signs_raw = get_patient_vital_signs(db, patient.patient_id)
-    patient_tests = get_patient_tests(db, patient.patient_id)
-
-    # Get ALL patient-specific data (both user-created and auto-generated)
-    # All items are now stored in patient-specific tables with auto_generated flag
-    all_follow_up_actions = db.query(PatientFollowUpAction).filter(PatientFollowUpAction.patient_id == patient.patient_id).all()
-    all_recommendations = db.query(PatientRecommendations).filter(PatientRecommendations.patient_id == patient.patient_id).all()
-    all_referrals = db.query(PatientReferrals).filter(PatientReferrals.patient_id == patient.patient_id).all()
-    all_lifestyle_advices = db.query(PatientLifestyleAdvices).filter(PatientLifestyleAdvices.patient_id == patient.patient_id).all()
-    all_presumptive_diagnoses = db.query(PatientPresumptiveDiagnoses).filter(PatientPresumptiveDiagnoses.patient_id == patient.patient_id).all()
-    all_tests_to_order = db.query(PatientTestsToOrder).filter(PatientTestsToOrder.patient_id == patient.patient_id).all()
-
-    # Get risks from decision rules (these are still fetched from catalog as they don't have patient-specific tables)
-    risks_from_symptoms = get_risks_from_symptoms(db, patient.patient_id)
-    risks_from_history = get_risks_from_personal_history(db, patient.patient_id)
-    risks_from_tests = get_risks_from_tests(db, patient.patient_id)
-    risks_from_vitals = get_risks_from_vital_signs(db, patient.patient_id)
-
-    all_risks = {
-        r.id: r for r in risks_from_symptoms
-                         + risks_from_history
-                         + risks_from_tests
-                         + risks_from_vitals
-    }.values()
+def build_patient_response(
+        patient,
+        symptoms=(),
+        personal_history=(),
+        vital_signs=(),
+        tests=(),
+        follow_up_actions=(),
+        recommendations=(),
+        referrals=(),
+        risks=(),
+        life_style_advice=(),
+        presumptive_diagnoses=(),
+        tests_to_order=(),
+) -> PatientResponse:
+    # Risks can come from several rule sources; keep one per catalog id
+    unique_risks = {r.id: r for r in risks}.values()
 
     return PatientResponse(
         id=patient.patient_id,
@@ -202,7 +153,7 @@ def map_patient(patient, db: Session, basic: bool = False, doctor_id: int = None
                 value=v.value,
                 unit=v.unit
             )
-            for v in vital_signs_raw
+            for v in vital_signs
         ],
         tests=[
             PatientTest(
@@ -214,7 +165,7 @@ def map_patient(patient, db: Session, basic: bool = False, doctor_id: int = None
                 date=t.test_date,
                 notes=t.notes
             )
-            for t in patient_tests
+            for t in tests
         ],
         follow_up_actions=[
             FollowUpAction(
@@ -223,7 +174,7 @@ def map_patient(patient, db: Session, basic: bool = False, doctor_id: int = None
                 action=f.action,
                 auto_generated=f.auto_generated
             )
-            for f in all_follow_up_actions
+            for f in follow_up_actions
         ],
         recommendations=[
             Recommendation(
@@ -231,7 +182,7 @@ def map_patient(patient, db: Session, basic: bool = False, doctor_id: int = None
                 recommendation=r.recommendation,
                 auto_generated=r.auto_generated
             )
-            for r in all_recommendations
+            for r in recommendations
         ],
         referrals=[
             Referral(
@@ -240,11 +191,11 @@ def map_patient(patient, db: Session, basic: bool = False, doctor_id: int = None
                 reason=r.referral_reason,
                 auto_generated=r.auto_generated
             )
-            for r in all_referrals
+            for r in referrals
         ],
         risks=[
             Risk(id=r.id, value=r.value, reason=r.reason)
-            for r in all_risks
+            for r in unique_risks
         ],
         life_style_advice=[
             LifeStyleAdvice(
@@ -252,7 +203,7 @@ def map_patient(patient, db: Session, basic: bool = False, doctor_id: int = None
                 advice=a.life_style_advice,
                 auto_generated=a.auto_generated
             )
-            for a in all_lifestyle_advices
+            for a in life_style_advice
         ],
         presumptive_diagnoses=[
             PresumptiveDiagnosis(
@@ -261,7 +212,7 @@ def map_patient(patient, db: Session, basic: bool = False, doctor_id: int = None
                 confidence_level=p.confidence_level,
                 auto_generated=p.auto_generated
             )
-            for p in all_presumptive_diagnoses
+            for p in presumptive_diagnoses
         ],
         tests_to_order=[
             TestToOrder(
@@ -269,25 +220,77 @@ def map_patient(patient, db: Session, basic: bool = False, doctor_id: int = None
                 test_to_order=t.test_to_order,
                 auto_generated=t.auto_generated
             )
-            for t in all_tests_to_order
+            for t in tests_to_order
         ]
     )
 
+def map_patient(patient, db: Session, basic: bool = False, doctor_id: int = None) -> PatientResponse:
+    if basic:
+        return build_patient_response(patient)
+
+    # Get ALL patient-specific data (both user-created and auto-generated)
+    # All items are now stored in patient-specific tables with auto_generated flag
+    # Risks are still fetched from decision rules as they don't have patient-specific tables
+    return build_patient_response(
+        patient,
+        symptoms=get_patient_symptoms(db, patient.patient_id),
+        personal_history=get_patient_personal_history(db, patient.patient_id),
+        vital_signs=get_patient_vital_signs(db, patient.patient_id),
+        tests=get_patient_tests(db, patient.patient_id),
+        follow_up_actions=db.query(PatientFollowUpAction).filter(PatientFollowUpAction.patient_id == patient.patient_id).all(),
+        recommendations=db.query(PatientRecommendations).filter(PatientRecommendations.patient_id == patient.patient_id).all(),
+        referrals=db.query(PatientReferrals).filter(PatientReferrals.patient_id == patient.patient_id).all(),
+        risks=get_risks_from_symptoms(db, patient.patient_id)
+              + get_risks_from_personal_history(db, patient.patient_id)
+              + get_risks_from_tests(db, patient.patient_id)
+              + get_risks_from_vital_signs(db, patient.patient_id),
+        life_style_advice=db.query(PatientLifestyleAdvices).filter(PatientLifestyleAdvices.patient_id == patient.patient_id).all(),
+        presumptive_diagnoses=db.query(PatientPresumptiveDiagnoses).filter(PatientPresumptiveDiagnoses.patient_id == patient.patient_id).all(),
+        tests_to_order=db.query(PatientTestsToOrder).filter(PatientTestsToOrder.patient_id == patient.patient_id).all(),
+    )
+
+async def map_patient_async(patient, db: AsyncSession, basic: bool = False) -> PatientResponse:
+    if basic:
+        return build_patient_response(patient)
+
+    summary_items = await patient_service_async.get_patient_summary_items(db, patient.patient_id)
+    return build_patient_response(
+        patient,
+        symptoms=await patient_service_async.get_patient_symptoms(db, patient.patient_id),
+        personal_history=await patient_service_async.get_patient_personal_history(db, patient.patient_id),
+        vital_signs=await patient_service_async.get_patient_vital_signs(db, patient.patient_id),
+        tests=await patient_service_async.get_patient_tests(db, patient.patient_id),
+        risks=await patient_service_async.get_patient_risks(db, patient.patient_id),
+        **summary_items
+    )
+
+async def _map_patient_in_own_session(patient, session_factory, semaphore: asyncio.Semaphore) -> PatientResponse:
+    # An AsyncSession can't run queries concurrently, so each patient gets its own
+    async with semaphore:
+        async with session_factory() as session:
+            return await map_patient_async(patient, session)
+
 @patient_router.get("/patients", response_model=List[PatientResponse])
-def read_my_patients(
-        db: Session = Depends(get_db),
+async def read_my_patients(
+        db: AsyncSession = Depends(get_async_read_db),
         doctor: Doctor = Depends(get_current_doctor)
 ):
-    links = db.query(DoctorPatient).filter_by(doctor_id=doctor.id).all()
-    patient_ids = [link.patient_id for link in links]
-    patients = db.query(Patient).filter(Patient.patient_id.in_(patient_ids)).all()
+    patients = await patient_service_async.get_doctor_patients(db, doctor.id)
+
+    # Per-patient sessions stay on the same engine (replica or primary) the router picked for this request
+    session_factory = async_sessionmaker(bind=db.bind, autoflush=False, expire_on_commit=False)
+    semaphore = asyncio.Semaphore(PATIENT_MAPPING_CONCURRENCY)
+    mapped = await asyncio.gather(
+        *(_map_patient_in_own_session(p, session_factory, semaphore) for p in patients),
+        return_exceptions=True
+    )
+
     result = []
-    for p in patients:
-        try:
-            mapped = map_patient(p, db, doctor_id=doctor.id)
-            result.append(mapped)
-        except Exception as e:
-            print(f"Failed to map patient {p.patient_id}: {e}")
+    for p, item in zip(patients, mapped):
+        if isinstance(item, Exception):
+            print(f"Failed to map patient {p.patient_id}: {item}")
+            continue
+        result.append(item)
     return result
 
 @patient_router.get(
@@ -295,21 +298,15 @@ def read_my_patients(
     response_model=PatientResponse,
     response_model_exclude_unset=True
 )
-def read_patient(
+async def read_patient(
         patient_id: int,
         basic: bool = Query(False, description="Return basic patient info only"),
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         doctor: Doctor = Depends(get_current_doctor)
 ):
-    link = db.query(DoctorPatient).filter_by(doctor_id=doctor.id, patient_id=patient_id).first()
-    if not link:
-        raise HTTPException(status_code=403, detail="This patient is not assigned to you")
+    patient = await get_accessible_patient_async(db, doctor, patient_id)
 
-    patient = get_patient_by_id(db, patient_id)
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-
-    response = map_patient(patient, db, basic=basic, doctor_id=doctor.id)
+    response = await map_patient_async(patient, db, basic=basic)
 
     return response
 
@@ -344,9 +341,13 @@ def create_patient(
     # Save relation in doctor_patient table
     link = DoctorPatient(doctor_id=doctor.id, patient_id=new_patient.patient_id)
     db.add(link)
+    db.commit()
+    invalidate_patient_access(doctor.id)
+    index_new_patient(doctor.id, new_patient)
 
     # Log the creation in audit_logs
-    audit_log = AuditLog(
+    record_audit_event(
+        db,
         patient_id=new_patient.patient_id,
         doctor_id=doctor.id,
         action_type="CREATE",
@@ -372,8 +373,6 @@ def create_patient(
         },
         description=f"Created patient {data.first_name} {data.last_name}"
     )
-    db.add(audit_log)
-    db.commit()
 
     return {
         "message": "Patient created successfully",
@@ -386,47 +385,46 @@ def delete_patient(
         db: Session = Depends(get_db),
         doctor: Doctor = Depends(get_current_doctor)
 ):
-    link = db.query(DoctorPatient).filter_by(doctor_id=doctor.id, patient_id=patient_id).first()
-    if not link:
-        raise HTTPException(status_code=403, detail="This patient is not assigned to you")
+    patient = get_accessible_patient(db, doctor, patient_id)
+
+    # Capture full patient details for the audit log before the row is gone
+    patient_details = {
+        "patient_id": patient.patient_id,
+        "first_name": patient.first_name,
+        "last_name": patient.last_name,
+        "gender": patient.gender,
+        "dob": str(patient.dob),
+        "ethnicity": patient.ethnicity,
+        "phone": patient.phone,
+        "email": patient.email,
+        "marital_status": patient.marital_status,
+        "occupation": patient.occupation,
+        "insurance_provider": patient.insurance_provider,
+        "address": patient.address,
+        "weight": patient.weight,
+        "height": patient.height,
+        "smoke": patient.smoke,
+        "alco": patient.alco,
+        "active": patient.active
+    }
 
-    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    # Delete patient link and then patient record
+    db.query(DoctorPatient).filter_by(doctor_id=doctor.id, patient_id=patient_id).delete(synchronize_session=False)
+    db.delete(patient)
+    db.commit()
+    invalidate_patient_access(doctor.id)
+    unindex_patient(patient_id)
 
-    # Log the deletion in audit_logs with full patient details
-    audit_log = AuditLog(
+    # Log the deletion in audit_logs
+    record_audit_event(
+        db,
         patient_id=patient_id,
         doctor_id=doctor.id,
         action_type="DELETE",
         entity_type="PATIENT",
-        action_details={
-            "patient_id": patient.patient_id,
-            "first_name": patient.first_name,
-            "last_name": patient.last_name,
-            "gender": patient.gender,
-            "dob": str(patient.dob),
-            "ethnicity": patient.ethnicity,
-            "phone": patient.phone,
-            "email": patient.email,
-            "marital_status": patient.marital_status,
-            "occupation": patient.occupation,
-            "insurance_provider": patient.insurance_provider,
-            "address": patient.address,
-            "weight": patient.weight,
-            "height": patient.height,
-            "smoke": patient.smoke,
-            "alco": patient.alco,
-            "active": patient.active
-        },
-        description=f"Deleted patient {patient.first_name} {patient.last_name}"
+        action_details=patient_details,
+        description=f"Deleted patient {patient_details['first_name']} {patient_details['last_name']}"
     )
-    db.add(audit_log)
-
-    # Delete patient link and then patient record
-    db.delete(link)
-    db.delete(patient)
-    db.commit()
     return {"message": "Patient deleted successfully"}
 
 @patient_router.put("/patients/{patient_id}", summary="Update a patient", description="Only updates if the patient belongs to the logged-in doctor.")
@@ -436,13 +434,7 @@ def update_patient(
         db: Session = Depends(get_db),
         doctor: Doctor = Depends(get_current_doctor)
 ):
-    link = db.query(DoctorPatient).filter_by(doctor_id=doctor.id, patient_id=patient_id).first()
-    if not link:
-        raise HTTPException(status_code=403, detail="This patient is not assigned to you")
-
-    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    patient = get_accessible_patient(db, doctor, patient_id)
 
     # Capture old values for audit log
     old_values = {}
@@ -509,8 +501,13 @@ def update_patient(
     if hasattr(data, 'active') and data.active is not None:
         patient.active = data.active
 
+    db.commit()
+    db.refresh(patient)
+    reindex_patient(patient)
+
     # Log the update in audit_logs
-    audit_log = AuditLog(
+    record_audit_event(
+        db,
         patient_id=patient_id,
         doctor_id=doctor.id,
         action_type="UPDATE",
@@ -521,9 +518,5 @@ def update_patient(
         },
         description=f"Updated patient {data.first_name} {data.last_name}"
     )
-    db.add(audit_log)
-
-    db.commit()
-    db.refresh(patient)
 
     return {"message": "Patient updated successfully"}
\ No newline at end of file
@@ -0,0 +1,49 @@
+# File: backend/app/api/v1/endpoints/patient_import.py
+from enum import Enum
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.orm import Session
+from backend.app.core.deps import get_db
+from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.core.deps_access import invalidate_patient_access
+from backend.app.models.doctor import Doctor
+from backend.app.models.patient_schema import PatientImportReport
+from backend.app.services.patient_import import READERS, import_patients, format_for_filename
+from backend.app.services.patient_service import auto_populate_patients
+from backend.app.services.patient_search import drop_patient_search_index
+
+patient_import_router = APIRouter()
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+@patient_import_router.post(
+    "/patients/import",
+    response_model=PatientImportReport,
+    summary="Import patients from CSV or NDJSON",
+    description="Parses the upload as a stream and writes it in chunks of bulk statements. "
+                "Rows that fail validation are listed with their line and skipped; the rest are imported. "
+                "Initial readings go in \"vital:<name>\" / \"test:<name>\" columns, or \"vitals\" / \"tests\" lists in NDJSON."
+)
+def import_patient_file(
+        background_tasks: BackgroundTasks,
+        file: UploadFile = File(...),
+        format: Optional[ImportFormat] = Query(None, description="Defaults from the file name (.csv, .ndjson, .jsonl)"),
+        skip_rules: bool = Query(False, description="Don't run decision-rule auto-population for patients imported with readings"),
+        db: Session = Depends(get_db),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    file_format = format.value if format is not None else format_for_filename(file.filename)
+    if file_format is None:
+        raise HTTPException(status_code=400, detail="Unknown file type; pass format=csv or format=ndjson")
+
+    report, with_readings = import_patients(db, doctor.id, READERS[file_format](file.file))
+    if report["imported"]:
+        invalidate_patient_access(doctor.id)
+        drop_patient_search_index(doctor.id)
+    if with_readings and not skip_rules:
+        # Same rule evaluation the single-reading endpoints schedule, once per patient, after the response
+        background_tasks.add_task(auto_populate_patients, with_readings, doctor.id)
+    return report
@@ -2,11 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from backend.app.models.patient_lifestyle_advices import PatientLifestyleAdvices
 from backend.app.models.life_style_advices_catalog import LifeStyleAdvicesCatalog
-from backend.app.models.patient import Patient
-from backend.app.models.doctor_patient import DoctorPatient
 from backend.app.models.doctor import Doctor
 from backend.app.core.deps import get_db
 from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.core.deps_access import ensure_patient_access
 from backend.app.models.patient_lifestyle_advices_schema import PatientLifestyleAdvicesCreate, PatientLifestyleAdvicesUpdate, PatientLifestyleAdvicesOut
 
 patient_lifestyle_advices_router = APIRouter(prefix="/patient-lifestyle-advices", tags=["Patient Lifestyle Advices"])
@@ -42,17 +41,7 @@ def update_patient_lifestyle_advice(
                 raise HTTPException(status_code=400, detail="Patient ID required for catalog item conversion")
             
             # Verify the patient belongs to this doctor
-            patient = db.query(Patient).filter(Patient.patient_id == data.patient_id).first()
-            if not patient:
-                raise HTTPException(status_code=404, detail="Patient not found")
-            
-            # Check if doctor has access to this patient
-            doctor_patient_relation = db.query(DoctorPatient).filter(
-                DoctorPatient.doctor_id == doctor.id,
-                DoctorPatient.patient_id == data.patient_id
-            ).first()
-            if not doctor_patient_relation:
-                raise HTTPException(status_code=403, detail="Access denied to this patient")
+            ensure_patient_access(db, doctor, data.patient_id, detail="Access denied to this patient")
             
             # Find the existing auto-generated item in patient_lifestyle_advices
             existing_auto_generated = db.query(PatientLifestyleAdvices).filter(
@@ -1,11 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from backend.app.models.patient_prescriptions import PatientPrescriptions
-from backend.app.models.patient import Patient
-from backend.app.models.doctor_patient import DoctorPatient
 from backend.app.models.doctor import Doctor
 from backend.app.core.deps import get_db
 from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.core.deps_access import ensure_patient_access
 from backend.app.models.patient_prescriptions_schema import PatientPrescriptionsCreate, PatientPrescriptionsUpdate, PatientPrescriptionsOut
 
 patient_prescriptions_router = APIRouter(prefix="/patient-prescriptions", tags=["Patient Prescriptions"])
@@ -23,17 +22,7 @@ def add_patient_prescription(
 ):
     try:
         # Verify the patient belongs to this doctor
-        patient = db.query(Patient).filter(Patient.patient_id == data.patient_id).first()
-        if not patient:
-            raise HTTPException(status_code=404, detail="Patient not found")
-        
-        # Check if doctor has access to this patient
-        doctor_patient_relation = db.query(DoctorPatient).filter(
-            DoctorPatient.doctor_id == doctor.id,
-            DoctorPatient.patient_id == data.patient_id
-        ).first()
-        if not doctor_patient_relation:
-            raise HTTPException(status_code=403, detail="Access denied to this patient")
+        ensure_patient_access(db, doctor, data.patient_id, detail="Access denied to this patient")
         
         new_prescription = PatientPrescriptions(
             patient_id=data.patient_id,
@@ -147,17 +136,7 @@ def get_patient_prescriptions_by_patient_id(
 ):
     try:
         # Verify the patient belongs to this doctor
-        patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
-        if not patient:
-            raise HTTPException(status_code=404, detail="Patient not found")
-        
-        # Check if doctor has access to this patient
-        doctor_patient_relation = db.query(DoctorPatient).filter(
-            DoctorPatient.doctor_id == doctor.id,
-            DoctorPatient.patient_id == patient_id
-        ).first()
-        if not doctor_patient_relation:
-            raise HTTPException(status_code=403, detail="Access denied to this patient")
+        ensure_patient_access(db, doctor, patient_id, detail="Access denied to this patient")
         
         prescriptions = db.query(PatientPrescriptions).filter(
             PatientPrescriptions.patient_id == patient_id,
@@ -194,17 +173,7 @@ def get_prescription_history(
 ):
     try:
         # Verify the patient belongs to this doctor
-        patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
-        if not patient:
-            raise HTTPException(status_code=404, detail="Patient not found")
-        
-        # Check if doctor has access to this patient
-        doctor_patient_relation = db.query(DoctorPatient).filter(
-            DoctorPatient.doctor_id == doctor.id,
-            DoctorPatient.patient_id == patient_id
-        ).first()
-        if not doctor_patient_relation:
-            raise HTTPException(status_code=403, detail="Access denied to this patient")
+        ensure_patient_access(db, doctor, patient_id, detail="Access denied to this patient")
         
         prescriptions = db.query(PatientPrescriptions).filter(
             PatientPrescriptions.patient_id == patient_id,
@@ -0,0 +1,96 @@
+# File: backend/app/api/v1/endpoints/patient_reports.py
+import asyncio
+import os
+import tempfile
+import zipfile
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+from backend.app.core.deps import get_async_db
+from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.core.deps_access import get_accessible_patient_async
+from backend.app.models.doctor import Doctor
+from backend.app.models.patient_schema import PatientReportBatch
+from backend.app.services.patient_report import (
+    REPORT_BATCH_MAX,
+    cached_report,
+    render_report_async,
+    report_filename,
+)
+from backend.app.api.v1.endpoints.patient import map_patient_async
+
+patient_reports_router = APIRouter()
+
+async def _report_path(db: AsyncSession, patient, doctor: Doctor, anonymous: bool) -> str:
+    path = cached_report(patient.patient_id, patient.revision, doctor.id, anonymous)
+    if path:
+        return path
+    report = (await map_patient_async(patient, db)).model_dump(mode="json")
+    return await render_report_async(report, patient.revision, doctor, anonymous)
+
+@patient_reports_router.get(
+    "/patients/{patient_id}/report",
+    summary="Patient summary PDF",
+    description="Rendered server-side and cached per patient revision and day; unchanged patients are served straight from disk."
+)
+async def download_patient_report(
+        patient_id: int,
+        anonymous: bool = Query(False, description="Leave out names, contact and social details"),
+        db: AsyncSession = Depends(get_async_db),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    patient = await get_accessible_patient_async(db, doctor, patient_id)
+    path = await _report_path(db, patient, doctor, anonymous)
+    # FileResponse streams the file in chunks and sets ETag / Last-Modified from it
+    return FileResponse(path, media_type="application/pdf", filename=report_filename(patient, anonymous))
+
+def _write_zip(entries: list) -> str:
+    fd, zip_path = tempfile.mkstemp(suffix=".zip")
+    with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w", zipfile.ZIP_STORED) as archive:
+        for path, name in entries:
+            archive.write(path, name)  # PDFs are already compressed
+    return zip_path
+
+@patient_reports_router.post(
+    "/patients/reports",
+    summary="Patient summary PDFs for several patients",
+    description="Renders the missing reports in parallel on the report process pool and returns them as one ZIP."
+)
+async def download_patient_reports(
+        batch: PatientReportBatch,
+        db: AsyncSession = Depends(get_async_db),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    patient_ids = list(dict.fromkeys(batch.patient_ids))
+    if not patient_ids:
+        raise HTTPException(status_code=400, detail="No patients given")
+    if len(patient_ids) > REPORT_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {REPORT_BATCH_MAX} patients per batch")
+
+    # Authorize everything before rendering anything
+    patients = [await get_accessible_patient_async(db, doctor, patient_id) for patient_id in patient_ids]
+
+    entries, renders = [], []
+    for patient in patients:
+        name = f"{patient.patient_id}_{report_filename(patient, batch.anonymous)}"
+        path = cached_report(patient.patient_id, patient.revision, doctor.id, batch.anonymous)
+        if path:
+            entries.append((path, name))
+            continue
+        # Start rendering right away so the pool works while the next patient is loaded
+        report = (await map_patient_async(patient, db)).model_dump(mode="json")
+        renders.append((asyncio.ensure_future(
+            render_report_async(report, patient.revision, doctor, batch.anonymous)
+        ), name))
+
+    for render, name in renders:
+        entries.append((await render, name))
+
+    zip_path = await asyncio.to_thread(_write_zip, entries)
+    return FileResponse(
+        zip_path,
+        media_type="application/zip",
+        filename="patient_reports.zip",
+        background=BackgroundTask(os.remove, zip_path),
+    )
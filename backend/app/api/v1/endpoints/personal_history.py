@@ -2,26 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from datetime import datetime, date, timezone
 from typing import List
 from sqlalchemy.orm import Session
-from sqlalchemy import exists
 from backend.app.models.patient_personal_history import PatientPersonalHistory
 from backend.app.models.personal_history_dict import PersonalHistoryDict
 from backend.app.models.personal_history_schema import PatientHistoryCreate, PatientHistoryResponse, PersonalHistoryDictResponse
-from backend.app.models.patient import Patient
 from backend.app.models.doctor import Doctor
-from backend.app.models.doctor_patient import DoctorPatient
 from backend.app.models.audit_log import AuditLog
 from backend.app.core.deps import get_db
 from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.core.deps_access import authorized_patient_id, ensure_patient_access, get_doctor_patient_ids
 from backend.app.services.patient_service import auto_populate_patient_summary_data
 from backend.app.core.config import SessionLocal
 
 personal_history_router = APIRouter(prefix="/personal-history", tags=["personal-history"])
 
-def ensure_doctor_owns_patient(doctor: Doctor, patient_id: int, db: Session):
-    link = db.query(DoctorPatient).filter_by(doctor_id=doctor.id, patient_id=patient_id).first()
-    if not link:
-        raise HTTPException(status_code=403, detail="This patient is not assigned to you")
-
 def background_auto_populate(patient_id: int, doctor_id: int):
     # Create a new session for the background task
     db_background = SessionLocal()
@@ -44,10 +37,7 @@ def add_patient_history(
         doctor: Doctor = Depends(get_current_doctor)
 ):
     try:
-        ensure_doctor_owns_patient(doctor, data.patient_id, db)
-
-        if not db.query(exists().where(Patient.patient_id == data.patient_id)).scalar():
-            raise HTTPException(status_code=404, detail=f"Patient with ID {data.patient_id} not found")
+        ensure_patient_access(db, doctor, data.patient_id)
 
         history_dict = db.query(PersonalHistoryDict).filter(PersonalHistoryDict.id == data.history_id).first()
         if not history_dict:
@@ -126,7 +116,7 @@ def resolve_patient_history(
             raise HTTPException(status_code=404, detail="Personal history record not found")
 
         # Ensure doctor owns the patient
-        ensure_doctor_owns_patient(doctor, history_record.patient_id, db)
+        ensure_patient_access(db, doctor, history_record.patient_id)
 
         # Mark as resolved
         history_record.resolved_at = datetime.now(timezone.utc)
@@ -179,7 +169,7 @@ def delete_patient_history(
             raise HTTPException(status_code=404, detail="Personal history record not found")
 
         # Ensure doctor owns the patient
-        ensure_doctor_owns_patient(doctor, history_record.patient_id, db)
+        ensure_patient_access(db, doctor, history_record.patient_id)
 
         # Get history name for audit log before deletion
         history_dict = db.query(PersonalHistoryDict).filter(PersonalHistoryDict.id == history_record.history_id).first()
@@ -229,7 +219,7 @@ def list_all_history_for_doctor(
         db: Session = Depends(get_db),
         doctor: Doctor = Depends(get_current_doctor)
 ):
-    return db.query(PatientPersonalHistory).all()
+    return db.query(PatientPersonalHistory).filter(PatientPersonalHistory.patient_id.in_(get_doctor_patient_ids(db, doctor.id))).all()
 
 @personal_history_router.get(
     "/by-patient/{patient_id}",
@@ -239,11 +229,9 @@ def list_all_history_for_doctor(
     status_code=200
 )
 def get_history_by_patient(
-        patient_id: int,
-        db: Session = Depends(get_db),
-        doctor: Doctor = Depends(get_current_doctor)
+        patient_id: int = Depends(authorized_patient_id),
+        db: Session = Depends(get_db)
 ):
-    ensure_doctor_owns_patient(doctor, patient_id, db)
     return db.query(PatientPersonalHistory).filter(PatientPersonalHistory.patient_id == patient_id).all()
 
 @personal_history_router.get(
@@ -5,10 +5,20 @@ import numpy as np  # Import numpy for type conversion
 # Add deepcardio root folder to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../..')))
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from sqlalchemy.orm import Session
 from core.cardio_model import CardioModel
 from fastapi.security import OAuth2PasswordBearer
+from backend.app.core.deps import get_db
+from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.core.deps_access import ensure_patient_access, authorized_patient_id
+from backend.app.models.doctor import Doctor
+from backend.app.models.doctor_patient import DoctorPatient
+from backend.app.models.patient_risk_score import PatientRiskScore
+from backend.app.models.patient_prediction import PatientPrediction
 
 router = APIRouter(tags=["Predictions"])
 
@@ -33,6 +43,30 @@ class PatientInput(BaseModel):
     alco: int
     active: int
 
+class RiskScoreResponse(BaseModel):
+    patient_id: int
+    model_name: str
+    model_version: str
+    probability: float
+    prediction: int
+    missing_features: Optional[str]
+    scored_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class PredictionHistoryResponse(BaseModel):
+    id: int
+    model_name: str
+    model_version: str
+    probability: float
+    prediction: int
+    source: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def convert_numpy_types(obj):
@@ -75,4 +109,38 @@ async def predict_cardio(input: PatientInput, token: str = Depends(oauth2_scheme
         predictions = convert_numpy_types(predictions)
         return {"predictions": predictions}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/risk-scores", response_model=List[RiskScoreResponse])
+def read_risk_scores(
+        patient_id: Optional[int] = Query(None, description="Only this patient's scores"),
+        db: Session = Depends(get_db),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    """
+    Stored scores from the population scoring job (python -m backend.app.score_patients)
+    for the doctor's patients; no model is run.
+    """
+    query = db.query(PatientRiskScore)
+    if patient_id is not None:
+        ensure_patient_access(db, doctor, patient_id)
+        query = query.filter(PatientRiskScore.patient_id == patient_id)
+    else:
+        query = query.join(DoctorPatient, DoctorPatient.patient_id == PatientRiskScore.patient_id) \
+            .filter(DoctorPatient.doctor_id == doctor.id)
+    return query.order_by(PatientRiskScore.patient_id, PatientRiskScore.model_name).all()
+
+@router.get("/patients/{patient_id}/predictions", response_model=List[PredictionHistoryResponse])
+def read_prediction_history(
+        patient_id: int = Depends(authorized_patient_id),
+        model_name: Optional[str] = Query(None, description="Only this model's history"),
+        limit: int = Query(100, ge=1, le=1000),
+        db: Session = Depends(get_db)
+):
+    """
+    Stored prediction history, newest first, for trend views.
+    """
+    query = db.query(PatientPrediction).filter(PatientPrediction.patient_id == patient_id)
+    if model_name:
+        query = query.filter(PatientPrediction.model_name == model_name)
+    return query.order_by(PatientPrediction.created_at.desc(), PatientPrediction.id.desc()).limit(limit).all()
@@ -2,26 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from datetime import datetime, date, timezone
 from typing import List
 from sqlalchemy.orm import Session
-from sqlalchemy import exists
 from backend.app.models.symptoms_schema import PatientSymptomCreate, PatientSymptomResponse, SymptomDictResponse
 from backend.app.models.patient_symptom import PatientSymptom
-from backend.app.models.patient import Patient
 from backend.app.models.symptom_dict import SymptomDict
-from backend.app.models.doctor_patient import DoctorPatient
 from backend.app.models.doctor import Doctor
 from backend.app.models.audit_log import AuditLog
 from backend.app.core.deps import get_db
 from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.core.deps_access import authorized_patient_id, ensure_patient_access, get_doctor_patient_ids
 from backend.app.services.patient_service import auto_populate_patient_summary_data
 from backend.app.core.config import SessionLocal
 
 symptoms_router = APIRouter(prefix="/symptoms", tags=["symptoms"])
 
-def ensure_doctor_owns_patient(doctor: Doctor, patient_id: int, db: Session):
-    link = db.query(DoctorPatient).filter_by(doctor_id=doctor.id, patient_id=patient_id).first()
-    if not link:
-        raise HTTPException(status_code=403, detail="This patient is not assigned to you")
-
 def background_auto_populate(patient_id: int, doctor_id: int):
     # Create a new session for the background task
     db_background = SessionLocal()
@@ -44,10 +37,7 @@ def add_patient_symptom(
         doctor: Doctor = Depends(get_current_doctor)
 ):
     try:
-        ensure_doctor_owns_patient(doctor, data.patient_id, db)
-
-        if not db.query(exists().where(Patient.patient_id == data.patient_id)).scalar():
-            raise HTTPException(status_code=404, detail=f"Patient with ID {data.patient_id} not found")
+        ensure_patient_access(db, doctor, data.patient_id)
 
         symptom_dict = db.query(SymptomDict).filter(SymptomDict.symptom_id == data.symptom_id).first()
         if not symptom_dict:
@@ -126,7 +116,7 @@ def resolve_patient_symptom(
             raise HTTPException(status_code=404, detail="Symptom record not found")
 
         # Ensure doctor owns the patient
-        ensure_doctor_owns_patient(doctor, symptom_record.patient_id, db)
+        ensure_patient_access(db, doctor, symptom_record.patient_id)
 
         # Mark as resolved
         symptom_record.resolved_at = datetime.now(timezone.utc)
@@ -178,7 +168,7 @@ def delete_patient_symptom(
             raise HTTPException(status_code=404, detail="Symptom record not found")
 
         # Ensure doctor owns the patient
-        ensure_doctor_owns_patient(doctor, symptom_record.patient_id, db)
+        ensure_patient_access(db, doctor, symptom_record.patient_id)
 
         # Get symptom name for audit log before deletion
         symptom_dict = db.query(SymptomDict).filter(SymptomDict.symptom_id == symptom_record.symptom_id).first()
@@ -227,7 +217,7 @@ def list_all_symptoms_for_doctor(
         db: Session = Depends(get_db),
         doctor: Doctor = Depends(get_current_doctor)
 ):
-    return db.query(PatientSymptom).all()
+    return db.query(PatientSymptom).filter(PatientSymptom.patient_id.in_(get_doctor_patient_ids(db, doctor.id))).all()
 
 @symptoms_router.get(
     "/by-patient/{patient_id}",
@@ -237,11 +227,9 @@ def list_all_symptoms_for_doctor(
     status_code=200
 )
 def get_symptoms_by_patient(
-        patient_id: int,
-        db: Session = Depends(get_db),
-        doctor: Doctor = Depends(get_current_doctor)
+        patient_id: int = Depends(authorized_patient_id),
+        db: Session = Depends(get_db)
 ):
-    ensure_doctor_owns_patient(doctor, patient_id, db)
     return db.query(PatientSymptom).filter(PatientSymptom.patient_id == patient_id).all()
 
 @symptoms_router.get(
@@ -256,8 +244,7 @@ def get_symptoms_by_symptom_id(
         doctor: Doctor = Depends(get_current_doctor)
 ):
     # Get all patients assigned to this doctor
-    doctor_patients = db.query(DoctorPatient).filter(DoctorPatient.doctor_id == doctor.id).all()
-    patient_ids = [dp.patient_id for dp in doctor_patients]
+    patient_ids = get_doctor_patient_ids(db, doctor.id)
     
     # Get symptoms for those patients with the specified symptom_id
     return db.query(PatientSymptom).filter(
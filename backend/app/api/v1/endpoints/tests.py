@@ -1,27 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
-from sqlalchemy import exists, func
 from typing import List
 from datetime import datetime, date, timezone
 from backend.app.core.deps import get_db
 from backend.app.core.deps_doctor import get_current_doctor
-from backend.app.models.patient import Patient
+from backend.app.core.deps_access import authorized_patient_id, ensure_patient_access, get_doctor_patient_ids
 from backend.app.models.tests_dict import TestsDict
 from backend.app.models.patient_tests import PatientTests
-from backend.app.models.doctor_patient import DoctorPatient
-from backend.app.models.tests_schema import PatientTestCreate, PatientTestDelete, PatientTestUpdate, PatientTestResponse, TestsDictResponse
+from backend.app.models.patient_latest_tests import PatientLatestTests
+from backend.app.models.tests_schema import PatientTestCreate, PatientTestBatch, PatientTestBatchResponse, PatientTestDelete, PatientTestUpdate, PatientTestResponse, TestsDictResponse
 from backend.app.models.doctor import Doctor
 from backend.app.models.audit_log import AuditLog
-from backend.app.services.patient_service import auto_populate_patient_summary_data
+from backend.app.services.patient_service import auto_populate_patient_summary_data, auto_populate_patients, refresh_latest_test
+from backend.app.services.clinical_readings import CLINICAL_BATCH_MAX, test_names, insert_tests
 from backend.app.core.config import SessionLocal
 
 tests_router = APIRouter(prefix="/tests", tags=["tests"])
 
-def ensure_patient_belongs_to_doctor(db: Session, doctor: Doctor, patient_id: int):
-    link = db.query(DoctorPatient).filter_by(doctor_id=doctor.id, patient_id=patient_id).first()
-    if not link:
-        raise HTTPException(status_code=403, detail="This patient is not assigned to you")
-
 def background_auto_populate(patient_id: int, doctor_id: int):
     # Create a new session for the background task
     db_background = SessionLocal()
@@ -44,10 +39,7 @@ def add_patient_test(
         doctor: Doctor = Depends(get_current_doctor)
 ):
     try:
-        ensure_patient_belongs_to_doctor(db, doctor, data.patient_id)
-
-        if not db.query(exists().where(Patient.patient_id == data.patient_id)).scalar():
-            raise HTTPException(status_code=404, detail=f"Patient with ID {data.patient_id} not found")
+        ensure_patient_access(db, doctor, data.patient_id)
 
         test_dict = db.query(TestsDict).filter(TestsDict.id == data.test_id).first()
         if not test_dict:
@@ -72,6 +64,7 @@ def add_patient_test(
             recorded_at=datetime.now(timezone.utc)
         )
         db.add(new_test)
+        refresh_latest_test(db, new_test.patient_id, new_test.test_id)
         db.commit()
         db.refresh(new_test)
 
@@ -98,6 +91,55 @@ def add_patient_test(
         print(f"Error in add_patient_test: {str(e)}")  # Add logging for debugging
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@tests_router.post(
+    "/batch",
+    response_model=PatientTestBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Add Patient Tests in Bulk",
+    description="Records many test results, for any of the doctor's patients, in one transaction. "
+                "The whole batch is rejected if any result names an unknown test or patient."
+)
+def add_patient_tests_batch(
+        data: PatientTestBatch,
+        background_tasks: BackgroundTasks,
+        db: Session = Depends(get_db),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    if not data.results:
+        raise HTTPException(status_code=400, detail="No test results given")
+    if len(data.results) > CLINICAL_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {CLINICAL_BATCH_MAX} test results per batch")
+
+    try:
+        patient_ids = sorted({result.patient_id for result in data.results})
+        for patient_id in patient_ids:
+            ensure_patient_access(db, doctor, patient_id)
+
+        names = test_names(db)
+        unknown = sorted({r.test_id for r in data.results if r.test_id not in names})
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Tests not found: {', '.join(unknown)}")
+
+        today = date.today()
+        created = insert_tests(db, doctor.id, [
+            {"patient_id": r.patient_id, "test_id": r.test_id, "result_value": r.result_value,
+             "test_date": r.test_date or today, "notes": r.notes}
+            for r in data.results
+        ], names, datetime.now(timezone.utc).replace(tzinfo=None))
+        db.commit()
+
+        # Re-evaluate the rules once per patient, not once per result
+        background_tasks.add_task(auto_populate_patients, patient_ids, doctor.id)
+
+        return PatientTestBatchResponse(created=created, patient_ids=patient_ids)
+    except HTTPException as e:
+        db.rollback()
+        raise e
+    except Exception as e:
+        db.rollback()
+        print(f"Error in add_patient_tests_batch: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
 @tests_router.delete(
     "/{test_record_id}",
     response_model=PatientTestResponse,
@@ -118,10 +160,11 @@ def resolve_patient_test(
             raise HTTPException(status_code=404, detail="Test record not found")
 
         # Ensure doctor owns the patient
-        ensure_patient_belongs_to_doctor(db, doctor, test_record.patient_id)
+        ensure_patient_access(db, doctor, test_record.patient_id)
 
         # Mark as resolved
         test_record.resolved_at = datetime.now(timezone.utc)
+        refresh_latest_test(db, test_record.patient_id, test_record.test_id)
         db.commit()
         db.refresh(test_record)
 
@@ -171,7 +214,7 @@ def delete_patient_test(
             raise HTTPException(status_code=404, detail="Test record not found")
 
         # Ensure doctor owns the patient
-        ensure_patient_belongs_to_doctor(db, doctor, test_record.patient_id)
+        ensure_patient_access(db, doctor, test_record.patient_id)
 
         # Get test name for audit log before deletion
         test_dict = db.query(TestsDict).filter(TestsDict.id == test_record.test_id).first()
@@ -185,6 +228,7 @@ def delete_patient_test(
         
         # Delete the record
         db.delete(test_record)
+        refresh_latest_test(db, patient_id, test_id_for_audit)
         db.commit()
 
         # Log audit event
@@ -232,7 +276,7 @@ def update_patient_test(
             raise HTTPException(status_code=404, detail="Test record not found")
 
         # Ensure doctor owns the patient
-        ensure_patient_belongs_to_doctor(db, doctor, test_record.patient_id)
+        ensure_patient_access(db, doctor, test_record.patient_id)
 
         # Store old values for audit log
         old_result_value = test_record.result_value
@@ -254,6 +298,7 @@ def update_patient_test(
                     raise HTTPException(status_code=400, detail="Invalid new_test_date format. Expected YYYY-MM-DD")
             test_record.test_date = new_test_date
 
+        refresh_latest_test(db, test_record.patient_id, test_record.test_id)
         db.commit()
         db.refresh(test_record)
 
@@ -306,7 +351,7 @@ def get_all_patient_tests(
         db: Session = Depends(get_db),
         doctor: Doctor = Depends(get_current_doctor)
 ):
-    return db.query(PatientTests).all()
+    return db.query(PatientTests).filter(PatientTests.patient_id.in_(get_doctor_patient_ids(db, doctor.id))).all()
 
 @tests_router.get(
     "/by-patient/{patient_id}",
@@ -316,38 +361,16 @@ def get_all_patient_tests(
     description="Retrieve the most recent test records for a specific patient, one per test type."
 )
 def get_tests_by_patient_id(
-        patient_id: int,
-        db: Session = Depends(get_db),
-        doctor: Doctor = Depends(get_current_doctor)
+        patient_id: int = Depends(authorized_patient_id),
+        db: Session = Depends(get_db)
 ):
-    ensure_patient_belongs_to_doctor(db, doctor, patient_id)
-    
-    # Subquery to get the most recent record for each test_id
-    subquery = (
-        db.query(
-            PatientTests.patient_id,
-            PatientTests.test_id,
-            func.max(PatientTests.recorded_at).label('max_recorded_at')
-        )
-        .filter(PatientTests.patient_id == patient_id)
-        .group_by(PatientTests.patient_id, PatientTests.test_id)
-        .subquery()
-    )
-
-    # Main query to join with subquery and get full records
-    results = (
+    # One indexed lookup on the latest-result projection instead of a GROUP BY over the history
+    return (
         db.query(PatientTests)
-        .join(
-            subquery,
-            (PatientTests.patient_id == subquery.c.patient_id) &
-            (PatientTests.test_id == subquery.c.test_id) &
-            (PatientTests.recorded_at == subquery.c.max_recorded_at)
-        )
-        .filter(PatientTests.patient_id == patient_id)
+        .join(PatientLatestTests, PatientLatestTests.patient_test_id == PatientTests.id)
+        .filter(PatientLatestTests.patient_id == patient_id)
         .all()
     )
-    
-    return results
 
 @tests_router.get(
     "/by-test/{test_id}",
@@ -362,8 +385,7 @@ def get_tests_by_test_id(
         doctor: Doctor = Depends(get_current_doctor)
 ):
     # Get all patients assigned to this doctor
-    doctor_patients = db.query(DoctorPatient).filter(DoctorPatient.doctor_id == doctor.id).all()
-    patient_ids = [dp.patient_id for dp in doctor_patients]
+    patient_ids = get_doctor_patient_ids(db, doctor.id)
     
     # Get tests for those patients with the specified test_id
     return db.query(PatientTests).filter(
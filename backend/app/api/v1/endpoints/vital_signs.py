@@ -1,27 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import exists
-from typing import List
+from typing import List, Optional
 from datetime import datetime, date, timezone
 from backend.app.core.deps import get_db
 from backend.app.core.deps_doctor import get_current_doctor
-from backend.app.models.patient import Patient
+from backend.app.core.deps_access import authorized_patient_id, ensure_patient_access, get_doctor_patient_ids
 from backend.app.models.vital_signs_dict import VitalSignsDict
 from backend.app.models.patient_vital_signs import PatientVitalSigns
-from backend.app.models.doctor_patient import DoctorPatient
-from backend.app.models.vital_signs_schema import PatientVitalSignCreate, PatientVitalSignUpdate, PatientVitalSignDelete, PatientVitalSignResponse, VitalSignDictResponse
+from backend.app.models.vital_signs_schema import PatientVitalSignCreate, PatientVitalSignBatch, PatientVitalSignBatchResponse, PatientVitalSignUpdate, PatientVitalSignDelete, PatientVitalSignResponse, VitalSignDictResponse, VitalSignSeriesResponse
 from backend.app.models.doctor import Doctor
 from backend.app.models.audit_log import AuditLog
-from backend.app.services.patient_service import auto_populate_patient_summary_data
+from backend.app.services.patient_service import auto_populate_patient_summary_data, auto_populate_patients
+from backend.app.services.vital_signs_service import (
+    DOWNSAMPLE_METHODS,
+    get_vital_sign_series,
+    build_vital_sign_series,
+    compute_trend,
+)
+from backend.app.services.clinical_readings import CLINICAL_BATCH_MAX, vital_sign_names, insert_vital_signs
+from backend.app.helpers.utils import parse_finite_float_or_none
 from backend.app.core.config import SessionLocal
 
 vital_signs_router = APIRouter(prefix="/vital-signs", tags=["vital-signs"])
 
-def ensure_patient_belongs_to_doctor(db: Session, doctor: Doctor, patient_id: int):
-    link = db.query(DoctorPatient).filter_by(doctor_id=doctor.id, patient_id=patient_id).first()
-    if not link:
-        raise HTTPException(status_code=403, detail="This patient is not assigned to you")
-
 def background_auto_populate(patient_id: int, doctor_id: int):
     # Create a new session for the background task
     db_background = SessionLocal()
@@ -44,10 +45,7 @@ def add_vital_sign(
         doctor: Doctor = Depends(get_current_doctor)
 ):
     try:
-        ensure_patient_belongs_to_doctor(db, doctor, data.patient_id)
-
-        if not db.query(exists().where(Patient.patient_id == data.patient_id)).scalar():
-            raise HTTPException(status_code=404, detail=f"Patient with ID {data.patient_id} not found")
+        ensure_patient_access(db, doctor, data.patient_id)
 
         vital_sign_dict = db.query(VitalSignsDict).filter(VitalSignsDict.vital_sign_id == data.vital_sign_id).first()
         if not vital_sign_dict:
@@ -67,6 +65,7 @@ def add_vital_sign(
             patient_id=data.patient_id,
             vital_sign_id=data.vital_sign_id,
             value=data.value,
+            numeric_value=parse_finite_float_or_none(data.value),
             measurement_date=measurement_date,
             recorded_at=datetime.now(timezone.utc)
         )
@@ -97,6 +96,55 @@ def add_vital_sign(
         print(f"Error in add_vital_sign: {str(e)}")  # Add logging for debugging
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@vital_signs_router.post(
+    "/batch",
+    response_model=PatientVitalSignBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Add Patient Vital Signs in Bulk",
+    description="Records many vital signs, for any of the doctor's patients, in one transaction. "
+                "The whole batch is rejected if any reading names an unknown vital sign or patient."
+)
+def add_vital_signs_batch(
+        data: PatientVitalSignBatch,
+        background_tasks: BackgroundTasks,
+        db: Session = Depends(get_db),
+        doctor: Doctor = Depends(get_current_doctor)
+):
+    if not data.readings:
+        raise HTTPException(status_code=400, detail="No readings given")
+    if len(data.readings) > CLINICAL_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {CLINICAL_BATCH_MAX} readings per batch")
+
+    try:
+        patient_ids = sorted({reading.patient_id for reading in data.readings})
+        for patient_id in patient_ids:
+            ensure_patient_access(db, doctor, patient_id)
+
+        names = vital_sign_names(db)
+        unknown = sorted({r.vital_sign_id for r in data.readings if r.vital_sign_id not in names})
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Vital signs not found: {', '.join(map(str, unknown))}")
+
+        today = date.today()
+        created = insert_vital_signs(db, doctor.id, [
+            {"patient_id": r.patient_id, "vital_sign_id": r.vital_sign_id, "value": r.value,
+             "measurement_date": r.measurement_date or today}
+            for r in data.readings
+        ], names, datetime.now(timezone.utc).replace(tzinfo=None))
+        db.commit()
+
+        # Re-evaluate the rules once per patient, not once per reading
+        background_tasks.add_task(auto_populate_patients, patient_ids, doctor.id)
+
+        return PatientVitalSignBatchResponse(created=created, patient_ids=patient_ids)
+    except HTTPException as e:
+        db.rollback()
+        raise e
+    except Exception as e:
+        db.rollback()
+        print(f"Error in add_vital_signs_batch: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
 @vital_signs_router.delete(
     "/{vital_sign_record_id}",
     response_model=PatientVitalSignResponse,
@@ -117,7 +165,7 @@ def resolve_vital_sign(
             raise HTTPException(status_code=404, detail="Vital sign record not found")
 
         # Ensure doctor owns the patient
-        ensure_patient_belongs_to_doctor(db, doctor, vital_sign_record.patient_id)
+        ensure_patient_access(db, doctor, vital_sign_record.patient_id)
 
         # Mark as resolved
         vital_sign_record.resolved_at = datetime.now(timezone.utc)
@@ -170,7 +218,7 @@ def delete_vital_sign(
             raise HTTPException(status_code=404, detail="Vital sign record not found")
 
         # Ensure doctor owns the patient
-        ensure_patient_belongs_to_doctor(db, doctor, vital_sign_record.patient_id)
+        ensure_patient_access(db, doctor, vital_sign_record.patient_id)
 
         # Get vital sign name for audit log before deletion
         vital_sign_dict = db.query(VitalSignsDict).filter(VitalSignsDict.vital_sign_id == vital_sign_record.vital_sign_id).first()
@@ -231,7 +279,7 @@ def update_vital_sign(
             raise HTTPException(status_code=404, detail="Vital sign record not found")
 
         # Ensure doctor owns the patient
-        ensure_patient_belongs_to_doctor(db, doctor, vital_sign_record.patient_id)
+        ensure_patient_access(db, doctor, vital_sign_record.patient_id)
 
         # Store old values for audit log
         old_value = vital_sign_record.value
@@ -240,6 +288,7 @@ def update_vital_sign(
         # Update fields if provided
         if data.new_value is not None:
             vital_sign_record.value = data.new_value
+            vital_sign_record.numeric_value = parse_finite_float_or_none(data.new_value)
         if data.new_measurement_date is not None:
             # Handle new_measurement_date - convert string to date if needed
             new_measurement_date = data.new_measurement_date
@@ -294,7 +343,7 @@ def get_all_vital_signs(
         db: Session = Depends(get_db),
         doctor: Doctor = Depends(get_current_doctor)
 ):
-    return db.query(PatientVitalSigns).all()
+    return db.query(PatientVitalSigns).filter(PatientVitalSigns.patient_id.in_(get_doctor_patient_ids(db, doctor.id))).all()
 
 @vital_signs_router.get(
     "/by-patient/{patient_id}",
@@ -304,13 +353,48 @@ def get_all_vital_signs(
     description="Retrieve all vital sign records for a specific patient."
 )
 def get_vital_signs_by_patient_id(
-        patient_id: int,
-        db: Session = Depends(get_db),
-        doctor: Doctor = Depends(get_current_doctor)
+        patient_id: int = Depends(authorized_patient_id),
+        db: Session = Depends(get_db)
 ):
-    ensure_patient_belongs_to_doctor(db, doctor, patient_id)
     return db.query(PatientVitalSigns).filter(PatientVitalSigns.patient_id == patient_id).all()
 
+@vital_signs_router.get(
+    "/{patient_id}/series",
+    response_model=VitalSignSeriesResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get Vital Sign Time Series",
+    description="Retrieve a chart-ready time series of one vital sign for a patient, with optional date range, server-side downsampling and trend statistics."
+)
+def get_vital_sign_series_by_patient_id(
+        patient_id: int = Depends(authorized_patient_id),
+        vital_sign_id: int = Query(..., description="Vital sign to chart"),
+        start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+        end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
+        method: str = Query("buckets", description="Downsampling method: none, buckets (min/max/mean) or lttb"),
+        max_points: int = Query(200, ge=3, le=5000, description="Maximum number of points returned"),
+        db: Session = Depends(get_db)
+):
+    if method not in DOWNSAMPLE_METHODS:
+        raise HTTPException(status_code=400, detail=f"Invalid method. Expected one of: {', '.join(DOWNSAMPLE_METHODS)}")
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+
+    vital_sign_dict = db.query(VitalSignsDict).filter(VitalSignsDict.vital_sign_id == vital_sign_id).first()
+    if not vital_sign_dict:
+        raise HTTPException(status_code=404, detail=f"Vital sign with ID {vital_sign_id} not found")
+
+    x, y = get_vital_sign_series(db, patient_id, vital_sign_id, start_date, end_date)
+
+    return VitalSignSeriesResponse(
+        patient_id=patient_id,
+        vital_sign_id=vital_sign_id,
+        name=vital_sign_dict.name,
+        unit=vital_sign_dict.unit,
+        method=method,
+        points=build_vital_sign_series(x, y, method, max_points),
+        trend=compute_trend(x, y)
+    )
+
 @vital_signs_router.get(
     "/by-vital-sign/{vital_sign_id}",
     response_model=List[PatientVitalSignResponse],
@@ -324,8 +408,7 @@ def get_vital_signs_by_vital_sign_id(
         doctor: Doctor = Depends(get_current_doctor)
 ):
     # Get all patients assigned to this doctor
-    doctor_patients = db.query(DoctorPatient).filter(DoctorPatient.doctor_id == doctor.id).all()
-    patient_ids = [dp.patient_id for dp in doctor_patients]
+    patient_ids = get_doctor_patient_ids(db, doctor.id)
     
     # Get vital signs for those patients with the specified vital_sign_id
     return db.query(PatientVitalSigns).filter(
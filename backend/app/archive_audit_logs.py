@@ -0,0 +1,34 @@
+"""
+Move old audit rows from audit_logs into audit_logs_archive.
+
+Keeps the hot table (and its indexes) bounded to the last AUDIT_HOT_DAYS days so the
+recent-activity queries behind GET /audit-logs stay fast however much history accumulates.
+Meant to run from cron, e.g. nightly.
+
+Run from the repository root:
+    python -m backend.app.archive_audit_logs [--days 180] [--batch-size 5000]
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+from backend.app.core.config import SessionLocal
+from backend.app.services.audit_service import AUDIT_HOT_DAYS, archive_audit_logs
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=AUDIT_HOT_DAYS, help="Keep this many days in audit_logs")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows moved per transaction")
+    args = parser.parse_args()
+
+    before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=args.days)
+    db = SessionLocal()
+    try:
+        moved = archive_audit_logs(db, before=before, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"Archived {moved} audit rows created before {before:%Y-%m-%d %H:%M}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
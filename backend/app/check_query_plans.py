@@ -0,0 +1,204 @@
+"""
+Query-plan regression check for the hot read paths.
+
+Builds the schema from the SQLAlchemy models in a throwaway SQLite database,
+runs the real sync and async service/endpoint code against a few seed rows while capturing
+every SELECT, then runs EXPLAIN QUERY PLAN on each statement. Exits non-zero if
+any of them does a full scan of a table that grows with clinical usage.
+
+Run from the repository root:
+    python -m backend.app.check_query_plans
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from fastapi import Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from backend.app.core.config import Base
+from backend.app.models import (
+    Patient,
+    SymptomDict,
+    PatientSymptom,
+    PersonalHistoryDict,
+    PatientPersonalHistory,
+    VitalSignsDict,
+    PatientVitalSigns,
+    TestsDict,
+    PatientTests,
+    DoctorPatient,
+    Doctor,
+)
+from backend.app.models.appointment import Appointment
+from backend.app.models.audit_log import AuditLog, AuditLogArchive
+# Imported so the Patient/Doctor relationships resolve and every table exists for create_all
+from backend.app.models.patient_ignored_auto_generated import PatientIgnoredAutoGeneratedItem
+from backend.app.services import patient_service
+from backend.app.services.risk_scoring import load_features
+from backend.app.services.cohort_rollups import refresh_patients, doctor_cohorts_query
+from backend.app.services.appointment_calendar import lock_doctor_calendars, read_calendar_range
+from backend.app.api.v1.endpoints.patient import map_patient, read_patient
+from backend.app.api.v1.endpoints.audit_logs import get_audit_logs
+from backend.app.api.v1.endpoints.appointments import (
+    read_appointments_by_range, read_todays_appointments, read_free_slots, get_appointments_by_patient
+)
+
+# Tables that grow with patients/readings/time; catalogs and dictionaries are small enough to scan
+HOT_TABLES = {
+    "doctor_patient",
+    "patient_symptom",
+    "patient_personal_history",
+    "patient_vital_signs",
+    "patient_tests",
+    "patient_latest_tests",
+    "symptoms_decision_rules",
+    "personal_history_decision_rules",
+    "tests_decision_rules",
+    "vital_signs_decision_rules",
+    "audit_logs",
+    "audit_logs_archive",
+    "appointments",
+    "patient_risk_scores",
+    "patient_cohort_memberships",
+    "doctor_cohort_rollups",
+}
+
+def seed(db):
+    doctor = Doctor(first_name="Check", last_name="Plans", email="plans@example.com", username="auth0|plans", password_hash="")
+    patient = Patient(first_name="Jane", last_name="Doe", gender="Female", dob=date(1970, 1, 1))
+    db.add_all([doctor, patient])
+    db.flush()
+
+    db.add_all([
+        DoctorPatient(doctor_id=doctor.id, patient_id=patient.patient_id),
+        SymptomDict(symptom_id=1, name="Chest pain"),
+        PersonalHistoryDict(id=1, name="Hypertension"),
+        VitalSignsDict(vital_sign_id=1, name="Systolic BP"),
+        TestsDict(id="ldl", name="LDL"),
+    ])
+    db.flush()
+
+    now = datetime(2024, 1, 1, 9, 0)
+    db.add_all([
+        PatientSymptom(patient_id=patient.patient_id, symptom_id=1, recorded_at=now),
+        PatientPersonalHistory(patient_id=patient.patient_id, history_id=1, recorded_at=now),
+        PatientVitalSigns(patient_id=patient.patient_id, vital_sign_id=1, value="150", numeric_value=150.0,
+                          measurement_date=now.date(), recorded_at=now),
+        PatientTests(patient_id=patient.patient_id, test_id="ldl", test_date=now.date(), result_value="190", recorded_at=now),
+        Appointment(patient_id=patient.patient_id, datetime=now + timedelta(days=1), type="Follow-up"),
+        AuditLog(patient_id=patient.patient_id, doctor_id=doctor.id, action_type="CREATE",
+                 entity_type="PATIENT", action_details={}, created_at=now),
+        AuditLog(patient_id=patient.patient_id, doctor_id=doctor.id, action_type="UPDATE",
+                 entity_type="PATIENT", action_details={}, created_at=now + timedelta(hours=1)),
+        AuditLogArchive(id=1000, patient_id=patient.patient_id, doctor_id=doctor.id, action_type="CREATE",
+                        entity_type="SYMPTOM", action_details={}, created_at=now - timedelta(days=365)),
+    ])
+    db.flush()
+    patient_service.refresh_latest_test(db, patient.patient_id, "ldl")
+    db.commit()
+    return doctor, patient
+
+def run_hot_paths(db, doctor, patient):
+    map_patient(patient, db, doctor_id=doctor.id)
+    for prefix in ("follow_up_actions", "recommendations", "referrals", "risks", "lifestyle_advices", "presumptive_diagnoses"):
+        for source in ("symptoms", "personal_history", "tests", "vital_signs"):
+            getattr(patient_service, f"get_{prefix}_from_{source}")(db, patient.patient_id)
+    # Population scoring job: per-batch range reads of the latest vitals/tests
+    load_features(db, [db.get(Patient, patient.patient_id)], {"ap_hi": 1, "ap_lo": None, "cholesterol": "ldl", "gluc": None})
+    # Cohort counters: refresh after a write (twice, so it also diffs against counted buckets) and the dashboard read
+    refresh_patients(db, [patient.patient_id])
+    refresh_patients(db, [patient.patient_id])
+    db.execute(doctor_cohorts_query(doctor.id)).all()
+    # Booking conflict re-check inside the write transaction
+    lock_doctor_calendars(db, [patient.patient_id])
+    read_calendar_range(db, doctor.id, datetime(2024, 1, 2, 9), datetime(2024, 1, 2, 10))
+    db.rollback()
+
+async def run_async_hot_paths(adb, doctor, patient):
+    # Detached view of the doctor so endpoint code doesn't trigger lazy loads
+    current_doctor = SimpleNamespace(id=doctor.id)
+
+    await read_patient(patient_id=patient.patient_id, basic=False, db=adb, doctor=current_doctor)
+    audit_filters = dict(action_type=None, entity_type=None, start_date=None, end_date=None, limit=1,
+                         include_archived=False, db=adb, doctor=current_doctor)
+    response = Response()
+    await get_audit_logs(response, patient_id=None, cursor=None, **audit_filters)
+    await get_audit_logs(Response(), patient_id=None, cursor=response.headers["X-Next-Cursor"], **audit_filters)
+    await get_audit_logs(Response(), patient_id=patient.patient_id, cursor=None, **audit_filters)
+    await get_audit_logs(Response(), patient_id=None, cursor=None,
+                         **{**audit_filters, "start_date": date(2024, 1, 1), "end_date": date(2024, 1, 31), "include_archived": True})
+    await read_appointments_by_range(start_date=date(2024, 1, 1), end_date=date(2024, 1, 31), db=adb, doctor=current_doctor)
+    await read_todays_appointments(db=adb, doctor=current_doctor)
+    await read_free_slots(day=date(2024, 1, 2), start_hour=8, end_hour=18, duration_minutes=30, db=adb, doctor=current_doctor)
+    await get_appointments_by_patient(patient_id=patient.patient_id, db=adb, doctor=current_doctor)
+
+def full_scans(conn, statement, parameters):
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        # "SCAN t" / "SCAN t USING COVERING INDEX i" both read every row; "SEARCH" is an index lookup
+        if detail.startswith("SCAN "):
+            table = detail.split()[1]
+            if table in HOT_TABLES:
+                scans.append(detail)
+    return scans
+
+async def capture_queries(db_path: str, doctor, patient) -> list:
+    engine = create_engine(f"sqlite:///{db_path}")
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    run_hot_paths(db, doctor, patient)
+    db.close()
+
+    async with async_sessionmaker(bind=async_engine, expire_on_commit=False)() as adb:
+        await run_async_hot_paths(adb, doctor, patient)
+
+    await async_engine.dispose()
+    engine.dispose()
+    return captured
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "plans.db")
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(bind=engine)
+
+        db = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)()
+        doctor, patient = seed(db)
+        db.close()
+
+        captured = asyncio.run(capture_queries(db_path, doctor, patient))
+
+        failures = []
+        with engine.connect() as conn:
+            for statement, parameters in captured:
+                scans = full_scans(conn, statement, parameters)
+                if scans:
+                    failures.append((statement, scans))
+        engine.dispose()
+
+    print(f"Checked {len(captured)} queries")
+    for statement, scans in failures:
+        print("\nFull scan detected:")
+        for scan in scans:
+            print(f"  {scan}")
+        print(f"  in: {' '.join(statement.split())}")
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# core/db_router.py
+
+import asyncio
+import itertools
+import math
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from backend.app.core.config import (
+    DATABASE_REPLICA_URLS,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    DB_REPLICA_LAG_CHECK_SECONDS,
+    DB_READ_YOUR_WRITES_SECONDS,
+    AsyncSessionLocal,
+    create_async_db_engine,
+    _async_driver_url,
+)
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Set on successful writes, holding the write time (epoch ms). The client carries it, so any
+# worker (or host) serving the caller's next read knows to use the primary, and a token refresh
+# doesn't lose it. Forging it only costs the replica offload for that caller.
+LAST_WRITE_COOKIE = "last_write"
+
+def wrote_recently(request: Request, window: float = DB_READ_YOUR_WRITES_SECONDS) -> bool:
+    try:
+        written_at = int(request.cookies.get(LAST_WRITE_COOKIE, "")) / 1000
+    except ValueError:
+        return False
+    return time.time() - written_at < window
+
+class Replica:
+    """
+    One read replica: its async engine/session factory plus the last measured replication lag.
+    """
+    def __init__(self, db_engine: AsyncEngine):
+        self.engine = db_engine
+        self.sessionmaker = async_sessionmaker(bind=db_engine, autoflush=False, expire_on_commit=False)
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def measure_lag(self) -> Optional[float]:
+        """
+        Seconds behind the primary, 0 for engines that don't replicate (local SQLite files),
+        or None when the replica can't be reached or replication is stopped.
+        """
+        if self.engine.dialect.name != "mysql":
+            return 0.0
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(text("SHOW REPLICA STATUS"))).mappings().first()
+        if row is None:
+            # Not configured as a replica (e.g. a plain copy used for reporting)
+            return 0.0
+        lag = row.get("Seconds_Behind_Source")
+        return float(lag) if lag is not None else None
+
+    async def current_lag(self) -> Optional[float]:
+        if time.monotonic() - self.checked_at < DB_REPLICA_LAG_CHECK_SECONDS:
+            return self.lag_seconds
+        async with self._lock:
+            # Another request may have refreshed it while we waited
+            if time.monotonic() - self.checked_at < DB_REPLICA_LAG_CHECK_SECONDS:
+                return self.lag_seconds
+            try:
+                self.lag_seconds = await self.measure_lag()
+            except Exception as e:
+                print(f"Replica lag check failed: {e}")
+                self.lag_seconds = None
+            self.checked_at = time.monotonic()
+        return self.lag_seconds
+
+class ReadRouter:
+    """
+    Picks the session factory for a read-only request: a healthy replica in round-robin order,
+    or the primary when there are no replicas, all of them lag too much, or the caller wrote recently.
+    """
+    def __init__(self, replica_urls, primary_sessionmaker=AsyncSessionLocal,
+                 max_lag: float = DB_REPLICA_MAX_LAG_SECONDS):
+        self.primary = primary_sessionmaker
+        self.replicas = [Replica(create_async_db_engine(_async_driver_url(url))) for url in replica_urls]
+        self.max_lag = max_lag
+        self._next = itertools.count()
+
+    async def sessionmaker_for(self, recent_write: bool = False):
+        if not self.replicas or recent_write:
+            return self.primary
+
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            lag = await replica.current_lag()
+            if lag is not None and lag <= self.max_lag:
+                return replica.sessionmaker
+        return self.primary
+
+    async def status(self) -> list:
+        return [
+            {"url": r.engine.url.render_as_string(hide_password=True), "lag_seconds": await r.current_lag()}
+            for r in self.replicas
+        ]
+
+read_router = ReadRouter(DATABASE_REPLICA_URLS)
+
+async def track_writes(request: Request, call_next):
+    """
+    HTTP middleware: after a successful write, pin the caller's reads to the primary
+    for DB_READ_YOUR_WRITES_SECONDS so replica lag never hides their own changes.
+    """
+    response = await call_next(request)
+    if request.method in WRITE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            LAST_WRITE_COOKIE, str(int(time.time() * 1000)),
+            max_age=max(1, math.ceil(DB_READ_YOUR_WRITES_SECONDS)), httponly=True, samesite="lax",
+            secure=request.url.scheme == "https",
+        )
+    return response
@@ -1,4 +1,6 @@
-from backend.app.core.config import SessionLocal
+from fastapi import Request
+from backend.app.core.config import SessionLocal, AsyncSessionLocal
+from backend.app.core.db_router import read_router, wrote_recently
 
 def get_db():
     db = SessionLocal()
@@ -6,3 +8,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db(request: Request):
+    # Read-only endpoints: routed to a replica unless the caller just wrote (see core/db_router.py)
+    session_factory = await read_router.sessionmaker_for(wrote_recently(request))
+    async with session_factory() as db:
+        yield db
@@ -0,0 +1,121 @@
+# core/deps_access.py
+
+import os
+import time
+from fastapi import Depends, HTTPException
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.core.deps import get_db
+from backend.app.core.deps_doctor import get_current_doctor
+from backend.app.utils.lru_cache import LRUCache
+from backend.app.models.doctor import Doctor
+from backend.app.models.doctor_patient import DoctorPatient
+from backend.app.models.patient import Patient
+
+# doctor_id -> frozenset of assigned patient ids.
+# Only "allowed" answers are served from the cache: a patient id that isn't in the set is
+# re-checked against doctor_patient, so a patient assigned by another worker is never refused.
+PATIENT_ACCESS_CACHE_SIZE = int(os.getenv("PATIENT_ACCESS_CACHE_SIZE", "1000"))
+PATIENT_ACCESS_TTL_SECONDS = float(os.getenv("PATIENT_ACCESS_TTL_SECONDS", "60"))
+patient_access_cache = LRUCache(PATIENT_ACCESS_CACHE_SIZE)
+
+NOT_ASSIGNED = "This patient is not assigned to you"
+
+def invalidate_patient_access(doctor_id: int = None):
+    """
+    Forget one doctor's access set (or every doctor's) so the next check reloads it.
+    """
+    if doctor_id is None:
+        patient_access_cache.clear()
+    else:
+        patient_access_cache.pop(doctor_id)
+
+@event.listens_for(DoctorPatient, "after_insert")
+@event.listens_for(DoctorPatient, "after_delete")
+def _invalidate_changed_link(mapper, connection, target):
+    invalidate_patient_access(target.doctor_id)
+
+def _remember(doctor_id: int, patient_ids) -> frozenset:
+    ids = frozenset(patient_ids)
+    patient_access_cache.set(doctor_id, ids, expires_at=time.time() + PATIENT_ACCESS_TTL_SECONDS)
+    return ids
+
+def get_doctor_patient_ids(db: Session, doctor_id: int) -> frozenset:
+    ids = patient_access_cache.get(doctor_id)
+    if ids is None:
+        rows = db.query(DoctorPatient.patient_id).filter(DoctorPatient.doctor_id == doctor_id).all()
+        ids = _remember(doctor_id, (r.patient_id for r in rows))
+    return ids
+
+async def get_doctor_patient_ids_async(db: AsyncSession, doctor_id: int) -> frozenset:
+    ids = patient_access_cache.get(doctor_id)
+    if ids is None:
+        result = await db.execute(select(DoctorPatient.patient_id).where(DoctorPatient.doctor_id == doctor_id))
+        ids = _remember(doctor_id, result.scalars().all())
+    return ids
+
+def _link_query(doctor_id: int, patient_id: int):
+    return select(DoctorPatient.patient_id).where(
+        DoctorPatient.doctor_id == doctor_id,
+        DoctorPatient.patient_id == patient_id
+    )
+
+def doctor_can_access(db: Session, doctor_id: int, patient_id: int) -> bool:
+    if patient_id in get_doctor_patient_ids(db, doctor_id):
+        return True
+    if db.execute(_link_query(doctor_id, patient_id)).first() is None:
+        return False
+    invalidate_patient_access(doctor_id)  # assigned since the set was cached
+    return True
+
+async def doctor_can_access_async(db: AsyncSession, doctor_id: int, patient_id: int) -> bool:
+    if patient_id in await get_doctor_patient_ids_async(db, doctor_id):
+        return True
+    if (await db.execute(_link_query(doctor_id, patient_id))).first() is None:
+        return False
+    invalidate_patient_access(doctor_id)
+    return True
+
+def ensure_patient_access(db: Session, doctor: Doctor, patient_id: int, detail: str = NOT_ASSIGNED):
+    if not doctor_can_access(db, doctor.id, patient_id):
+        raise HTTPException(status_code=403, detail=detail)
+
+async def ensure_patient_access_async(db: AsyncSession, doctor: Doctor, patient_id: int, detail: str = NOT_ASSIGNED):
+    if not await doctor_can_access_async(db, doctor.id, patient_id):
+        raise HTTPException(status_code=403, detail=detail)
+
+def get_accessible_patient(db: Session, doctor: Doctor, patient_id: int, detail: str = NOT_ASSIGNED) -> Patient:
+    """
+    Authorize `patient_id` for the doctor and return its Patient row (403 / 404 otherwise).
+    """
+    ensure_patient_access(db, doctor, patient_id, detail)
+    patient = db.get(Patient, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return patient
+
+async def get_accessible_patient_async(db: AsyncSession, doctor: Doctor, patient_id: int,
+                                       detail: str = NOT_ASSIGNED) -> Patient:
+    await ensure_patient_access_async(db, doctor, patient_id, detail)
+    patient = await db.get(Patient, patient_id)
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return patient
+
+# Route dependencies for endpoints with a {patient_id} path parameter
+
+def authorized_patient_id(
+        patient_id: int,
+        db: Session = Depends(get_db),
+        doctor: Doctor = Depends(get_current_doctor)
+) -> int:
+    ensure_patient_access(db, doctor, patient_id)
+    return patient_id
+
+def authorized_patient(
+        patient_id: int,
+        db: Session = Depends(get_db),
+        doctor: Doctor = Depends(get_current_doctor)
+) -> Patient:
+    return get_accessible_patient(db, doctor, patient_id)
@@ -1,12 +1,54 @@
 # core/deps_doctor.py
 
+import os
+import time
 from fastapi import Depends, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from backend.app.core.deps import get_db
 from backend.app.utils.auth import get_token_auth_header, verify_jwt
+from backend.app.utils.lru_cache import LRUCache
 from backend.app.models.doctor import Doctor
 from fastapi import HTTPException
 
+# Auth0 sub -> Doctor column values, so repeat callers don't hit the doctors table.
+# Changes made through the ORM invalidate it; the TTL bounds staleness across worker processes.
+DOCTOR_CACHE_SIZE = int(os.getenv("DOCTOR_CACHE_SIZE", "1000"))
+DOCTOR_CACHE_TTL_SECONDS = float(os.getenv("DOCTOR_CACHE_TTL_SECONDS", "300"))
+doctor_cache = LRUCache(DOCTOR_CACHE_SIZE)
+
+_DOCTOR_FIELDS = [column.key for column in Doctor.__table__.columns]
+
+def invalidate_doctor_cache(username: str = None):
+    """
+    Drop one cached doctor (by Auth0 sub) or, without an argument, all of them.
+    """
+    if username is None:
+        doctor_cache.clear()
+    else:
+        doctor_cache.pop(username)
+
+@event.listens_for(Doctor, "after_update")
+@event.listens_for(Doctor, "after_delete")
+def _invalidate_changed_doctor(mapper, connection, target):
+    invalidate_doctor_cache(target.username)
+    # A username change leaves the old key behind
+    for old_username in inspect(target).attrs.username.history.deleted:
+        invalidate_doctor_cache(old_username)
+
+def _remember_doctor(doctor: Doctor):
+    fields = {name: getattr(doctor, name) for name in _DOCTOR_FIELDS}
+    doctor_cache.set(doctor.username, fields, expires_at=time.time() + DOCTOR_CACHE_TTL_SECONDS)
+
+def _cached_doctor(db: Session, auth0_user_id: str):
+    fields = doctor_cache.get(auth0_user_id)
+    if fields is None:
+        return None
+    # Attach to this request's session without a SELECT, so it behaves like a queried row
+    doctor = Doctor(**fields)
+    make_transient_to_detached(doctor)
+    return db.merge(doctor, load=False)
+
 def get_current_doctor(request: Request, db: Session = Depends(get_db)):
     token = get_token_auth_header(request)
     payload = verify_jwt(token)
@@ -15,6 +57,10 @@ def get_current_doctor(request: Request, db: Session = Depends(get_db)):
     if not auth0_user_id:
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
+    doctor = _cached_doctor(db, auth0_user_id)
+    if doctor:
+        return doctor
+
     doctor = db.query(Doctor).filter(Doctor.username == auth0_user_id).first()
 
     if not doctor:
@@ -40,5 +86,5 @@ def get_current_doctor(request: Request, db: Session = Depends(get_db)):
         db.commit()
         db.refresh(doctor)
 
+    _remember_doctor(doctor)
     return doctor
-
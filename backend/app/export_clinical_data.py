@@ -0,0 +1,70 @@
+"""
+Export clinical data (patients, vital signs, tests, symptoms, personal history, summary items) to columnar files.
+
+One file per dataset is written into the output directory: Parquet or Arrow IPC when pyarrow
+is installed, gzip CSV otherwise. Rows are read from EXPORT_DATABASE_URL (the first read
+replica by default) with server-side cursors and written EXPORT_CHUNK_ROWS at a time, so the
+export neither loads the primary nor holds the result set in memory.
+
+Run from the repository root:
+    python -m backend.app.export_clinical_data exports/ --doctor 12 [--format parquet] [--anonymous]
+    python -m backend.app.export_clinical_data exports/ --all-patients --dataset vital_signs --dataset tests
+"""
+import argparse
+import os
+import sys
+import time
+from backend.app.core.config import SessionLocal
+from backend.app.models.doctor import Doctor
+from backend.app.services.clinical_export import (
+    DEFAULT_EXPORT_FORMAT,
+    EXPORT_CHUNK_ROWS,
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    export_clinical_data,
+    format_available,
+)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", help="Output directory (created if missing)")
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument("--doctor", help="Doctor id or username whose patients are exported")
+    scope.add_argument("--all-patients", action="store_true", help="Export every patient")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=DEFAULT_EXPORT_FORMAT)
+    parser.add_argument("--dataset", action="append", choices=EXPORT_DATASETS, dest="datasets",
+                        help="Dataset to export (repeatable); defaults to all of them")
+    parser.add_argument("--anonymous", action="store_true", help="Leave out names, contact and social details, and any typed-in text")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS, help="Rows per fetch and written batch")
+    args = parser.parse_args()
+
+    if not format_available(args.format):
+        print(f"The {args.format} format needs pyarrow installed; use --format csv")
+        return 1
+
+    doctor_id = None
+    if args.doctor:
+        db = SessionLocal()
+        try:
+            doctor_filter = Doctor.id == int(args.doctor) if args.doctor.isdigit() else Doctor.username == args.doctor
+            doctor_id = db.query(Doctor.id).filter(doctor_filter).scalar()
+        finally:
+            db.close()
+        if doctor_id is None:
+            print(f"Doctor {args.doctor} not found")
+            return 1
+
+    os.makedirs(args.directory, exist_ok=True)
+    started = time.monotonic()
+    written = export_clinical_data(
+        doctor_id, args.directory, args.format, tuple(dict.fromkeys(args.datasets or EXPORT_DATASETS)),
+        anonymous=args.anonymous, chunk_rows=args.chunk_rows,
+    )
+    for name, (filename, count, seconds) in written.items():
+        print(f"  {name}: {count} rows in {seconds:.1f}s ({filename})")
+    total = sum(count for _filename, count, _seconds in written.values())
+    print(f"Exported {total} rows into {len(written)} files in {time.monotonic() - started:.1f}s ({args.directory})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
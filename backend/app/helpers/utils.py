@@ -1,9 +1,16 @@
+import math
+
 def parse_float_or_none(value):
     try:
         return float(value)
     except (ValueError, TypeError):
         return None
 
+def parse_finite_float_or_none(value):
+    # For values stored in a DOUBLE column: MySQL can't hold "nan" or "inf", which float() accepts
+    number = parse_float_or_none(value)
+    return number if number is not None and math.isfinite(number) else None
+
 def compare_values(patient_value, min_value_str, max_value_str):
     if min_value_str and min_value_str.strip().startswith(">="):
         threshold = parse_float_or_none(min_value_str.strip()[2:])
@@ -0,0 +1,73 @@
+"""
+Import patients (with optional initial vitals and tests) from a CSV or NDJSON file for a doctor.
+
+The file is read as a stream and written IMPORT_CHUNK_SIZE records per transaction with bulk
+statements: patients, doctor links, readings, the latest-test projection and audit rows.
+Records that fail validation are printed with their line number and skipped. Patients imported
+with readings then go through decision-rule auto-population, as with the single-reading endpoints.
+
+CSV columns are the patient fields (first_name, last_name, gender, dob, ethnicity, phone, ...),
+plus "vital:<name or id>" / "test:<name or id>" columns for readings dated measurement_date /
+test_date (default today). NDJSON records may instead carry "vitals" and "tests" lists.
+
+Run from the repository root:
+    python -m backend.app.import_patients patients.csv --doctor 12 [--format csv] [--skip-rules]
+"""
+import argparse
+import os
+import sys
+import time
+from backend.app.core.config import SessionLocal
+from backend.app.models.doctor import Doctor
+from backend.app.services.patient_import import (
+    IMPORT_CHUNK_SIZE,
+    READERS,
+    format_for_filename,
+    import_patients,
+)
+from backend.app.services.patient_service import auto_populate_patients
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="CSV or NDJSON file")
+    parser.add_argument("--doctor", required=True, help="Doctor id or username the patients are assigned to")
+    parser.add_argument("--format", choices=sorted(READERS), help="Defaults from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Records per transaction")
+    parser.add_argument("--skip-rules", action="store_true",
+                        help="Don't run decision-rule auto-population for patients imported with readings")
+    args = parser.parse_args()
+
+    file_format = args.format or format_for_filename(args.path)
+    if file_format is None:
+        print("Unknown file type; pass --format csv or --format ndjson")
+        return 1
+
+    db = SessionLocal()
+    try:
+        doctor_filter = Doctor.id == int(args.doctor) if args.doctor.isdigit() else Doctor.username == args.doctor
+        doctor = db.query(Doctor).filter(doctor_filter).first()
+        if doctor is None:
+            print(f"Doctor {args.doctor} not found")
+            return 1
+        doctor_id = doctor.id
+
+        started = time.monotonic()
+        with open(args.path, "rb") as f:
+            report, with_readings = import_patients(db, doctor_id, READERS[file_format](f), chunk_size=args.chunk_size)
+        print(f"Imported {report['imported']} patients, {report['failed']} rows failed "
+              f"in {time.monotonic() - started:.1f}s ({os.path.basename(args.path)})")
+        for error in report["errors"]:
+            print(f"  line {error['line']}: {'; '.join(error['errors'])}")
+        if report["errors_truncated"]:
+            print("  (more errors not listed)")
+    finally:
+        db.close()
+
+    if with_readings and not args.skip_rules:
+        started = time.monotonic()
+        auto_populate_patients(with_readings, doctor_id)
+        print(f"Evaluated rules for {len(with_readings)} patients in {time.monotonic() - started:.1f}s")
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,3 @@
-import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from backend.app.models.patient import Patient
 from backend.app.models.symptom_dict import SymptomDict
 from backend.app.models.patient_symptom import PatientSymptom
@@ -10,6 +7,7 @@ from backend.app.models.vital_signs_dict import VitalSignsDict
 from backend.app.models.patient_vital_signs import PatientVitalSigns
 from backend.app.models.tests_dict import TestsDict
 from backend.app.models.patient_tests import PatientTests
+from backend.app.models.patient_latest_tests import PatientLatestTests
 from backend.app.models.follow_up_actions_catalog import FollowUpActionCatalog
 from backend.app.models.patient_follow_up_action import PatientFollowUpAction
 from backend.app.models.recommendations_catalog import RecommendationsCatalog
@@ -25,25 +23,7 @@ from backend.app.models.vital_signs_decision_rules import VitalSignsDecisionRule
 from backend.app.models.doctor import Doctor
 from backend.app.models.doctor_patient import DoctorPatient
 from backend.app.models.appointment import Appointment
-from backend.app.api.v1.db import Base
-
-# Azure MySQL configuration
-DB_USERNAME = "m_khlifi"
-DB_PASSWORD = "Tunis%401994"
-DB_HOST = "my-server-iset.mysql.database.azure.com"
-DB_NAME = "deepcardio"
-
-# Path to DigiCert CA
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # -> backend/app/
-SSL_CA_PATH = os.path.join(BASE_DIR, "..", "certs", "DigiCertGlobalRootCA.crt.pem")
-
-DATABASE_URL = (
-    f"mysql+pymysql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
-    f"?ssl_ca={SSL_CA_PATH}&ssl_verify_cert=false"
-)
-
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from backend.app.core.config import Base, engine
 
 def init_db():
     Base.metadata.create_all(bind=engine)
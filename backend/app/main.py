@@ -5,7 +5,13 @@ from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 import uvicorn
 import os
-from backend.app.api.v1.endpoints import health, patient, symptoms, vital_signs, personal_history, tests, doctors, appointments, predict, email, audit_logs, chat, follow_up_actions, patient_recommendations, patient_referrals, patient_lifestyle_advices, patient_presumptive_diagnoses, patient_tests_to_order, patient_prescriptions, ignored_auto_generated
+from backend.app.core.db_router import track_writes
+from backend.app.services.audit_service import audit_sink
+from backend.app.services.llm_client import llm_client
+from backend.app.services.email_outbox import email_sender
+from backend.app.services.patient_report import shutdown_report_pool
+from backend.app.services.cohort_rollups import cohort_refresher
+from backend.app.api.v1.endpoints import health, patient, symptoms, vital_signs, personal_history, tests, doctors, appointments, predict, email, audit_logs, chat, follow_up_actions, patient_recommendations, patient_referrals, patient_lifestyle_advices, patient_presumptive_diagnoses, patient_tests_to_order, patient_prescriptions, ignored_auto_generated, patient_reports, cohorts, patient_import, clinical_export
 
 # Load environment variables from .env file
 load_dotenv()
@@ -27,10 +33,57 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Conversation-Id"],
 )
 
+# Pin a caller's reads to the primary for a short while after they write (read-replica routing)
+app.middleware("http")(track_writes)
+
+@app.on_event("startup")
+def start_audit_writer():
+    audit_sink.start()
+
+@app.on_event("shutdown")
+def stop_audit_writer():
+    # Flush buffered audit events before the worker exits
+    audit_sink.stop()
+
+@app.on_event("startup")
+def start_email_sender():
+    # Delivers queued /send-email jobs, including ones left over from a previous run
+    email_sender.start()
+
+@app.on_event("shutdown")
+def stop_email_sender():
+    email_sender.stop()
+
+@app.on_event("startup")
+def start_cohort_refresher():
+    # Applies committed clinical changes to the per-doctor cohort counters
+    cohort_refresher.start()
+
+@app.on_event("shutdown")
+def stop_cohort_refresher():
+    cohort_refresher.stop()
+
+@app.on_event("startup")
+async def open_llm_client():
+    # One pooled connection set to the completions API per worker
+    await llm_client.start()
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    await llm_client.aclose()
+
+@app.on_event("shutdown")
+def stop_report_pool():
+    # Report render workers are started on first use
+    shutdown_report_pool()
+
 app.include_router(health.router, prefix="/api/v1")
 app.include_router(patient.patient_router, prefix="/api/v1", tags=["Patients"])
+app.include_router(patient_import.patient_import_router, prefix="/api/v1", tags=["Patients"])
+app.include_router(patient_reports.patient_reports_router, prefix="/api/v1", tags=["Patient Reports"])
 app.include_router(symptoms.symptoms_router, prefix="/api/v1", tags=["Symptoms"])
 app.include_router(vital_signs.vital_signs_router, prefix="/api/v1", tags=["Vital Signs"])
 app.include_router(personal_history.personal_history_router, prefix="/api/v1", tags=["Personal History"])
@@ -38,6 +91,8 @@ app.include_router(tests.tests_router, prefix="/api/v1", tags=["Tests"])
 app.include_router(doctors.doctors_router, prefix="/api/v1", tags=["Doctors"])
 app.include_router(appointments.appointments_router, prefix="/api/v1", tags=["Appointments"])
 app.include_router(predict.router, prefix="/api/v1", tags=["Predictions"])
+app.include_router(cohorts.cohorts_router, prefix="/api/v1", tags=["Cohorts"])
+app.include_router(clinical_export.clinical_export_router, prefix="/api/v1", tags=["Exports"])
 app.include_router(email.router, prefix="/api/v1", tags=["Email"])
 app.include_router(audit_logs.audit_logs_router, prefix="/api/v1", tags=["Audit Logs"])
 app.include_router(chat.router, prefix="/api/v1", tags=["Chat"])
@@ -7,6 +7,7 @@ from backend.app.models.vital_signs_dict import VitalSignsDict
 from backend.app.models.patient_vital_signs import PatientVitalSigns
 from backend.app.models.tests_dict import TestsDict
 from backend.app.models.patient_tests import PatientTests
+from backend.app.models.patient_latest_tests import PatientLatestTests
 from backend.app.models.follow_up_actions_catalog import FollowUpActionCatalog
 from backend.app.models.personal_history_decision_rules import PersonalHistoryDecisionRule
 from backend.app.models.tests_decision_rules import TestsDecisionRule
@@ -26,4 +27,9 @@ from backend.app.models.patient_referrals import PatientReferrals
 from backend.app.models.patient_lifestyle_advices import PatientLifestyleAdvices
 from backend.app.models.patient_presumptive_diagnoses import PatientPresumptiveDiagnoses
 from backend.app.models.patient_tests_to_order import PatientTestsToOrder
-from backend.app.models.patient_prescriptions import PatientPrescriptions
\ No newline at end of file
+from backend.app.models.patient_prescriptions import PatientPrescriptions
+from backend.app.models.patient_risk_score import PatientRiskScore
+from backend.app.models.patient_prediction import PatientPrediction
+from backend.app.models.doctor_cohort_rollup import DoctorCohortRollup
+from backend.app.models.patient_cohort_membership import PatientCohortMembership
+from backend.app.models import patient_revision
@@ -1,5 +1,5 @@
 # File: models/appointment.py
-from sqlalchemy import Column, Integer, DateTime, String, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, String, ForeignKey, Index
 from backend.app.core.config import Base
 
 class Appointment(Base):
@@ -21,3 +21,8 @@ class Appointment(Base):
         String(50),
         nullable=False,
     )
+
+    __table_args__ = (
+        Index("idx_appointments_datetime", "appointment_datetime"),
+        Index("idx_appointments_patient_datetime", "patient_id", "appointment_datetime"),
+    )
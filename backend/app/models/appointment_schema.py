@@ -1,6 +1,7 @@
 # File: models/appointment_schema.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List, Literal, Optional
 
 class AppointmentBase(BaseModel):
     patient_id: int
@@ -15,6 +16,20 @@ class AppointmentUpdate(BaseModel):
     datetime: datetime
     type: str
 
+class AppointmentRecurrence(BaseModel):
+    # e.g. every 3 months for 2 years: start, every=3, unit="months", until=start + 2 years
+    start: datetime
+    every: int = Field(1, ge=1)
+    unit: Literal["days", "weeks", "months"]
+    count: Optional[int] = Field(None, ge=1)   # number of occurrences, including start
+    until: Optional[datetime] = None           # last possible occurrence (inclusive)
+
+class AppointmentBulkCreate(BaseModel):
+    patient_id: int
+    type: str
+    datetimes: List[datetime] = []             # explicit start times
+    recurrence: Optional[AppointmentRecurrence] = None
+
 class AppointmentResponse(AppointmentBase):
     id: int
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
 from backend.app.core.config import Base
 from datetime import datetime, timezone
 
@@ -13,24 +13,36 @@ class AuditLog(Base):
     action_details = Column(JSON, nullable=True)
     description = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("idx_audit_logs_patient_created", "patient_id", "created_at"),
+        Index("idx_audit_logs_created_id", "created_at", "id"),
+    )
     
     @staticmethod
     def log_event(db, doctor_id: int, action_type: str, entity_type: str, patient_id: int, description: str, action_details: dict = None):
-        """Log an audit event to the database"""
-        try:
-            audit_log = AuditLog(
-                doctor_id=doctor_id,
-                action_type=action_type,
-                entity_type=entity_type,
-                patient_id=patient_id,
-                description=description,
-                action_details=action_details
-            )
-            db.add(audit_log)
-            db.commit()
-            return audit_log
-        except Exception as e:
-            db.rollback()
-            print(f"Error logging audit event: {str(e)}")
-            # Don't fail the main operation if audit logging fails
-            return None
\ No newline at end of file
+        """Log an audit event through the buffered audit writer (see services/audit_service.py)"""
+        from backend.app.services.audit_service import record_audit_event
+        record_audit_event(db, doctor_id, action_type, entity_type, patient_id, description, action_details)
+
+
+class AuditLogArchive(Base):
+    """
+    Audit rows older than the hot window, moved out of `audit_logs` by archive_audit_logs.
+    Same columns; (id, created_at) is the key so MySQL can partition the table by month.
+    """
+    __tablename__ = "audit_logs_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    patient_id = Column(Integer, nullable=False)
+    doctor_id = Column(Integer, nullable=False)
+    action_type = Column(String(50), nullable=False)
+    entity_type = Column(String(50), nullable=False)
+    action_details = Column(JSON, nullable=True)
+    description = Column(String(255), nullable=True)
+    created_at = Column(DateTime, primary_key=True)
+
+    __table_args__ = (
+        Index("idx_audit_logs_archive_patient_created", "patient_id", "created_at"),
+        Index("idx_audit_logs_archive_created_id", "created_at", "id"),
+    )
@@ -0,0 +1,26 @@
+# File: models/cohort_schema.py
+from pydantic import BaseModel
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+class CohortDimension(str, Enum):
+    # Every patient is in exactly one age_group and one risk_level bucket, and in one bucket per
+    # active symptom and per vital whose latest reading is outside the catalog's normal range
+    AGE_GROUP = "age_group"
+    RISK_LEVEL = "risk_level"
+    SYMPTOM = "symptom"
+    ABNORMAL_VITAL = "abnormal_vital"
+
+class CohortBucket(BaseModel):
+    bucket: str
+    patient_count: int
+
+class CohortBreakdown(BaseModel):
+    dimension: CohortDimension
+    buckets: List[CohortBucket]
+
+class CohortSummary(BaseModel):
+    total_patients: int
+    updated_at: Optional[datetime]  # last counter change; None before the first refresh
+    dimensions: List[CohortBreakdown]
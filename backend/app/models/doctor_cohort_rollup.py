@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, PrimaryKeyConstraint
+from backend.app.core.config import Base
+
+class DoctorCohortRollup(Base):
+    """
+    Number of a doctor's patients in each cohort bucket (e.g. dimension "age_group", bucket
+    "45_to_60"), kept up to date by services/cohort_rollups.py so dashboards never map patients.
+    """
+    __tablename__ = "doctor_cohort_rollups"
+
+    doctor_id = Column(Integer, nullable=False)
+    dimension = Column(String(30), nullable=False)
+    bucket = Column(String(150), nullable=False)
+    patient_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("doctor_id", "dimension", "bucket"),
+    )
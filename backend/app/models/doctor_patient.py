@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy import Column, Integer, ForeignKey, PrimaryKeyConstraint, Index
 from backend.app.core.config import Base
 
 class DoctorPatient(Base):
@@ -9,4 +9,6 @@ class DoctorPatient(Base):
 
     __table_args__ = (
         PrimaryKeyConstraint("doctor_id", "patient_id"),
+        # Patient -> doctors lookups (cohort counter refresh)
+        Index("idx_doctor_patient_patient", "patient_id"),
     )
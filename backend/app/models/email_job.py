@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, LargeBinary, Index
+from backend.app.core.config import Base
+from datetime import datetime, timezone
+
+class EmailJob(Base):
+    """
+    One outgoing email in the outbox. Rows are written by the API and delivered by the
+    background sender (services/email_outbox.py), which retries failures with backoff.
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    requested_by = Column(String(255), nullable=True)  # Auth0 sub of the sender
+    patient_id = Column(Integer, nullable=True)
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html = Column(Text, nullable=False)
+    attachment_filename = Column(String(255), nullable=True)
+    attachment_content_type = Column(String(100), nullable=True)
+    attachment = Column(LargeBinary(length=2**32 - 1), nullable=True)  # LONGBLOB on MySQL
+
+    status = Column(String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    # When a pending job may next be tried, or when a claimed ("sending") job's lease runs out
+    next_attempt_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    last_error = Column(Text, nullable=True)
+    provider_id = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_email_outbox_status_next", "status", "next_attempt_at"),
+    )
@@ -1,5 +1,20 @@
-
 from pydantic import BaseModel
+from typing import Optional
 
 class HealthResponse(BaseModel):
     status: str
+
+class DbPoolResponse(BaseModel):
+    pool_class: str
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    checked_in: Optional[int] = None
+    overflow: Optional[int] = None
+    checkouts: Optional[int] = None
+    timeouts: Optional[int] = None
+    avg_wait_ms: Optional[float] = None
+    max_wait_ms: Optional[float] = None
+
+class DbReplicaResponse(BaseModel):
+    url: str
+    lag_seconds: Optional[float] = None
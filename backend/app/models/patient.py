@@ -24,6 +24,10 @@ class Patient(Base):
     smoke = Column(Integer, nullable=False, default=0)
     alco = Column(Integer, nullable=False, default=0)
     active = Column(Integer, nullable=False, default=1)
+
+    # Bumped whenever the patient or any of their clinical rows change (see models/patient_revision.py),
+    # so caches of derived data can be keyed by (patient_id, revision)
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     ignored_auto_generated_items = relationship("PatientIgnoredAutoGeneratedItem", back_populates="patient")
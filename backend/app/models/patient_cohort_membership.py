@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, PrimaryKeyConstraint, Index
+from backend.app.core.config import Base
+
+class PatientCohortMembership(Base):
+    """
+    The cohort buckets a patient is currently counted in, per linked doctor: exactly what
+    doctor_cohort_rollups holds for them, so a refresh can apply the difference.
+    No foreign keys on purpose: rows of deleted patients or links stay until the refresher
+    has subtracted them from the counters.
+    """
+    __tablename__ = "patient_cohort_memberships"
+
+    doctor_id = Column(Integer, nullable=False)
+    patient_id = Column(Integer, nullable=False)
+    dimension = Column(String(30), nullable=False)
+    bucket = Column(String(150), nullable=False)
+    patient_revision = Column(Integer, nullable=False)  # patients.revision the buckets were computed at
+    refreshed_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("doctor_id", "patient_id", "dimension", "bucket"),
+        Index("idx_patient_cohort_memberships_patient", "patient_id", "dimension"),
+    )
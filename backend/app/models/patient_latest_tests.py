@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Date, Text, DateTime, ForeignKey, PrimaryKeyConstraint
+from backend.app.core.config import Base
+
+class PatientLatestTests(Base):
+    """
+    Projection of the newest unresolved `patient_tests` row per (patient_id, test_id).
+    Maintained by the tests endpoints in the same transaction as the write.
+    """
+    __tablename__ = "patient_latest_tests"
+
+    patient_id = Column(Integer, ForeignKey("patients.patient_id", ondelete="CASCADE"), nullable=False)
+    test_id = Column(String(100), ForeignKey("tests_dict.id", ondelete="CASCADE"), nullable=False)
+    patient_test_id = Column(Integer, ForeignKey("patient_tests.id", ondelete="CASCADE"), nullable=False)
+    test_date = Column(Date, nullable=True)
+    result_value = Column(String(50), nullable=True)
+    notes = Column(Text, nullable=True)
+    recorded_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("patient_id", "test_id"),
+    )
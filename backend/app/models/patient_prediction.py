@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+from backend.app.core.config import Base
+
+class PatientPrediction(Base):
+    """
+    Append-only history of CardioModel scores per patient, for trend views.
+    Written only by the scoring job, whenever a patient's inputs or the model change.
+    """
+    __tablename__ = "patient_predictions"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    patient_id = Column(Integer, ForeignKey("patients.patient_id", ondelete="CASCADE"), nullable=False)
+    model_name = Column(String(50), nullable=False)
+    model_version = Column(String(20), nullable=False)
+    probability = Column(Float, nullable=False)  # probability of cardiovascular disease
+    prediction = Column(Integer, nullable=False)  # 1 = Disease, 0 = Healthy
+    source = Column(String(20), nullable=False)  # "job" (score_patients)
+    patient_revision = Column(Integer, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("idx_patient_predictions_patient_model_created", "patient_id", "model_name", "created_at"),
+    )
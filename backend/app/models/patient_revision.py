@@ -0,0 +1,82 @@
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from backend.app.models.patient import Patient
+from backend.app.models.patient_symptom import PatientSymptom
+from backend.app.models.patient_personal_history import PatientPersonalHistory
+from backend.app.models.patient_vital_signs import PatientVitalSigns
+from backend.app.models.patient_tests import PatientTests
+from backend.app.models.patient_latest_tests import PatientLatestTests
+from backend.app.models.patient_follow_up_action import PatientFollowUpAction
+from backend.app.models.patient_recommendations import PatientRecommendations
+from backend.app.models.patient_referrals import PatientReferrals
+from backend.app.models.patient_lifestyle_advices import PatientLifestyleAdvices
+from backend.app.models.patient_presumptive_diagnoses import PatientPresumptiveDiagnoses
+from backend.app.models.patient_tests_to_order import PatientTestsToOrder
+from backend.app.models.patient_prescriptions import PatientPrescriptions
+from backend.app.models.patient_ignored_auto_generated import PatientIgnoredAutoGeneratedItem
+
+# Rows that are part of a patient's clinical picture; any insert, update or delete of one
+# bumps patients.revision once per flush
+PATIENT_SCOPED_MODELS = (
+    PatientSymptom,
+    PatientPersonalHistory,
+    PatientVitalSigns,
+    PatientTests,
+    PatientLatestTests,
+    PatientFollowUpAction,
+    PatientRecommendations,
+    PatientReferrals,
+    PatientLifestyleAdvices,
+    PatientPresumptiveDiagnoses,
+    PatientTestsToOrder,
+    PatientPrescriptions,
+    PatientIgnoredAutoGeneratedItem,
+)
+
+def bump_patient_revision(db: Session, patient_ids):
+    """
+    Mark patients as changed. Needed only after Core-level writes the ORM flush doesn't see.
+    """
+    patient_ids = sorted(set(patient_ids))
+    if patient_ids:
+        db.info.setdefault("revised_patient_ids", set()).update(patient_ids)
+        db.execute(
+            update(Patient)
+            .where(Patient.patient_id.in_(patient_ids))
+            .values(revision=Patient.revision + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+@event.listens_for(Session, "after_flush")
+def _bump_changed_patients(session, flush_context):
+    # new/dirty/deleted still describe what this flush wrote
+    changed = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, PATIENT_SCOPED_MODELS):
+            changed.add(obj.patient_id)
+        elif isinstance(obj, Patient) and obj not in session.new and obj not in session.deleted \
+                and session.is_modified(obj, include_collections=False):
+            changed.add(obj.patient_id)
+    changed.discard(None)
+    if not changed:
+        return
+
+    session.connection().execute(
+        update(Patient.__table__)
+        .where(Patient.__table__.c.patient_id.in_(sorted(changed)))
+        .values(revision=Patient.__table__.c.revision + 1)
+    )
+    session.info.setdefault("bumped_patient_ids", set()).update(changed)
+    # Everything changed in this transaction; taken after commit by listeners that refresh
+    # derived data (services/cohort_rollups.py). Only a hint, so it isn't cleared on rollback.
+    session.info.setdefault("revised_patient_ids", set()).update(changed)
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_bumped_revisions(session, flush_context):
+    # Loaded Patient objects reload the new number on next access
+    changed = session.info.pop("bumped_patient_ids", None)
+    if not changed:
+        return
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Patient) and obj.patient_id in changed:
+            session.expire(obj, ["revision"])
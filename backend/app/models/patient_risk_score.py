@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, PrimaryKeyConstraint
+from backend.app.core.config import Base
+
+class PatientRiskScore(Base):
+    """
+    Latest CardioModel score per (patient, model), written by the population scoring job
+    (services/risk_scoring.py) so dashboards read scores instead of running the models.
+    """
+    __tablename__ = "patient_risk_scores"
+
+    patient_id = Column(Integer, ForeignKey("patients.patient_id", ondelete="CASCADE"), nullable=False)
+    model_name = Column(String(50), nullable=False)
+    model_version = Column(String(20), nullable=False)
+    probability = Column(Float, nullable=False)  # probability of cardiovascular disease
+    prediction = Column(Integer, nullable=False)  # 1 = Disease, 0 = Healthy
+    missing_features = Column(String(100), nullable=True)  # features filled with defaults, comma-separated
+    features_hash = Column(String(16), nullable=True)  # fingerprint of the inputs, see risk_scoring.feature_fingerprints
+    patient_revision = Column(Integer, nullable=False)  # patients.revision the features were read at
+    scored_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("patient_id", "model_name"),
+    )
@@ -140,3 +140,18 @@ class PatientCreate(BaseModel):
     smoke: Optional[int] = 0
     alco: Optional[int] = 0
     active: Optional[int] = 1
+
+class PatientImportError(BaseModel):
+    line: int  # line in the uploaded file (the CSV header is line 1)
+    errors: List[str]
+
+class PatientImportReport(BaseModel):
+    imported: int
+    failed: int
+    patient_ids: List[int]
+    errors: List[PatientImportError]
+    errors_truncated: bool = False  # more rows failed than are listed
+
+class PatientReportBatch(BaseModel):
+    patient_ids: List[int]
+    anonymous: bool = False
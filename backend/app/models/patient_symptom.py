@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from backend.app.core.config import Base
 
@@ -10,4 +10,8 @@ class PatientSymptom(Base):
     symptom_id = Column(Integer, ForeignKey("symptom_dict.symptom_id", ondelete="CASCADE"), nullable=False)
     onset_date = Column(Date, nullable=True)
     recorded_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
-    resolved_at = Column(DateTime, nullable=True)
\ No newline at end of file
+    resolved_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_patient_symptom_patient", "patient_id", "symptom_id"),
+    )
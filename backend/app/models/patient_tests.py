@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from backend.app.core.config import Base
 
@@ -12,4 +12,8 @@ class PatientTests(Base):
     result_value = Column(String(50), nullable=True)
     notes = Column(Text, nullable=True)
     recorded_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
-    resolved_at = Column(DateTime, nullable=True)
\ No newline at end of file
+    resolved_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_patient_tests_patient_test", "patient_id", "test_id", "recorded_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, String, Float, Index
 from sqlalchemy.sql import func
 from backend.app.core.config import Base
 
@@ -10,5 +10,10 @@ class PatientVitalSigns(Base):
     vital_sign_id = Column(Integer, ForeignKey("vital_signs_dict.vital_sign_id", ondelete="CASCADE"), nullable=False)
     measurement_date = Column(Date, nullable=True)
     value = Column(String(20), nullable=True)
+    numeric_value = Column(Float, nullable=True)  # parsed copy of `value`, NULL when not numeric
     recorded_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
-    resolved_at = Column(DateTime, nullable=True)
\ No newline at end of file
+    resolved_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_patient_vital_signs_series", "patient_id", "vital_sign_id", "measurement_date"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Text, Index
 from backend.app.core.config import Base
 
 class PersonalHistoryDecisionRule(Base):
@@ -15,3 +15,7 @@ class PersonalHistoryDecisionRule(Base):
     life_style_advice_key = Column(String(20), nullable=True)
     presumptive_diagnosis_key = Column(String(255), nullable=True)
     tests_key = Column(String(20), nullable=True)
+
+    __table_args__ = (
+        Index("idx_personal_history_rules_lookup", "history_id", "gender", "age_group"),
+    )
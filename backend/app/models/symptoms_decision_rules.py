@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Index
 from backend.app.core.config import Base
 
 class SymptomsDecisionRule(Base):
@@ -15,3 +15,7 @@ class SymptomsDecisionRule(Base):
     life_style_advice_key = Column(String(255), nullable=True)
     presumptive_diagnosis_key = Column(String(255), nullable=True)
     tests_key = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        Index("idx_symptoms_rules_lookup", "symptom_id", "gender", "age_group"),
+    )
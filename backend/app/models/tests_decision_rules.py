@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Index
 from backend.app.core.config import Base
 
 class TestsDecisionRule(Base):
@@ -17,3 +17,6 @@ class TestsDecisionRule(Base):
     min_value = Column(String(20), nullable=True)  # ✅ Just ensure DB column exists
     max_value = Column(String(20), nullable=True)
 
+    __table_args__ = (
+        Index("idx_tests_rules_lookup", "test_id", "gender", "age_group"),
+    )
@@ -9,6 +9,13 @@ class PatientTestCreate(BaseModel):
     result_value: Optional[str] = None
     notes: Optional[str] = None
 
+class PatientTestBatch(BaseModel):
+    results: List[PatientTestCreate]
+
+class PatientTestBatchResponse(BaseModel):
+    created: int
+    patient_ids: List[int]
+
 class PatientTestDelete(BaseModel):
     id: int
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Index
 from backend.app.core.config import Base
 
 class VitalSignsDecisionRule(Base):
@@ -22,3 +22,7 @@ class VitalSignsDecisionRule(Base):
     referral_key = Column(String(20), nullable=True)
     recommendation_key = Column(String(20), nullable=True)
     presumptive_diagnosis_key = Column(String(20), nullable=True)
+
+    __table_args__ = (
+        Index("idx_vital_signs_rules_lookup", "vital_id", "gender", "age_group"),
+    )
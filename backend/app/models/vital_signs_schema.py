@@ -8,6 +8,13 @@ class PatientVitalSignCreate(BaseModel):
     measurement_date: Optional[date] = None
     value: str
 
+class PatientVitalSignBatch(BaseModel):
+    readings: List[PatientVitalSignCreate]
+
+class PatientVitalSignBatchResponse(BaseModel):
+    created: int
+    patient_ids: List[int]
+
 class PatientVitalSignUpdate(BaseModel):
     vital_sign_record_id: int
     new_value: Optional[str] = None
@@ -35,4 +42,30 @@ class VitalSignDictResponse(BaseModel):
     unit: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class VitalSignSeriesPoint(BaseModel):
+    date: date
+    value: float
+    min: Optional[float] = None
+    max: Optional[float] = None
+    count: int = 1
+
+class VitalSignTrend(BaseModel):
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    coefficient_of_variation: Optional[float] = None
+    slope_per_day: Optional[float] = None
+    change: Optional[float] = None
+
+class VitalSignSeriesResponse(BaseModel):
+    patient_id: int
+    vital_sign_id: int
+    name: str
+    unit: Optional[str] = None
+    method: str
+    points: List[VitalSignSeriesPoint]
+    trend: VitalSignTrend
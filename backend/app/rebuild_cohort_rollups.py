@@ -0,0 +1,33 @@
+"""
+Rebuild the per-doctor cohort counters (doctor_cohort_rollups) from scratch.
+
+Every patient's buckets (age group, CardioModel risk level, active symptoms, abnormal latest
+vitals) are recomputed batch by batch with a few set-based queries each, then all counters are
+recounted with one grouped query. The API keeps the counters current on its own; run this
+once after the migration, and nightly, since age groups move with birthdays rather than edits.
+
+Run from the repository root:
+    python -m backend.app.rebuild_cohort_rollups [--batch-size 10000]
+"""
+import argparse
+import sys
+import time
+from backend.app.core.config import SessionLocal
+from backend.app.services.cohort_rollups import COHORT_REBUILD_BATCH_SIZE, rebuild_cohort_rollups
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=COHORT_REBUILD_BATCH_SIZE, help="Patients per transaction")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        checked, counters = rebuild_cohort_rollups(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Refreshed {checked} patients, {counters} counters in {time.monotonic() - started:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
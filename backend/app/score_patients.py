@@ -0,0 +1,69 @@
+"""
+Score patients with all CardioModel models into patient_risk_scores and patient_predictions.
+
+Features come from the patient record (age, gender, height, weight, smoke, alco, active) plus
+the latest blood pressure vitals and cholesterol/glucose tests, assembled as one matrix per
+batch and scored with a single predict_proba pass per model. Patients whose inputs and model
+versions are unchanged since their last score are skipped.
+
+--changed only looks at patients changed since they were scored (cheap enough to run every
+few minutes); --loop keeps doing that, as a long-running rescoring scheduler.
+
+Run from the repository root:
+    python -m backend.app.score_patients [--changed] [--loop 300] [--full] [--model-dir models]
+"""
+import argparse
+import sys
+import time
+from backend.app.core.config import SessionLocal
+from backend.app.services.risk_scoring import (
+    RISK_SCORING_BATCH_SIZE,
+    load_cardio_model,
+    score_all_patients,
+    rescore_changed_patients,
+)
+
+def run_once(cardio_model, args) -> None:
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        if args.changed:
+            checked, rescored = rescore_changed_patients(db, cardio_model, batch_size=args.batch_size)
+        else:
+            checked, rescored = score_all_patients(db, cardio_model, batch_size=args.batch_size, force=args.full)
+    finally:
+        db.close()
+    if checked or not args.loop:
+        print(f"Checked {checked} patients, rescored {rescored} in {time.monotonic() - started:.1f}s", flush=True)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model-dir", default="models", help="Directory with the trained .pkl files")
+    parser.add_argument("--batch-size", type=int, default=RISK_SCORING_BATCH_SIZE, help="Patients scored per pass")
+    parser.add_argument("--changed", action="store_true", help="Only patients changed since their last score")
+    parser.add_argument("--full", action="store_true", help="Rescore everyone, even with unchanged inputs")
+    parser.add_argument("--loop", type=float, metavar="SECONDS", help="Repeat the --changed pass every SECONDS")
+    args = parser.parse_args()
+    if args.loop:
+        args.changed = True
+
+    try:
+        cardio_model = load_cardio_model(args.model_dir)
+    except FileNotFoundError:
+        print("Trained models not found. Run train_model.py first.")
+        return 1
+    print("Models: " + ", ".join(f"{name} {version}" for name, version in cardio_model.versions.items()))
+
+    while True:
+        try:
+            run_once(cardio_model, args)
+        except Exception as e:
+            if not args.loop:
+                raise
+            print(f"Rescoring pass failed: {e}", flush=True)
+        if not args.loop:
+            return 0
+        time.sleep(args.loop)
+
+if __name__ == "__main__":
+    sys.exit(main())
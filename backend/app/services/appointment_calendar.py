@@ -0,0 +1,248 @@
+# services/appointment_calendar.py
+
+import itertools
+import os
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.utils.lru_cache import LRUCache
+from backend.app.models.appointment import Appointment
+from backend.app.models.doctor import Doctor
+from backend.app.models.doctor_patient import DoctorPatient
+
+# Appointments have no end time; each one blocks this many minutes from its start
+APPOINTMENT_DURATION_MINUTES = int(os.getenv("APPOINTMENT_DURATION_MINUTES", "30"))
+APPOINTMENT_DURATION = timedelta(minutes=APPOINTMENT_DURATION_MINUTES)
+
+# doctor_id -> DoctorCalendar of every appointment for the doctor's patients, always read
+# from the primary. Changes made through the ORM in this process invalidate it; the TTL bounds
+# staleness across worker processes. It only answers fast: bookings re-check the overlap in
+# SQL inside their own transaction (see lock_doctor_calendars / read_calendar_range).
+CALENDAR_CACHE_SIZE = int(os.getenv("CALENDAR_CACHE_SIZE", "1000"))
+CALENDAR_TTL_SECONDS = float(os.getenv("CALENDAR_TTL_SECONDS", "30"))
+calendar_cache = LRUCache(CALENDAR_CACHE_SIZE)
+
+# Ticks for invalidations, so a calendar read before a commit isn't cached after it
+_ticks = itertools.count(1)
+_invalidated_at = {}  # doctor_id -> tick of its last invalidation
+_cleared_at = 0
+
+APPOINTMENT_BULK_MAX = int(os.getenv("APPOINTMENT_BULK_MAX", "200"))
+
+def add_months(value: datetime, months: int) -> datetime:
+    """
+    Same day-of-month `months` later, clamped to the month's last day (Jan 31 + 1 month = Feb 28/29).
+    """
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    next_month = datetime(year + month // 12, month % 12 + 1, 1)
+    return value.replace(year=year, month=month, day=min(value.day, (next_month - timedelta(days=1)).day))
+
+def expand_recurrence(start: datetime, every: int, unit: str, count: int = None, until: datetime = None,
+                      limit: int = APPOINTMENT_BULK_MAX) -> list:
+    """
+    Start times of a recurring appointment: `start`, then every `every` days/weeks/months,
+    stopping after `count` occurrences or past `until`. Raises ValueError past `limit`.
+    """
+    if count is None and until is None:
+        raise ValueError("Recurrence needs a count or an until date")
+
+    occurrences = []
+    n = 0
+    while count is None or n < count:
+        if unit == "months":
+            # Always step from the original start so day-of-month clamping doesn't drift
+            occurrence = add_months(start, every * n)
+        else:
+            occurrence = start + timedelta(**{unit: every * n})
+        if until is not None and occurrence > until:
+            break
+        if len(occurrences) >= limit:
+            raise ValueError(f"Recurrence expands to more than {limit} appointments")
+        occurrences.append(occurrence)
+        n += 1
+    return occurrences
+
+def as_naive(value: datetime) -> datetime:
+    """
+    Appointment times are stored as naive wall-clock DATETIMEs (the driver drops any
+    offset), so compare them the same way.
+    """
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+class DoctorCalendar:
+    """
+    One doctor's appointments as a list sorted by (start, id).
+
+    Since every appointment lasts APPOINTMENT_DURATION, the ones overlapping [start, end)
+    are exactly those starting in (start - duration, end): one bisect plus the matches.
+    """
+    def __init__(self, appointments=(), duration: timedelta = APPOINTMENT_DURATION):
+        self.duration = duration
+        self._entries = sorted((start, appt_id, patient_id) for appt_id, patient_id, start in appointments)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def overlapping(self, start: datetime, end: datetime = None, exclude_id: int = None) -> list:
+        end = end or start + self.duration
+        lo = bisect_right(self._entries, (start - self.duration, float("inf")))
+        hi = bisect_left(self._entries, (end,))
+        return [entry for entry in self._entries[lo:hi] if entry[1] != exclude_id]
+
+    def conflicts(self, starts, exclude_id: int = None) -> dict:
+        """
+        Check many proposed start times in one merge pass over the calendar.
+        Returns {proposed start: [conflicting (start, id, patient_id), ...]} for the ones that
+        overlap an existing appointment or another proposed start.
+        """
+        proposed = sorted(starts)
+        found = {}
+        if not proposed:
+            return found
+
+        existing = [e for e in self.overlapping(proposed[0], proposed[-1] + self.duration) if e[1] != exclude_id]
+        i = 0
+        previous = None
+        for start in proposed:
+            # Existing appointments that ended before this one starts can never match again
+            while i < len(existing) and existing[i][0] + self.duration <= start:
+                i += 1
+            j = i
+            while j < len(existing) and existing[j][0] < start + self.duration:
+                found.setdefault(start, []).append(existing[j])
+                j += 1
+            if previous is not None and start < previous + self.duration:
+                found.setdefault(start, []).append((previous, None, None))
+            previous = start
+        return found
+
+    def free_slots(self, start: datetime, end: datetime, duration: timedelta = None, step: timedelta = None) -> list:
+        """
+        Start times in [start, end) where a `duration` appointment fits without overlapping
+        anything, on a `step` grid (default: the appointment duration).
+        """
+        duration = duration or self.duration
+        step = step or duration
+        busy = self.overlapping(start, end)
+        slots = []
+        slot = start
+        i = 0
+        while slot + duration <= end:
+            while i < len(busy) and busy[i][0] + self.duration <= slot:
+                i += 1
+            if i < len(busy) and busy[i][0] < slot + duration:
+                # Jump past the blocking appointment, staying on the grid
+                blocked_until = busy[i][0] + self.duration
+                slot += step * max(1, -(-(blocked_until - slot) // step))
+                continue
+            slots.append(slot)
+            slot += step
+        return slots
+
+def _calendar_query(doctor_id: int, start: datetime = None, end: datetime = None):
+    # With a range, only the appointments that can overlap [start, end)
+    query = (
+        select(Appointment.id, Appointment.patient_id, Appointment.datetime)
+        .join(DoctorPatient, DoctorPatient.patient_id == Appointment.patient_id)
+        .where(DoctorPatient.doctor_id == doctor_id)
+    )
+    if start is not None:
+        query = query.where(Appointment.datetime > start - APPOINTMENT_DURATION, Appointment.datetime < end)
+    return query
+
+def _remember(doctor_id: int, rows, read_at: int) -> DoctorCalendar:
+    calendar = DoctorCalendar((r.id, r.patient_id, r.datetime) for r in rows)
+    # Invalidated while we were reading: the rows may predate that commit, so don't keep them
+    if _invalidated_at.get(doctor_id, 0) < read_at and _cleared_at < read_at:
+        calendar_cache.set(doctor_id, calendar, expires_at=time.time() + CALENDAR_TTL_SECONDS)
+    return calendar
+
+def get_doctor_calendar(db: Session, doctor_id: int) -> DoctorCalendar:
+    """
+    The doctor's cached calendar. `db` must be a primary session: a lagging replica could
+    cache a calendar missing a just-booked appointment for CALENDAR_TTL_SECONDS.
+    """
+    calendar = calendar_cache.get(doctor_id)
+    if calendar is None:
+        read_at = next(_ticks)
+        calendar = _remember(doctor_id, db.execute(_calendar_query(doctor_id)).all(), read_at)
+    return calendar
+
+async def get_calendar_range_async(db: AsyncSession, doctor_id: int, start: datetime, end: datetime) -> DoctorCalendar:
+    """
+    Appointments that can overlap [start, end), for read-only views. Uses the cached calendar
+    when there is one; otherwise reads just the range from `db` (possibly a replica) and
+    never caches it.
+    """
+    calendar = calendar_cache.get(doctor_id)
+    if calendar is None:
+        calendar = DoctorCalendar((await db.execute(_calendar_query(doctor_id, start, end))).all())
+    return calendar
+
+def lock_doctor_calendars(db: Session, patient_ids) -> None:
+    """
+    Lock the doctor rows of every doctor of these patients until the transaction ends, in id
+    order so concurrent bookings can't deadlock. A booking writes to all those calendars, so
+    two bookings that could conflict always share a lock, whichever worker handles them.
+    """
+    db.execute(
+        select(Doctor.id)
+        .join(DoctorPatient, DoctorPatient.doctor_id == Doctor.id)
+        .where(DoctorPatient.patient_id.in_(sorted(set(patient_ids))))
+        .order_by(Doctor.id)
+        .with_for_update(of=Doctor)
+    ).all()
+
+def read_calendar_range(db: Session, doctor_id: int, start: datetime, end: datetime) -> DoctorCalendar:
+    """
+    Appointments that can overlap [start, end), read inside the caller's write transaction with
+    a locking read so it sees the latest committed rows rather than the transaction's snapshot.
+    Call after lock_doctor_calendars; never cached.
+    """
+    return DoctorCalendar(db.execute(_calendar_query(doctor_id, start, end).with_for_update(read=True)).all())
+
+def invalidate_calendar(doctor_id: int = None):
+    global _cleared_at
+    if doctor_id is None:
+        _cleared_at = next(_ticks)
+        calendar_cache.clear()
+    else:
+        _invalidated_at[doctor_id] = next(_ticks)
+        calendar_cache.pop(doctor_id)
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_calendars(session, flush_context):
+    # One doctor_patient lookup per flush, however many appointments it wrote. Resolved here
+    # because the session can't run queries once committed.
+    patient_ids, doctor_ids = set(), set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Appointment):
+            patient_ids.add(obj.patient_id)
+            # Moved to another patient: the old patient's doctors lose it
+            patient_ids.update(inspect(obj).attrs.patient_id.history.deleted or ())
+        elif isinstance(obj, DoctorPatient):
+            doctor_ids.add(obj.doctor_id)
+    patient_ids.discard(None)
+    if patient_ids:
+        doctor_ids.update(session.connection().execute(
+            select(DoctorPatient.doctor_id).where(DoctorPatient.patient_id.in_(sorted(patient_ids))).distinct()
+        ).scalars())
+    doctor_ids.discard(None)
+    if doctor_ids:
+        session.info.setdefault("changed_calendar_doctor_ids", set()).update(doctor_ids)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_calendars(session):
+    # Only now can other requests see the change; invalidating earlier let them re-cache the old state
+    for doctor_id in session.info.pop("changed_calendar_doctor_ids", ()):
+        invalidate_calendar(doctor_id)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _invalidate_rolled_back_calendars(session, previous_transaction):
+    # The session itself may have cached its own uncommitted rows in the meantime
+    if previous_transaction.parent is None:
+        _invalidate_committed_calendars(session)
@@ -0,0 +1,204 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import insert, select, delete
+from sqlalchemy.orm import Session
+from backend.app.core.config import SessionLocal, _env_bool
+from backend.app.models.audit_log import AuditLog, AuditLogArchive
+from backend.app.utils.audit_codec import encode_action_details
+
+# Audit events are queued in memory and bulk-inserted by a background thread.
+# AUDIT_SYNC=true writes each event immediately in the caller's session instead (compliance tests).
+AUDIT_SYNC = _env_bool("AUDIT_SYNC", False)
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+AUDIT_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("AUDIT_SHUTDOWN_TIMEOUT_SECONDS", "30"))
+# Rows older than this stay queryable from audit_logs_archive instead of the hot table
+AUDIT_HOT_DAYS = int(os.getenv("AUDIT_HOT_DAYS", "180"))
+
+def audit_row(doctor_id: int, action_type: str, entity_type: str, patient_id: int,
+              description: str = None, action_details: dict = None, created_at: datetime = None) -> dict:
+    """
+    Column values for one audit_logs row, with action_details in its stored encoding.
+    Callers that must write audit rows in their own transaction insert these directly.
+    """
+    return {
+        "doctor_id": doctor_id,
+        "action_type": action_type,
+        "entity_type": entity_type,
+        "patient_id": patient_id,
+        "description": description,
+        "action_details": encode_action_details(action_details),
+        # Stamped now, not at flush time, so ordering reflects when the action happened
+        "created_at": created_at or datetime.now(timezone.utc),
+    }
+
+class AuditSink:
+    """
+    Buffered audit-log writer.
+
+    `record` enqueues a row and returns; a daemon thread flushes the queue with one
+    multi-row INSERT whenever `batch_size` rows are waiting or `flush_interval` seconds have
+    passed since the oldest unflushed row. Failed batches are retried with backoff.
+    `stop` drains everything still queued, so no event is lost on a graceful shutdown.
+    """
+    def __init__(self, session_factory=SessionLocal, batch_size: int = AUDIT_BATCH_SIZE,
+                 flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS, max_queue: int = AUDIT_QUEUE_MAX,
+                 sync: bool = AUDIT_SYNC):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sync = sync
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def record(self, db: Optional[Session], doctor_id: int, action_type: str, entity_type: str, patient_id: int,
+               description: str = None, action_details: dict = None, created_at: datetime = None):
+        row = audit_row(doctor_id, action_type, entity_type, patient_id, description, action_details, created_at)
+
+        if self.sync or self._stopping.is_set():
+            self._write_now(db, row)
+            return
+
+        self.start()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Writer is behind (or the database is unavailable): apply backpressure instead of dropping
+            self._write_now(None, row)
+
+    def _write_now(self, db: Optional[Session], row: dict):
+        try:
+            if db is None:
+                self._insert([row])
+                return
+            db.add(AuditLog(**row))
+            db.commit()
+        except Exception as e:
+            if db is not None:
+                db.rollback()
+            # Don't fail the main operation if audit logging fails
+            print(f"Error logging audit event: {str(e)}")
+
+    def _insert(self, rows: list):
+        db = self.session_factory()
+        try:
+            db.execute(insert(AuditLog), rows)
+            db.commit()
+        finally:
+            db.close()
+
+    def _flush(self, rows: list):
+        delay = 0.5
+        while True:
+            try:
+                self._insert(rows)
+                return
+            except Exception as e:
+                print(f"Audit flush of {len(rows)} events failed: {e}")
+                if self._stopping.is_set() and delay > 8:
+                    print(f"Dropping {len(rows)} audit events after repeated failures during shutdown")
+                    return
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    if self._stopping.is_set():
+                        batch.append(self._queue.get_nowait())
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def start(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._worker.start()
+
+    def flush(self):
+        """
+        Block until every event queued so far has been written.
+        """
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.join()
+
+    def stop(self, timeout: float = AUDIT_SHUTDOWN_TIMEOUT_SECONDS):
+        """
+        Drain the queue and stop the worker. Events recorded afterwards are written synchronously.
+        """
+        self._stopping.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            if self._worker.is_alive():
+                print(f"Audit writer still busy after {timeout}s; {self._queue.qsize()} events pending")
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+audit_sink = AuditSink()
+atexit.register(audit_sink.stop)
+
+def record_audit_event(db: Optional[Session], doctor_id: int, action_type: str, entity_type: str, patient_id: int,
+                       description: str = None, action_details: dict = None, created_at: datetime = None):
+    """
+    Queue an audit event for the background writer.
+    `db` is only used in synchronous mode, where the event is added and committed in that session.
+    """
+    audit_sink.record(db, doctor_id, action_type, entity_type, patient_id, description, action_details, created_at)
+
+_AUDIT_COLUMNS = [c.key for c in AuditLog.__table__.columns]
+
+def archive_audit_logs(db: Session, before: datetime = None, batch_size: int = 5000) -> int:
+    """
+    Move audit rows created before `before` (default: AUDIT_HOT_DAYS ago) into audit_logs_archive,
+    oldest first, one committed chunk at a time so locks stay short. Returns the number of rows moved.
+    """
+    if before is None:
+        before = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=AUDIT_HOT_DAYS)
+
+    moved = 0
+    while True:
+        ids = db.execute(
+            select(AuditLog.id)
+            .where(AuditLog.created_at < before)
+            .order_by(AuditLog.created_at, AuditLog.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return moved
+
+        columns = [getattr(AuditLog, name) for name in _AUDIT_COLUMNS]
+        db.execute(
+            insert(AuditLogArchive).from_select(_AUDIT_COLUMNS, select(*columns).where(AuditLog.id.in_(ids)))
+        )
+        db.execute(delete(AuditLog).where(AuditLog.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
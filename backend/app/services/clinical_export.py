@@ -0,0 +1,287 @@
+# services/clinical_export.py
+
+# Bulk export of a doctor's clinical data for research: one file per dataset (patients, vital
+# signs, tests, symptoms, personal history, summary items), bundled into a ZIP. Every dataset
+# is read with a server-side cursor on the export database (first read replica by default)
+# and written chunk by chunk, so memory stays flat however many rows there are.
+
+import csv
+import gzip
+import os
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from sqlalchemy import select, and_, case, extract, Integer, Float, Boolean, Date, DateTime
+from backend.app.core.config import DATABASE_URL, DATABASE_REPLICA_URLS, create_db_engine
+from backend.app.models.doctor_patient import DoctorPatient
+from backend.app.models.patient import Patient
+from backend.app.models.patient_vital_signs import PatientVitalSigns
+from backend.app.models.vital_signs_dict import VitalSignsDict
+from backend.app.models.patient_tests import PatientTests
+from backend.app.models.tests_dict import TestsDict
+from backend.app.models.patient_symptom import PatientSymptom
+from backend.app.models.symptom_dict import SymptomDict
+from backend.app.models.patient_personal_history import PatientPersonalHistory
+from backend.app.models.personal_history_dict import PersonalHistoryDict
+from backend.app.models.patient_follow_up_action import PatientFollowUpAction
+from backend.app.models.patient_recommendations import PatientRecommendations
+from backend.app.models.patient_referrals import PatientReferrals
+from backend.app.models.patient_lifestyle_advices import PatientLifestyleAdvices
+from backend.app.models.patient_presumptive_diagnoses import PatientPresumptiveDiagnoses
+from backend.app.models.patient_tests_to_order import PatientTestsToOrder
+from backend.app.models.patient_prescriptions import PatientPrescriptions
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Long sequential reads belong on a replica, not the primary serving the API
+EXPORT_DATABASE_URL = os.getenv(
+    "EXPORT_DATABASE_URL", DATABASE_REPLICA_URLS[0] if DATABASE_REPLICA_URLS else DATABASE_URL
+)
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "20000"))  # rows per cursor fetch / written batch
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", "2"))  # exports running at once per process
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "deepcardio-exports"))
+
+EXPORT_FORMATS = ("parquet", "arrow", "csv")
+FORMAT_SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv.gz"}
+DEFAULT_EXPORT_FORMAT = "parquet" if PYARROW_AVAILABLE else "csv"
+
+_engine = None
+
+def get_export_engine():
+    """
+    Dedicated engine for exports, created on first use. One connection is enough per export
+    and keeping it off the request pool means a long export never starves API requests.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_db_engine(EXPORT_DATABASE_URL, **(
+            {} if EXPORT_DATABASE_URL.startswith("sqlite") else {"pool_size": EXPORT_MAX_CONCURRENT, "max_overflow": 0}
+        ))
+    return _engine
+
+def format_available(export_format: str) -> bool:
+    return export_format == "csv" or PYARROW_AVAILABLE
+
+def _scoped(stmt, patient_id_column, doctor_id):
+    # Restrict to the doctor's patients; doctor_id None exports every patient (CLI only)
+    if doctor_id is None:
+        return stmt
+    return stmt.join(DoctorPatient, and_(
+        DoctorPatient.patient_id == patient_id_column, DoctorPatient.doctor_id == doctor_id
+    ))
+
+def _summary_items(model, *columns):
+    return select(
+        model.id, model.patient_id, model.doctor_id, *columns, model.created_at, model.updated_at
+    )
+
+def export_queries(doctor_id, anonymous: bool = False) -> dict:
+    """
+    dataset name -> SELECT. Readings carry their catalog name next to the id so the files are
+    usable without the dictionaries. Anonymous exports keep gender, birth year and ethnicity
+    only, and no typed-in text: test notes and prescription instructions are left out, and
+    summary-item text is kept only on rows the decision rules generated (empty otherwise).
+    """
+    def rule_text(model, column):
+        # Text a doctor typed can name people or carry other identifying details
+        if not anonymous:
+            return column
+        return case((model.auto_generated.is_(True), column)).label(column.key)
+
+    if anonymous:
+        patients = select(
+            Patient.patient_id, Patient.gender, extract("year", Patient.dob).label("birth_year"),
+            Patient.ethnicity, Patient.weight, Patient.height, Patient.smoke, Patient.alco, Patient.active,
+        )
+    else:
+        patients = select(
+            Patient.patient_id, Patient.first_name, Patient.last_name, Patient.gender, Patient.dob,
+            Patient.ethnicity, Patient.phone, Patient.email, Patient.marital_status, Patient.occupation,
+            Patient.insurance_provider, Patient.address, Patient.weight, Patient.height,
+            Patient.smoke, Patient.alco, Patient.active,
+        )
+
+    queries = {
+        "patients": patients,
+        "vital_signs": select(
+            PatientVitalSigns.id, PatientVitalSigns.patient_id, PatientVitalSigns.vital_sign_id,
+            VitalSignsDict.name.label("vital_sign"), PatientVitalSigns.value, PatientVitalSigns.numeric_value,
+            PatientVitalSigns.measurement_date, PatientVitalSigns.recorded_at, PatientVitalSigns.resolved_at,
+        ).join(VitalSignsDict, VitalSignsDict.vital_sign_id == PatientVitalSigns.vital_sign_id),
+        "tests": select(
+            PatientTests.id, PatientTests.patient_id, PatientTests.test_id, TestsDict.name.label("test"),
+            PatientTests.result_value, PatientTests.test_date, *(() if anonymous else (PatientTests.notes,)),
+            PatientTests.recorded_at, PatientTests.resolved_at,
+        ).join(TestsDict, TestsDict.id == PatientTests.test_id),
+        "symptoms": select(
+            PatientSymptom.id, PatientSymptom.patient_id, PatientSymptom.symptom_id, SymptomDict.name.label("symptom"),
+            PatientSymptom.onset_date, PatientSymptom.recorded_at, PatientSymptom.resolved_at,
+        ).join(SymptomDict, SymptomDict.symptom_id == PatientSymptom.symptom_id),
+        "personal_history": select(
+            PatientPersonalHistory.id, PatientPersonalHistory.patient_id, PatientPersonalHistory.history_id,
+            PersonalHistoryDict.name.label("history"), PatientPersonalHistory.date_recorded,
+            PatientPersonalHistory.recorded_at, PatientPersonalHistory.resolved_at,
+        ).join(PersonalHistoryDict, PersonalHistoryDict.id == PatientPersonalHistory.history_id),
+        "follow_up_actions": _summary_items(
+            PatientFollowUpAction, rule_text(PatientFollowUpAction, PatientFollowUpAction.action),
+            PatientFollowUpAction.follow_up_interval, PatientFollowUpAction.auto_generated,
+        ),
+        "recommendations": _summary_items(
+            PatientRecommendations, rule_text(PatientRecommendations, PatientRecommendations.recommendation),
+            PatientRecommendations.auto_generated,
+        ),
+        "referrals": _summary_items(
+            PatientReferrals, rule_text(PatientReferrals, PatientReferrals.specialist_name),
+            rule_text(PatientReferrals, PatientReferrals.referral_reason), PatientReferrals.auto_generated,
+        ),
+        "lifestyle_advices": _summary_items(
+            PatientLifestyleAdvices, rule_text(PatientLifestyleAdvices, PatientLifestyleAdvices.life_style_advice),
+            PatientLifestyleAdvices.auto_generated,
+        ),
+        "presumptive_diagnoses": _summary_items(
+            PatientPresumptiveDiagnoses, rule_text(PatientPresumptiveDiagnoses, PatientPresumptiveDiagnoses.diagnosis_name),
+            PatientPresumptiveDiagnoses.confidence_level, PatientPresumptiveDiagnoses.auto_generated,
+        ),
+        "tests_to_order": _summary_items(
+            PatientTestsToOrder, rule_text(PatientTestsToOrder, PatientTestsToOrder.test_to_order),
+            PatientTestsToOrder.auto_generated,
+        ),
+        "prescriptions": _summary_items(
+            PatientPrescriptions, PatientPrescriptions.medicine_name, PatientPrescriptions.dosage,
+            PatientPrescriptions.frequency, PatientPrescriptions.duration,
+            *(() if anonymous else (PatientPrescriptions.instructions,)),
+        ),
+    }
+    models = {
+        "patients": Patient, "vital_signs": PatientVitalSigns, "tests": PatientTests,
+        "symptoms": PatientSymptom, "personal_history": PatientPersonalHistory,
+        "follow_up_actions": PatientFollowUpAction, "recommendations": PatientRecommendations,
+        "referrals": PatientReferrals, "lifestyle_advices": PatientLifestyleAdvices,
+        "presumptive_diagnoses": PatientPresumptiveDiagnoses, "tests_to_order": PatientTestsToOrder,
+        "prescriptions": PatientPrescriptions,
+    }
+    return {name: _scoped(stmt, models[name].patient_id, doctor_id) for name, stmt in queries.items()}
+
+EXPORT_DATASETS = tuple(export_queries(None))
+
+def _arrow_type(sql_type):
+    # Column types come from the models, so the file schema is fixed before the first row
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, Float):
+        return pa.float64()
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(sql_type, Date):
+        return pa.date32()
+    return pa.string()
+
+def _arrow_schema(stmt):
+    return pa.schema([
+        # extract() has no fixed type; it's only used for the birth year
+        (column.name, pa.int64() if column.name == "birth_year" else _arrow_type(column.type))
+        for column in stmt.selected_columns
+    ])
+
+class _CsvWriter:
+    def __init__(self, path: str, columns: list):
+        self._file = gzip.open(path, "wt", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+class _ArrowWriter:
+    def __init__(self, path: str, schema, export_format: str):
+        self._schema = schema
+        if export_format == "parquet":
+            self._writer = pa.parquet.ParquetWriter(path, schema, compression="zstd")
+        else:
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        self._writer.write_batch(pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, self._schema)],
+            schema=self._schema,
+        ))
+
+    def close(self):
+        self._writer.close()
+        if hasattr(self, "_sink"):
+            self._sink.close()
+
+def export_dataset(conn, stmt, path: str, export_format: str, chunk_rows: int = EXPORT_CHUNK_ROWS) -> int:
+    """
+    Stream one SELECT into `path`, `chunk_rows` rows at a time. Returns the number of rows.
+    """
+    if export_format == "csv":
+        writer = _CsvWriter(path, [column.name for column in stmt.selected_columns])
+    else:
+        writer = _ArrowWriter(path, _arrow_schema(stmt), export_format)
+
+    count = 0
+    try:
+        # stream_results = server-side cursor (SSCursor on MySQL): rows arrive as they're fetched
+        result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(stmt)
+        for rows in result.partitions():
+            writer.write(rows)
+            count += len(rows)
+    finally:
+        writer.close()
+    return count
+
+def export_clinical_data(doctor_id, directory: str, export_format: str = DEFAULT_EXPORT_FORMAT,
+                         datasets=EXPORT_DATASETS, anonymous: bool = False,
+                         chunk_rows: int = EXPORT_CHUNK_ROWS) -> dict:
+    """
+    Write the selected datasets into `directory`, one file each. All datasets are read in
+    one transaction, so on MySQL (REPEATABLE READ) they form a consistent snapshot.
+    Returns dataset name -> (file name, row count, seconds taken).
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'")
+    if not format_available(export_format):
+        raise RuntimeError(f"The {export_format} export format needs pyarrow installed")
+
+    queries = export_queries(doctor_id, anonymous)
+    written = {}
+    with get_export_engine().connect() as conn, conn.begin():
+        for name in datasets:
+            start = time.perf_counter()
+            filename = name + FORMAT_SUFFIXES[export_format]
+            count = export_dataset(conn, queries[name], os.path.join(directory, filename), export_format, chunk_rows)
+            written[name] = (filename, count, time.perf_counter() - start)
+    return written
+
+def export_clinical_zip(doctor_id, export_format: str = DEFAULT_EXPORT_FORMAT, datasets=EXPORT_DATASETS,
+                        anonymous: bool = False) -> str:
+    """
+    export_clinical_data into a scratch directory under EXPORT_DIR, bundled into one ZIP.
+    Returns the ZIP path; the caller removes it once it has been sent.
+    """
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=EXPORT_DIR) as tmp:
+        written = export_clinical_data(doctor_id, tmp, export_format, datasets, anonymous)
+        fd, zip_path = tempfile.mkstemp(
+            dir=EXPORT_DIR, prefix=f"clinical_export_{datetime.now():%Y%m%d%H%M%S}_", suffix=".zip"
+        )
+        # Parquet/Arrow and gzip are compressed already
+        with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w", zipfile.ZIP_STORED) as archive:
+            for filename, _count, _seconds in written.values():
+                archive.write(os.path.join(tmp, filename), filename)
+    return zip_path
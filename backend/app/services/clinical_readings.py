@@ -0,0 +1,119 @@
+# services/clinical_readings.py
+
+# Set-based writes of vital sign and test readings for many patients at once (bulk import,
+# batch ingestion). Same rows, projections and audit entries as the single-reading endpoints,
+# written with a few multi-row statements in the caller's transaction; nothing here commits.
+
+import os
+from datetime import datetime
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.orm import Session
+from backend.app.helpers.utils import parse_finite_float_or_none
+from backend.app.models.audit_log import AuditLog
+from backend.app.models.vital_signs_dict import VitalSignsDict
+from backend.app.models.tests_dict import TestsDict
+from backend.app.models.patient_vital_signs import PatientVitalSigns
+from backend.app.models.patient_tests import PatientTests
+from backend.app.models.patient_latest_tests import PatientLatestTests
+from backend.app.models.patient_revision import bump_patient_revision
+from backend.app.services.audit_service import audit_row
+
+# Readings accepted by one /vital-signs/batch or /tests/batch request
+CLINICAL_BATCH_MAX = int(os.getenv("CLINICAL_BATCH_MAX", "1000"))
+
+def vital_sign_names(db: Session) -> dict:
+    """
+    vital_sign_id -> name for the whole catalog (small), for validating readings in memory.
+    """
+    return dict(db.execute(select(VitalSignsDict.vital_sign_id, VitalSignsDict.name)).all())
+
+def test_names(db: Session) -> dict:
+    """
+    tests_dict id -> name for the whole catalog.
+    """
+    return dict(db.execute(select(TestsDict.id, TestsDict.name)).all())
+
+def insert_vital_signs(db: Session, doctor_id: int, readings: list, names: dict, recorded_at: datetime) -> int:
+    """
+    Insert readings (dicts with patient_id, vital_sign_id, value, measurement_date) already
+    validated against `names`, plus one audit row each. Returns the number inserted.
+    """
+    if not readings:
+        return 0
+    db.execute(insert(PatientVitalSigns), [
+        {**reading, "numeric_value": parse_finite_float_or_none(reading["value"]), "recorded_at": recorded_at}
+        for reading in readings
+    ])
+    db.execute(insert(AuditLog), [
+        audit_row(
+            doctor_id, "CREATE", "VITAL_SIGN", reading["patient_id"],
+            f"Added vital sign '{names[reading['vital_sign_id']]}' with value '{reading['value']}' for patient {reading['patient_id']}",
+            {"vital_sign_id": reading["vital_sign_id"], "value": reading["value"],
+             "measurement_date": reading["measurement_date"].isoformat() if reading["measurement_date"] else None},
+            created_at=recorded_at,
+        )
+        for reading in readings
+    ])
+    bump_patient_revision(db, (reading["patient_id"] for reading in readings))
+    return len(readings)
+
+def insert_tests(db: Session, doctor_id: int, results: list, names: dict, recorded_at: datetime) -> int:
+    """
+    Insert test results (dicts with patient_id, test_id, result_value, test_date, notes) already
+    validated against `names`, plus one audit row each, and bring patient_latest_tests up to
+    date for them. Returns the number inserted.
+    """
+    if not results:
+        return 0
+    db.execute(insert(PatientTests), [{**result, "recorded_at": recorded_at} for result in results])
+    db.execute(insert(AuditLog), [
+        audit_row(
+            doctor_id, "CREATE", "TEST", result["patient_id"],
+            f"Added test '{names[result['test_id']]}' with result '{result['result_value']}' for patient {result['patient_id']}",
+            {"test_id": result["test_id"], "result_value": result["result_value"],
+             "test_date": result["test_date"].isoformat() if result["test_date"] else None, "notes": result["notes"]},
+            created_at=recorded_at,
+        )
+        for result in results
+    ])
+    refresh_latest_tests(db, {r["patient_id"] for r in results}, {r["test_id"] for r in results})
+    bump_patient_revision(db, (result["patient_id"] for result in results))
+    return len(results)
+
+def refresh_latest_tests(db: Session, patient_ids, test_ids):
+    """
+    Set-based patient_service.refresh_latest_test: recompute the patient_latest_tests rows of
+    these patients for these tests with one DELETE and one INSERT ... SELECT. Pairs that
+    weren't touched are rewritten unchanged.
+    """
+    patient_ids, test_ids = sorted(patient_ids), sorted(test_ids)
+    if not patient_ids or not test_ids:
+        return
+    db.flush()
+    db.execute(
+        delete(PatientLatestTests)
+        .where(PatientLatestTests.patient_id.in_(patient_ids), PatientLatestTests.test_id.in_(test_ids))
+        .execution_options(synchronize_session=False)
+    )
+    ranked = (
+        select(
+            PatientTests.patient_id, PatientTests.test_id, PatientTests.id, PatientTests.test_date,
+            PatientTests.result_value, PatientTests.notes, PatientTests.recorded_at,
+            func.row_number().over(
+                partition_by=(PatientTests.patient_id, PatientTests.test_id),
+                order_by=(PatientTests.recorded_at.desc(), PatientTests.id.desc()),
+            ).label("rank"),
+        )
+        .where(
+            PatientTests.patient_id.in_(patient_ids),
+            PatientTests.test_id.in_(test_ids),
+            PatientTests.resolved_at.is_(None),
+        )
+        .subquery()
+    )
+    db.execute(insert(PatientLatestTests).from_select(
+        ["patient_id", "test_id", "patient_test_id", "test_date", "result_value", "notes", "recorded_at"],
+        select(ranked.c.patient_id, ranked.c.test_id, ranked.c.id, ranked.c.test_date,
+               ranked.c.result_value, ranked.c.notes, ranked.c.recorded_at)
+        .where(ranked.c.rank == 1)
+    ))
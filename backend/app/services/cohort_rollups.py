@@ -0,0 +1,406 @@
+# services/cohort_rollups.py
+
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timezone
+import numpy as np
+import pandas as pd
+from sqlalchemy import event, select, delete, insert, update, and_, or_, case, func, literal
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend.app.core.config import SessionLocal
+from backend.app.helpers.utils import parse_float_or_none
+from backend.app.models.patient import Patient
+from backend.app.models.doctor_patient import DoctorPatient
+from backend.app.models.symptom_dict import SymptomDict
+from backend.app.models.patient_symptom import PatientSymptom
+from backend.app.models.vital_signs_dict import VitalSignsDict
+from backend.app.models.patient_vital_signs import PatientVitalSigns
+from backend.app.models.patient_risk_score import PatientRiskScore
+from backend.app.models.doctor_cohort_rollup import DoctorCohortRollup
+from backend.app.models.patient_cohort_membership import PatientCohortMembership
+from backend.app.services.patient_service import get_age_group
+from backend.app.services.risk_scoring import _patient_filter
+
+# risk_level comes from the stored CardioModel score of this model (see services/risk_scoring.py)
+COHORT_RISK_MODEL = os.getenv("COHORT_RISK_MODEL", "Logistic Regression")
+COHORT_RISK_MODERATE = float(os.getenv("COHORT_RISK_MODERATE", "0.35"))
+COHORT_RISK_HIGH = float(os.getenv("COHORT_RISK_HIGH", "0.65"))
+RISK_LEVELS = ("low", "moderate", "high")
+UNSCORED = "unscored"
+
+# Patients refreshed per transaction by the background refresher / per pass by the rebuild
+COHORT_REFRESH_BATCH_SIZE = int(os.getenv("COHORT_REFRESH_BATCH_SIZE", "500"))
+COHORT_REBUILD_BATCH_SIZE = int(os.getenv("COHORT_REBUILD_BATCH_SIZE", "10000"))
+# How often the refresher looks for patients changed behind its back (other processes, restarts)
+COHORT_SWEEP_SECONDS = int(os.getenv("COHORT_SWEEP_SECONDS", "300"))
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _normal_mask(values: np.ndarray, min_str, max_str):
+    """
+    True where a reading is inside a vital's normal range, reading the range strings
+    ("60", ">=90", "<140", ...) the way helpers.utils.compare_values does.
+    None when the catalog gives no usable range.
+    """
+    low, high = (min_str or "").strip(), (max_str or "").strip()
+    for prefix, text, op in ((">=", low, np.greater_equal), (">", low, np.greater),
+                             ("<=", high, np.less_equal), ("<", high, np.less)):
+        if text.startswith(prefix):
+            threshold = parse_float_or_none(text[len(prefix):])
+            return None if threshold is None else op(values, threshold)
+    min_val, max_val = parse_float_or_none(min_str), parse_float_or_none(max_str)
+    if min_val is None and max_val is None:
+        return None
+    mask = np.ones(len(values), dtype=bool)
+    if min_val is not None:
+        mask &= values >= min_val
+    if max_val is not None:
+        mask &= values <= max_val
+    return mask
+
+def _frame(patient_ids, dimension: str, buckets) -> pd.DataFrame:
+    return pd.DataFrame({"patient_id": patient_ids, "dimension": dimension, "bucket": buckets})
+
+def compute_memberships(db: Session, patients: list, today: date = None) -> pd.DataFrame:
+    """
+    Cohort buckets of a batch of patients (rows with patient_id and dob, ordered by patient_id)
+    as a (patient_id, dimension, bucket) frame. One query per dimension over the whole batch;
+    the bucketing itself is done on arrays.
+    """
+    today = today or date.today()
+    if not patients:
+        return _frame([], "", [])
+    n = len(patients)
+    ids = np.fromiter((p.patient_id for p in patients), dtype=np.int64, count=n)
+    frames = []
+
+    years = np.fromiter((p.dob.year for p in patients), dtype=np.int64, count=n)
+    months = np.fromiter((p.dob.month for p in patients), dtype=np.int64, count=n)
+    days = np.fromiter((p.dob.day for p in patients), dtype=np.int64, count=n)
+    before_birthday = (months > today.month) | ((months == today.month) & (days > today.day))
+    ages = today.year - years - before_birthday
+    unique_ages, inverse = np.unique(ages, return_inverse=True)
+    groups = np.array([get_age_group(int(age)) for age in unique_ages], dtype=object)
+    frames.append(_frame(ids, "age_group", groups[inverse]))
+
+    levels = np.full(n, UNSCORED, dtype=object)
+    rows = db.execute(
+        select(PatientRiskScore.patient_id, PatientRiskScore.probability)
+        .where(_patient_filter(PatientRiskScore.patient_id, ids), PatientRiskScore.model_name == COHORT_RISK_MODEL)
+    ).all()
+    if rows:
+        pid, probability = (np.asarray(col) for col in zip(*rows))
+        keep = np.isin(pid, ids)
+        bands = np.digitize(probability[keep].astype(np.float64), [COHORT_RISK_MODERATE, COHORT_RISK_HIGH])
+        levels[np.searchsorted(ids, pid[keep])] = np.array(RISK_LEVELS, dtype=object)[bands]
+    frames.append(_frame(ids, "risk_level", levels))
+
+    rows = db.execute(
+        select(PatientSymptom.patient_id, SymptomDict.name)
+        .join(SymptomDict, SymptomDict.symptom_id == PatientSymptom.symptom_id)
+        .where(_patient_filter(PatientSymptom.patient_id, ids), PatientSymptom.resolved_at.is_(None))
+    ).all()
+    if rows:
+        symptoms = pd.DataFrame(rows, columns=["patient_id", "bucket"])
+        symptoms = symptoms[symptoms["patient_id"].isin(ids)].drop_duplicates()
+        frames.append(_frame(symptoms["patient_id"].to_numpy(), "symptom", symptoms["bucket"].to_numpy()))
+
+    rows = db.execute(
+        select(PatientVitalSigns.patient_id, PatientVitalSigns.vital_sign_id, PatientVitalSigns.numeric_value)
+        .where(
+            _patient_filter(PatientVitalSigns.patient_id, ids),
+            PatientVitalSigns.resolved_at.is_(None),
+            PatientVitalSigns.numeric_value.isnot(None),
+        )
+        .order_by(PatientVitalSigns.patient_id, PatientVitalSigns.vital_sign_id,
+                  PatientVitalSigns.measurement_date.desc(), PatientVitalSigns.id.desc())
+    ).all()
+    if rows:
+        pid, vid, value = (np.asarray(col) for col in zip(*rows))
+        value = value.astype(np.float64)
+        # Latest reading per (patient, vital) is the first of each run
+        latest = np.r_[True, (pid[1:] != pid[:-1]) | (vid[1:] != vid[:-1])] & np.isin(pid, ids)
+        catalog = db.execute(
+            select(VitalSignsDict.vital_sign_id, VitalSignsDict.name, VitalSignsDict.min_value, VitalSignsDict.max_value)
+            .where(VitalSignsDict.vital_sign_id.in_(np.unique(vid[latest]).tolist()))
+        ).all()
+        for vital in catalog:
+            pick = latest & (vid == vital.vital_sign_id)
+            normal = _normal_mask(value[pick], vital.min_value, vital.max_value)
+            if normal is not None and not normal.all():
+                frames.append(_frame(pid[pick][~normal], "abnormal_vital", vital.name))
+
+    return pd.concat(frames, ignore_index=True)
+
+def _apply_deltas(db: Session, deltas: Counter, now: datetime):
+    # Fixed order, so concurrent refreshes lock counter rows in the same sequence
+    for (doctor_id, dimension, bucket), delta in sorted(deltas.items()):
+        if delta == 0:
+            continue
+        updated = db.execute(
+            update(DoctorCohortRollup)
+            .where(DoctorCohortRollup.doctor_id == doctor_id, DoctorCohortRollup.dimension == dimension, DoctorCohortRollup.bucket == bucket)
+            .values(patient_count=DoctorCohortRollup.patient_count + delta, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not updated and delta > 0:
+            db.execute(insert(DoctorCohortRollup).values(
+                doctor_id=doctor_id, dimension=dimension, bucket=bucket, patient_count=delta, updated_at=now
+            ))
+
+def refresh_patients(db: Session, patient_ids) -> int:
+    """
+    Recompute the cohort buckets of these patients and apply the difference to the counters
+    of every doctor they are (or were) counted for, in one transaction. Linking, unlinking
+    and deleting patients are handled the same way. Returns the number of patients refreshed.
+    """
+    ids = sorted(set(patient_ids))
+    if not ids:
+        return 0
+    now = _utcnow()
+    # Locking the patient rows serializes refreshes of the same patient across processes
+    patients = db.execute(
+        select(Patient.patient_id, Patient.dob, Patient.revision)
+        .where(Patient.patient_id.in_(ids))
+        .order_by(Patient.patient_id)
+        .with_for_update()
+    ).all()
+    revisions = {p.patient_id: p.revision for p in patients}
+    buckets = {}
+    for patient_id, dimension, bucket in compute_memberships(db, patients, today=now.date()).itertuples(index=False):
+        buckets.setdefault(patient_id, []).append((dimension, bucket))
+
+    links = db.execute(
+        select(DoctorPatient.doctor_id, DoctorPatient.patient_id).where(DoctorPatient.patient_id.in_(ids))
+    ).all()
+    current = {
+        (doctor_id, patient_id, dimension, bucket)
+        for doctor_id, patient_id in links
+        for dimension, bucket in buckets.get(patient_id, ())
+    }
+    counted = {
+        tuple(row) for row in db.execute(
+            select(PatientCohortMembership.doctor_id, PatientCohortMembership.patient_id, PatientCohortMembership.dimension, PatientCohortMembership.bucket)
+            .where(PatientCohortMembership.patient_id.in_(ids))
+        )
+    }
+
+    deltas = Counter()
+    for doctor_id, _, dimension, bucket in current - counted:
+        deltas[(doctor_id, dimension, bucket)] += 1
+    for doctor_id, _, dimension, bucket in counted - current:
+        deltas[(doctor_id, dimension, bucket)] -= 1
+
+    db.execute(delete(PatientCohortMembership).where(PatientCohortMembership.patient_id.in_(ids)))
+    if current:
+        db.execute(insert(PatientCohortMembership), [
+            {"doctor_id": doctor_id, "patient_id": patient_id, "dimension": dimension, "bucket": bucket,
+             "patient_revision": revisions[patient_id], "refreshed_at": now}
+            for doctor_id, patient_id, dimension, bucket in current
+        ])
+    _apply_deltas(db, deltas, now)
+    db.commit()
+    return len(ids)
+
+def stale_patient_ids(db: Session) -> list:
+    """
+    Patients whose counted buckets may be out of date: linked but not counted yet, changed
+    since (patients.revision moved), rescored into another risk level, or no longer linked to
+    a doctor (or deleted). The age_group row stands for the patient, since everyone has one.
+    """
+    age_row = PatientCohortMembership.dimension == "age_group"
+    level = case(
+        (PatientRiskScore.probability >= COHORT_RISK_HIGH, literal(RISK_LEVELS[2])),
+        (PatientRiskScore.probability >= COHORT_RISK_MODERATE, literal(RISK_LEVELS[1])),
+        else_=literal(RISK_LEVELS[0]),
+    )
+    queries = [
+        select(DoctorPatient.patient_id)
+        .join(Patient, Patient.patient_id == DoctorPatient.patient_id)
+        .outerjoin(PatientCohortMembership, and_(
+            PatientCohortMembership.doctor_id == DoctorPatient.doctor_id,
+            PatientCohortMembership.patient_id == DoctorPatient.patient_id,
+            age_row,
+        ))
+        .where(or_(PatientCohortMembership.patient_id.is_(None), PatientCohortMembership.patient_revision != Patient.revision)),
+        select(PatientCohortMembership.patient_id)
+        .join(PatientRiskScore, and_(
+            PatientRiskScore.patient_id == PatientCohortMembership.patient_id,
+            PatientRiskScore.model_name == COHORT_RISK_MODEL,
+        ))
+        .where(PatientCohortMembership.dimension == "risk_level", PatientCohortMembership.bucket != level),
+        select(PatientCohortMembership.patient_id)
+        .outerjoin(DoctorPatient, and_(
+            DoctorPatient.doctor_id == PatientCohortMembership.doctor_id,
+            DoctorPatient.patient_id == PatientCohortMembership.patient_id,
+        ))
+        .where(age_row, DoctorPatient.patient_id.is_(None)),
+    ]
+    ids = set()
+    for query in queries:
+        ids.update(db.execute(query).scalars())
+    return sorted(ids)
+
+def rebuild_cohort_rollups(db: Session, batch_size: int = COHORT_REBUILD_BATCH_SIZE) -> tuple:
+    """
+    Bring every patient's buckets up to date, batch_size patients per transaction, then
+    recount all counters from patient_cohort_memberships with one grouped INSERT ... SELECT,
+    which also repairs counters that drifted. Returns (patients checked, counter rows).
+    """
+    checked = 0
+    last_id = None
+    while True:
+        query = select(Patient.patient_id).order_by(Patient.patient_id).limit(batch_size)
+        if last_id is not None:
+            query = query.where(Patient.patient_id > last_id)
+        ids = db.execute(query).scalars().all()
+        if not ids:
+            break
+        checked += refresh_patients(db, ids)
+        last_id = ids[-1]
+
+    # Deleted patients aren't in the walk above; refreshing them subtracts what they still count
+    deleted = db.execute(
+        select(PatientCohortMembership.patient_id).distinct()
+        .outerjoin(Patient, Patient.patient_id == PatientCohortMembership.patient_id)
+        .where(Patient.patient_id.is_(None))
+    ).scalars().all()
+    for start in range(0, len(deleted), batch_size):
+        refresh_patients(db, deleted[start:start + batch_size])
+
+    db.execute(delete(DoctorCohortRollup))
+    db.execute(insert(DoctorCohortRollup).from_select(
+        ["doctor_id", "dimension", "bucket", "patient_count", "updated_at"],
+        select(PatientCohortMembership.doctor_id, PatientCohortMembership.dimension, PatientCohortMembership.bucket, func.count(), literal(_utcnow()))
+        .group_by(PatientCohortMembership.doctor_id, PatientCohortMembership.dimension, PatientCohortMembership.bucket)
+    ))
+    db.commit()
+    return checked, db.execute(select(func.count()).select_from(DoctorCohortRollup)).scalar()
+
+class CohortRefresher:
+    """
+    Daemon thread keeping doctor_cohort_rollups current.
+
+    Committed sessions hand over the patients they changed (notify) and the thread refreshes
+    them right away, in batches. Every COHORT_SWEEP_SECONDS it also refreshes whatever
+    stale_patient_ids finds, which covers writes from other processes, the scoring job and
+    anything missed while the API was down.
+    """
+    def __init__(self, session_factory=SessionLocal, batch_size: int = COHORT_REFRESH_BATCH_SIZE,
+                 sweep_seconds: float = COHORT_SWEEP_SECONDS):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.sweep_seconds = sweep_seconds
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stopping.is_set()
+
+    def notify(self, patient_ids):
+        with self._pending_lock:
+            self._pending.update(patient_ids)
+        self._wake.set()
+
+    def _take(self) -> list:
+        with self._pending_lock:
+            batch = sorted(self._pending)[:self.batch_size]
+            self._pending.difference_update(batch)
+        return batch
+
+    def refresh(self, patient_ids) -> int:
+        db = self.session_factory()
+        try:
+            try:
+                return refresh_patients(db, patient_ids)
+            except IntegrityError:
+                # Another process created the same counter row first; this time it gets updated
+                db.rollback()
+                return refresh_patients(db, patient_ids)
+        finally:
+            db.close()
+
+    def sweep(self) -> int:
+        db = self.session_factory()
+        try:
+            patient_ids = stale_patient_ids(db)
+        finally:
+            db.close()
+        for start in range(0, len(patient_ids), self.batch_size):
+            if self._stopping.is_set():
+                break
+            self.refresh(patient_ids[start:start + self.batch_size])
+        return len(patient_ids)
+
+    def _run(self):
+        next_sweep = time.monotonic()
+        while not self._stopping.is_set():
+            # Cleared before draining, so patients notified meanwhile wake the next wait immediately
+            self._wake.clear()
+            try:
+                batch = self._take()
+                while batch and not self._stopping.is_set():
+                    self.refresh(batch)
+                    batch = self._take()
+                if time.monotonic() >= next_sweep:
+                    next_sweep = time.monotonic() + self.sweep_seconds
+                    self.sweep()
+            except Exception as e:
+                # Patients of a failed batch are picked up again by the next sweep
+                print(f"Cohort refresher error: {e}")
+            self._wake.wait(max(0.0, next_sweep - time.monotonic()))
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="cohort-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """
+        Stop after the current batch. Anything not refreshed yet is found by the next sweep.
+        """
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+cohort_refresher = CohortRefresher()
+
+@event.listens_for(Session, "after_flush")
+def _collect_link_changes(session, flush_context):
+    # Linking, unlinking or deleting a patient moves counters without bumping patients.revision
+    changed = {obj.patient_id for obj in (*session.new, *session.deleted) if isinstance(obj, DoctorPatient)}
+    changed.update(obj.patient_id for obj in session.deleted if isinstance(obj, Patient))
+    changed.discard(None)
+    if changed:
+        session.info.setdefault("revised_patient_ids", set()).update(changed)
+
+@event.listens_for(Session, "after_commit")
+def _refresh_committed_patients(session):
+    patient_ids = session.info.pop("revised_patient_ids", None)
+    if patient_ids and cohort_refresher.running:
+        cohort_refresher.notify(patient_ids)
+
+def doctor_cohorts_query(doctor_id: int, dimension: str = None):
+    """
+    The doctor's non-empty counters, largest first within each dimension. Touches only
+    doctor_cohort_rollups (a row per bucket), however many patients the doctor has.
+    """
+    query = select(DoctorCohortRollup.dimension, DoctorCohortRollup.bucket,
+                   DoctorCohortRollup.patient_count, DoctorCohortRollup.updated_at) \
+        .where(DoctorCohortRollup.doctor_id == doctor_id, DoctorCohortRollup.patient_count > 0)
+    if dimension is not None:
+        query = query.where(DoctorCohortRollup.dimension == dimension)
+    return query.order_by(DoctorCohortRollup.dimension, DoctorCohortRollup.patient_count.desc(), DoctorCohortRollup.bucket)
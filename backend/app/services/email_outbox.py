@@ -0,0 +1,221 @@
+# services/email_outbox.py
+
+import base64
+import os
+import random
+import smtplib
+import threading
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+import resend
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from backend.app.core.config import SessionLocal, _env_bool
+from backend.app.models.email_job import EmailJob
+
+EMAIL_FROM = os.getenv("EMAIL_FROM", "DeepCardio <onboarding@resend.dev>")
+# "resend" (HTTP API; RESEND_API_URL can point at a local sink) or "smtp"
+EMAIL_TRANSPORT = os.getenv("EMAIL_TRANSPORT", "resend")
+EMAIL_SMTP_HOST = os.getenv("EMAIL_SMTP_HOST", "localhost")
+EMAIL_SMTP_PORT = int(os.getenv("EMAIL_SMTP_PORT", "25"))
+EMAIL_SMTP_USER = os.getenv("EMAIL_SMTP_USER")
+EMAIL_SMTP_PASSWORD = os.getenv("EMAIL_SMTP_PASSWORD")
+EMAIL_SMTP_STARTTLS = _env_bool("EMAIL_SMTP_STARTTLS", False)
+EMAIL_SEND_TIMEOUT_SECONDS = float(os.getenv("EMAIL_SEND_TIMEOUT_SECONDS", "30"))
+
+EMAIL_SENDER_WORKERS = int(os.getenv("EMAIL_SENDER_WORKERS", "2"))
+EMAIL_POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS", "5"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", "3600"))
+# A job claimed by a sender that then died becomes claimable again after this long
+EMAIL_LEASE_SECONDS = float(os.getenv("EMAIL_LEASE_SECONDS", "300"))
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class ResendTransport:
+    def send(self, job: EmailJob) -> str:
+        api_key = os.getenv("RESEND_API_KEY")
+        if not api_key:
+            raise RuntimeError("Resend API key not configured")
+        resend.api_key = api_key
+
+        params = {
+            "from": EMAIL_FROM,
+            "to": [job.to_email],
+            "subject": job.subject,
+            "html": job.html,
+        }
+        if job.attachment is not None:
+            params["attachments"] = [{
+                "filename": job.attachment_filename,
+                # Base64 string, not a list of ints: one compact copy however large the file is
+                "content": base64.b64encode(job.attachment).decode("ascii"),
+                "content_type": job.attachment_content_type,
+            }]
+        return resend.Emails.send(params)["id"]
+
+class SmtpTransport:
+    def send(self, job: EmailJob) -> str:
+        message = EmailMessage()
+        message["From"] = EMAIL_FROM
+        message["To"] = job.to_email
+        message["Subject"] = job.subject
+        message.set_content("This message is best viewed in an HTML-capable email client.")
+        message.add_alternative(job.html, subtype="html")
+        if job.attachment is not None:
+            maintype, _, subtype = (job.attachment_content_type or "application/octet-stream").partition("/")
+            message.add_attachment(job.attachment, maintype=maintype, subtype=subtype, filename=job.attachment_filename)
+
+        with smtplib.SMTP(EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, timeout=EMAIL_SEND_TIMEOUT_SECONDS) as smtp:
+            if EMAIL_SMTP_STARTTLS:
+                smtp.starttls()
+            if EMAIL_SMTP_USER:
+                smtp.login(EMAIL_SMTP_USER, EMAIL_SMTP_PASSWORD)
+            smtp.send_message(message)
+        return message.get("Message-ID") or ""
+
+TRANSPORTS = {"resend": ResendTransport, "smtp": SmtpTransport}
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Exponential backoff with jitter: base, 2x base, 4x base ... capped at EMAIL_RETRY_MAX_SECONDS.
+    """
+    delay = min(EMAIL_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), EMAIL_RETRY_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+class EmailSender:
+    """
+    Pool of daemon threads delivering email_outbox jobs.
+
+    Each worker claims one due job at a time with a conditional UPDATE, so several workers
+    (or several API processes) never send the same job twice while its lease holds. New jobs
+    wake the pool immediately; otherwise it polls every EMAIL_POLL_SECONDS for retries.
+    """
+    def __init__(self, session_factory=SessionLocal, workers: int = EMAIL_SENDER_WORKERS, transport=None):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.transport = transport
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _transport(self):
+        if self.transport is None:
+            self.transport = TRANSPORTS[EMAIL_TRANSPORT]()
+        return self.transport
+
+    def notify(self):
+        self._wake.set()
+
+    def _claim(self, db: Session):
+        now = _utcnow()
+        due = (EmailJob.status.in_(("pending", "sending")), EmailJob.next_attempt_at <= now)
+        while True:
+            job_id = db.execute(
+                select(EmailJob.id).where(*due).order_by(EmailJob.next_attempt_at, EmailJob.id).limit(1)
+            ).scalar()
+            if job_id is None:
+                return None
+            claimed = db.execute(
+                update(EmailJob)
+                .where(EmailJob.id == job_id, *due)
+                .values(status="sending", attempts=EmailJob.attempts + 1,
+                        next_attempt_at=now + timedelta(seconds=EMAIL_LEASE_SECONDS))
+            ).rowcount
+            db.commit()
+            if claimed == 1:
+                return db.get(EmailJob, job_id)
+            # Another worker got it first; look for the next one
+
+    def process_one(self) -> bool:
+        """
+        Deliver (or reschedule) one due job. Returns False when nothing was due.
+        """
+        db = self.session_factory()
+        try:
+            job = self._claim(db)
+            if job is None:
+                return False
+            try:
+                provider_id = self._transport().send(job)
+            except Exception as e:
+                job.last_error = str(e)[:2000]
+                if job.attempts >= EMAIL_MAX_ATTEMPTS:
+                    job.status = "failed"
+                    print(f"Email job {job.id} to {job.to_email} failed permanently: {e}")
+                else:
+                    job.status = "pending"
+                    job.next_attempt_at = _utcnow() + retry_delay(job.attempts)
+                    print(f"Email job {job.id} attempt {job.attempts} failed, retrying: {e}")
+            else:
+                job.status = "sent"
+                job.sent_at = _utcnow()
+                job.provider_id = provider_id
+                job.last_error = None
+                job.attachment = None  # delivered; no need to keep the file around
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            # Cleared before draining, so a job queued meanwhile wakes the next wait immediately
+            self._wake.clear()
+            try:
+                while not self._stopping.is_set() and self.process_one():
+                    pass
+            except Exception as e:
+                print(f"Email sender error: {e}")
+            self._wake.wait(EMAIL_POLL_SECONDS)
+
+    def start(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            if self._threads:
+                return
+            self._stopping.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"email-sender-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 10):
+        """
+        Stop the workers after their current send. Unsent jobs stay in the outbox for next time.
+        """
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+email_sender = EmailSender()
+
+def enqueue_email(db: Session, to_email: str, subject: str, html: str, attachment: bytes = None,
+                  attachment_filename: str = None, attachment_content_type: str = None,
+                  patient_id: int = None, requested_by: str = None) -> int:
+    """
+    Persist an email in the outbox and wake the sender; returns the job id.
+    Delivery happens in the background.
+    """
+    job = EmailJob(
+        to_email=to_email,
+        subject=subject,
+        html=html,
+        attachment=attachment,
+        attachment_filename=attachment_filename,
+        attachment_content_type=attachment_content_type,
+        patient_id=patient_id,
+        requested_by=requested_by,
+        status="pending",
+        next_attempt_at=_utcnow(),
+    )
+    db.add(job)
+    db.flush()
+    job_id = job.id
+    db.commit()
+    email_sender.notify()
+    return job_id
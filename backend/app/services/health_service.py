@@ -1,3 +1,11 @@
+from backend.app.core.config import get_pool_status
+from backend.app.core.db_router import read_router
 
 def get_status():
     return {"status": "DeepCardio API is healthy!"}
+
+def get_db_pool_status():
+    return get_pool_status()
+
+async def get_db_replica_status():
+    return await read_router.status()
@@ -0,0 +1,95 @@
+# services/llm_client.py
+
+import json
+import os
+import httpx
+from dotenv import load_dotenv
+from backend.app.core.config import _env_bool
+
+load_dotenv()
+
+# Chat completions upstream. OPENAI_BASE_URL can point at a local mock server for testing.
+OPENAI_KEY = os.getenv("OPENAI_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+OPENAI_ENDPOINT = f"{OPENAI_BASE_URL}/chat/completions"
+MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "120"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_READ_TIMEOUT_SECONDS = float(os.getenv("LLM_READ_TIMEOUT_SECONDS", "60"))
+
+try:
+    import h2  # noqa: F401  (httpx's HTTP/2 support)
+    LLM_HTTP2 = _env_bool("LLM_HTTP2", True)
+except ImportError:
+    LLM_HTTP2 = False
+
+class LLMClient:
+    """
+    One pooled httpx.AsyncClient per process for the completions API, so requests reuse
+    warm (HTTP/2 when h2 is installed) connections instead of paying a TLS handshake each.
+    Opened at app startup, or lazily on first use by scripts and tests.
+    """
+    def __init__(self, endpoint: str = OPENAI_ENDPOINT, api_key: str = OPENAI_KEY, model: str = MODEL):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.model = model
+        self._client = None
+
+    async def start(self):
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=LLM_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                    keepalive_expiry=LLM_KEEPALIVE_SECONDS,
+                ),
+                timeout=httpx.Timeout(LLM_READ_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        await self.start()
+        return self._client
+
+    def _payload(self, messages: list, stream: bool) -> dict:
+        return {"model": self.model, "temperature": 0, "messages": messages, "stream": stream}
+
+    async def complete(self, messages: list) -> str:
+        """
+        Full completion text. Raises httpx.HTTPStatusError on an upstream error.
+        """
+        client = await self._get_client()
+        response = await client.post(self.endpoint, json=self._payload(messages, stream=False))
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def stream(self, messages: list):
+        """
+        Yield content deltas as the upstream produces them.
+        Raises httpx.HTTPStatusError (before the first delta) on an upstream error.
+        """
+        client = await self._get_client()
+        async with client.stream("POST", self.endpoint, json=self._payload(messages, stream=True)) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                choices = json.loads(data).get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+llm_client = LLMClient()
@@ -0,0 +1,151 @@
+# services/patient_context.py
+
+import os
+import threading
+import time
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.utils.lru_cache import LRUCache
+from backend.app.models.patient import Patient
+from backend.app.models.vital_signs_dict import VitalSignsDict
+from backend.app.models.patient_vital_signs import PatientVitalSigns
+from backend.app.services import patient_service_async
+
+# (patient_id, revision) -> prompt context. A new revision is a new key, so entries never go stale.
+PATIENT_CONTEXT_CACHE_SIZE = int(os.getenv("PATIENT_CONTEXT_CACHE_SIZE", "2000"))
+patient_context_cache = LRUCache(PATIENT_CONTEXT_CACHE_SIZE)
+
+# Conversation history kept per (doctor_id, conversation_id), trimmed to a token budget
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))
+CHAT_HISTORY_TTL_SECONDS = float(os.getenv("CHAT_HISTORY_TTL_SECONDS", "7200"))
+CHAT_HISTORY_MAX_CONVERSATIONS = int(os.getenv("CHAT_HISTORY_MAX_CONVERSATIONS", "5000"))
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; close enough for budgeting
+    return len(text) // 4 + 1
+
+def _items(label: str, values) -> str:
+    values = sorted(v for v in values if v)
+    return f"{label}: {'; '.join(values)}" if values else ""
+
+def _age(dob: date) -> int:
+    today = date.today()
+    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+
+async def _latest_vitals(db: AsyncSession, patient_id: int) -> list:
+    result = await db.execute(
+        select(VitalSignsDict.name, VitalSignsDict.unit, PatientVitalSigns.value, PatientVitalSigns.measurement_date)
+        .join(PatientVitalSigns, VitalSignsDict.vital_sign_id == PatientVitalSigns.vital_sign_id)
+        .where(PatientVitalSigns.patient_id == patient_id, PatientVitalSigns.resolved_at.is_(None))
+        .order_by(PatientVitalSigns.vital_sign_id, PatientVitalSigns.measurement_date.desc(), PatientVitalSigns.id.desc())
+    )
+    latest = {}
+    for row in result.all():
+        latest.setdefault(row.name, row)
+    return [f"{r.name} {r.value}{' ' + r.unit if r.unit else ''}" for r in latest.values()]
+
+async def build_patient_context(db: AsyncSession, patient: Patient) -> str:
+    """
+    Compact, deterministic clinical summary of a patient for the chat prompt: one line per
+    section, items sorted, no contact details. Identical inputs always give identical text.
+    """
+    patient_id = patient.patient_id
+    symptoms = await patient_service_async.get_patient_symptoms(db, patient_id)
+    history = await patient_service_async.get_patient_personal_history(db, patient_id)
+    vitals = await _latest_vitals(db, patient_id)
+    tests = await patient_service_async.get_patient_tests(db, patient_id)
+    items = await patient_service_async.get_patient_summary_items(db, patient_id)
+    risks = await patient_service_async.get_patient_risks(db, patient_id)
+
+    bmi = f", BMI {patient.weight / (patient.height / 100) ** 2:.1f}" if patient.weight and patient.height else ""
+    lines = [
+        f"{_age(patient.dob)}y {patient.gender}, {patient.weight} kg, {patient.height} cm{bmi}, "
+        f"smoker {'yes' if patient.smoke else 'no'}, alcohol {'yes' if patient.alco else 'no'}, "
+        f"physically active {'yes' if patient.active else 'no'}",
+        _items("Symptoms", (s.name for s in symptoms)),
+        _items("History", (h.name for h in history)),
+        _items("Vitals", vitals),
+        _items("Tests", (
+            f"{t.name} {t.result_value}{' ' + t.units if t.units else ''}"
+            f"{' (' + t.test_date.isoformat() + ')' if t.test_date else ''}"
+            for t in tests
+        )),
+        _items("Risks", {f"{r.value}: {r.reason[:160]}" for r in risks}),
+        _items("Presumptive diagnoses", (
+            f"{d.diagnosis_name}{' (' + d.confidence_level + ')' if d.confidence_level else ''}"
+            for d in items["presumptive_diagnoses"]
+        )),
+        _items("Follow-up", (a.action for a in items["follow_up_actions"])),
+        _items("Recommendations", (r.recommendation for r in items["recommendations"])),
+        _items("Tests to order", (t.test_to_order for t in items["tests_to_order"])),
+    ]
+    return "\n".join(line for line in lines if line)
+
+async def get_patient_context(db: AsyncSession, patient: Patient) -> str:
+    key = (patient.patient_id, patient.revision)
+    context = patient_context_cache.get(key)
+    if context is None:
+        context = await build_patient_context(db, patient)
+        patient_context_cache.set(key, context)
+    return context
+
+class ConversationStore:
+    """
+    In-process chat history per (doctor_id, conversation_id).
+
+    `history` returns the most recent turns that fit the token budget. Older turns are
+    folded into a short note listing the doctor's earlier questions, so long sessions keep
+    their thread without resending every answer upstream.
+    """
+    def __init__(self, token_budget: int = CHAT_HISTORY_TOKEN_BUDGET, ttl: float = CHAT_HISTORY_TTL_SECONDS,
+                 max_conversations: int = CHAT_HISTORY_MAX_CONVERSATIONS):
+        self.token_budget = token_budget
+        self.ttl = ttl
+        self._conversations = LRUCache(max_conversations)
+        self._lock = threading.Lock()
+
+    def _get(self, key) -> dict:
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            conversation = {"turns": [], "earlier_questions": []}
+        self._conversations.set(key, conversation, expires_at=time.time() + self.ttl)
+        return conversation
+
+    def append(self, doctor_id: int, conversation_id: str, question: str, answer: str):
+        with self._lock:
+            conversation = self._get((doctor_id, conversation_id))
+            conversation["turns"].append((question, answer))
+            self._trim(conversation)
+
+    def _trim(self, conversation: dict):
+        turns = conversation["turns"]
+        used = sum(estimate_tokens(q) + estimate_tokens(a) for q, a in turns)
+        while len(turns) > 1 and used > self.token_budget:
+            question, answer = turns.pop(0)
+            used -= estimate_tokens(question) + estimate_tokens(answer)
+            conversation["earlier_questions"].append(question[:200])
+        # The note itself gets at most a quarter of the budget
+        earlier = conversation["earlier_questions"]
+        while earlier and sum(estimate_tokens(q) for q in earlier) > self.token_budget // 4:
+            earlier.pop(0)
+
+    def history(self, doctor_id: int, conversation_id: str) -> list:
+        """
+        Prior turns as chat messages, oldest first.
+        """
+        with self._lock:
+            conversation = self._get((doctor_id, conversation_id))
+            messages = []
+            if conversation["earlier_questions"]:
+                messages.append({
+                    "role": "system",
+                    "content": "Earlier in this conversation the doctor asked: "
+                               + " | ".join(conversation["earlier_questions"])
+                })
+            for question, answer in conversation["turns"]:
+                messages.append({"role": "user", "content": question})
+                messages.append({"role": "assistant", "content": answer})
+            return messages
+
+conversation_store = ConversationStore()
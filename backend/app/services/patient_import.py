@@ -0,0 +1,316 @@
+# services/patient_import.py
+
+import csv
+import io
+import json
+import os
+from datetime import date, datetime, timezone
+from itertools import islice
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from backend.app.models.patient import Patient
+from backend.app.models.doctor_patient import DoctorPatient
+from backend.app.models.audit_log import AuditLog
+from backend.app.models.patient_revision import bump_patient_revision
+from backend.app.services.audit_service import audit_row
+from backend.app.services.clinical_readings import vital_sign_names, test_names, insert_vital_signs, insert_tests
+
+# Records validated and written per transaction
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+# Row errors listed in an import report; all of them are counted
+IMPORT_ERROR_LIMIT = int(os.getenv("IMPORT_ERROR_LIMIT", "1000"))
+
+PATIENT_FIELDS = ("first_name", "last_name", "gender", "dob", "ethnicity", "phone", "email", "marital_status",
+                  "occupation", "insurance_provider", "address", "weight", "height", "smoke", "alco", "active")
+REQUIRED_FIELDS = ("first_name", "last_name", "gender", "dob", "ethnicity")
+# Same defaults as PatientCreate
+INT_DEFAULTS = {"weight": 70, "height": 170, "smoke": 0, "alco": 0, "active": 1}
+FLAG_FIELDS = ("smoke", "alco", "active")
+TEXT_FIELDS = tuple(f for f in PATIENT_FIELDS if f not in INT_DEFAULTS and f != "dob")
+MAX_LENGTH = {f: Patient.__table__.c[f].type.length for f in TEXT_FIELDS if Patient.__table__.c[f].type.length}
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+# Flat readings, for CSV columns (or NDJSON keys): "vital:<name or id>" and "test:<name or id>".
+# The reading dates come from the record's measurement_date / test_date, default today.
+VITAL_PREFIX = "vital:"
+TEST_PREFIX = "test:"
+
+def read_csv_records(stream):
+    """
+    Yield (line, record, error) for each row of a CSV byte stream, header first.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    try:
+        for record in reader:
+            yield reader.line_num, record, None
+    except (csv.Error, UnicodeDecodeError) as e:
+        yield reader.line_num, None, f"Unreadable CSV: {e}"
+
+def read_ndjson_records(stream):
+    """
+    Yield (line, record, error) for each non-empty line of an NDJSON byte stream.
+    Records may list readings as "vitals": [{vital_sign_id | name, value, measurement_date}] and
+    "tests": [{test_id | name, result_value, test_date, notes}] besides the flat columns.
+    """
+    line = 0
+    try:
+        for line, text in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as e:
+                yield line, None, f"Invalid JSON: {e}"
+                continue
+            if isinstance(record, dict):
+                yield line, record, None
+            else:
+                yield line, None, "Expected a JSON object"
+    except UnicodeDecodeError as e:
+        yield line + 1, None, f"Unreadable text: {e}"
+
+READERS = {"csv": read_csv_records, "ndjson": read_ndjson_records}
+SUFFIXES = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+def format_for_filename(filename: str):
+    """
+    READERS key for a file name's extension, or None.
+    """
+    name = (filename or "").lower()
+    return next((f for suffix, f in SUFFIXES.items() if name.endswith(suffix)), None)
+
+def _text(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _date(value):
+    value = _text(value)
+    return None if value is None else datetime.strptime(value, "%Y-%m-%d").date()
+
+def _catalog_key(key, names: dict, lookup: dict):
+    # Catalog entry by id (ints for vitals, strings for tests) or by case-insensitive name
+    key = _text(key)
+    if key is None:
+        return None
+    for candidate in (key, int(key) if key.isdigit() else None):
+        if candidate in names:
+            return candidate
+    return lookup.get(key.lower())
+
+def _readings(record: dict, vitals: dict, tests: dict, errors: list):
+    """
+    Vital and test readings of one record, resolved against the catalogs; problems are
+    appended to `errors`. Blank values are skipped.
+    """
+    vital_rows, test_rows = [], []
+    try:
+        measurement_date = _date(record.get("measurement_date")) or date.today()
+        test_date = _date(record.get("test_date")) or date.today()
+    except ValueError:
+        errors.append("measurement_date and test_date must be YYYY-MM-DD")
+        return [], []
+
+    entries = [(k[len(VITAL_PREFIX):], v, measurement_date) for k, v in record.items()
+               if isinstance(k, str) and k.startswith(VITAL_PREFIX)]
+    entries += [(v.get("vital_sign_id", v.get("name")), v.get("value"), v.get("measurement_date"))
+                for v in record.get("vitals") or () if isinstance(v, dict)]
+    for key, value, when in entries:
+        value = _text(value)
+        if value is None:
+            continue
+        vital_sign_id = _catalog_key(key, vitals["names"], vitals["lookup"])
+        if vital_sign_id is None:
+            errors.append(f"Unknown vital sign '{key}'")
+            continue
+        if len(value) > 20:
+            errors.append(f"Vital sign '{key}' value is longer than 20 characters")
+            continue
+        try:
+            when = when if isinstance(when, date) else (_date(when) or measurement_date)
+        except ValueError:
+            errors.append(f"Vital sign '{key}' measurement_date must be YYYY-MM-DD")
+            continue
+        vital_rows.append({"vital_sign_id": vital_sign_id, "value": value, "measurement_date": when})
+
+    entries = [(k[len(TEST_PREFIX):], v, test_date, None) for k, v in record.items()
+               if isinstance(k, str) and k.startswith(TEST_PREFIX)]
+    entries += [(t.get("test_id", t.get("name")), t.get("result_value"), t.get("test_date"), _text(t.get("notes")))
+                for t in record.get("tests") or () if isinstance(t, dict)]
+    for key, value, when, notes in entries:
+        value = _text(value)
+        if value is None:
+            continue
+        test_id = _catalog_key(key, tests["names"], tests["lookup"])
+        if test_id is None:
+            errors.append(f"Unknown test '{key}'")
+            continue
+        if len(value) > 50:
+            errors.append(f"Test '{key}' result is longer than 50 characters")
+            continue
+        try:
+            when = when if isinstance(when, date) else (_date(when) or test_date)
+        except ValueError:
+            errors.append(f"Test '{key}' test_date must be YYYY-MM-DD")
+            continue
+        test_rows.append({"test_id": test_id, "result_value": value, "test_date": when, "notes": notes})
+    return vital_rows, test_rows
+
+def validate_patients(records: list, today: date = None):
+    """
+    Check the patient columns of a chunk of records column by column.
+    Returns (frame of typed values, list of error lists, one per record).
+    """
+    today = today or date.today()
+    frame = pd.DataFrame([{f: _text(r.get(f)) for f in PATIENT_FIELDS} for r in records],
+                         columns=list(PATIENT_FIELDS), dtype=object)
+    errors = [[] for _ in records]
+
+    def flag(mask, message):
+        for i in np.flatnonzero(np.asarray(mask, dtype=bool)):
+            errors[i].append(message)
+
+    for field in REQUIRED_FIELDS:
+        flag(frame[field].isna(), f"{field} is required")
+    for field, length in MAX_LENGTH.items():
+        flag(frame[field].str.len().gt(length).fillna(False), f"{field} is longer than {length} characters")
+
+    frame["gender"] = frame["gender"].str.capitalize()
+    flag(frame["gender"].notna() & ~frame["gender"].isin(("Male", "Female")), "gender must be Male or Female")
+
+    dob = pd.to_datetime(frame["dob"], format="%Y-%m-%d", errors="coerce")
+    flag(frame["dob"].notna() & dob.isna(), "dob must be YYYY-MM-DD")
+    flag(dob.dt.date.gt(today).fillna(False), "dob is in the future")
+    frame["dob"] = dob.dt.date
+
+    flag(frame["email"].notna() & ~frame["email"].str.match(EMAIL_PATTERN).fillna(False), "email is not a valid address")
+
+    for field, default in INT_DEFAULTS.items():
+        number = pd.to_numeric(frame[field], errors="coerce")
+        flag(frame[field].notna() & (number.isna() | (number % 1 != 0)), f"{field} must be a whole number")
+        number = number.where(number % 1 == 0).fillna(default)
+        if field in FLAG_FIELDS:
+            flag(~number.isin((0, 1)), f"{field} must be 0 or 1")
+        else:
+            flag(number.le(0), f"{field} must be positive")
+        frame[field] = number.astype(np.int64)
+    # Missing text back to None (not NaN) for the inserts
+    frame[list(TEXT_FIELDS)] = frame[list(TEXT_FIELDS)].astype(object).where(frame[list(TEXT_FIELDS)].notna(), None)
+    return frame, errors
+
+def _patient_details(values: dict) -> dict:
+    # Same audit details as create_patient
+    return {**values, "dob": str(values["dob"])}
+
+def _write_patients(db: Session, doctor_id: int, records: list, readings: list, catalogs: dict, now: datetime) -> list:
+    # Patients, doctor links, audit rows and readings for validated records; returns their ids
+    patients = [Patient(**values) for values in records]
+    # One INSERT per patient on MySQL (each id is needed below), batched where RETURNING is available
+    db.add_all(patients)
+    db.flush()
+    patient_ids = [p.patient_id for p in patients]
+    db.execute(insert(DoctorPatient), [{"doctor_id": doctor_id, "patient_id": pid} for pid in patient_ids])
+    db.execute(insert(AuditLog), [
+        audit_row(doctor_id, "CREATE", "PATIENT", pid, f"Created patient {values['first_name']} {values['last_name']}",
+                  _patient_details({"patient_id": pid, **values}), created_at=now)
+        for pid, values in zip(patient_ids, records)
+    ])
+    vital_rows = [{"patient_id": pid, **row} for pid, (vitals, _) in zip(patient_ids, readings) for row in vitals]
+    test_rows = [{"patient_id": pid, **row} for pid, (_, tests) in zip(patient_ids, readings) for row in tests]
+    insert_vital_signs(db, doctor_id, vital_rows, catalogs["vitals"]["names"], now)
+    insert_tests(db, doctor_id, test_rows, catalogs["tests"]["names"], now)
+    # The doctor links went in with Core, which the revision listener doesn't see
+    bump_patient_revision(db, patient_ids)
+    return patient_ids
+
+def _write_one_by_one(db: Session, doctor_id: int, lines: list, records: list, readings: list,
+                      catalogs: dict, now: datetime, report: dict) -> list:
+    # The chunk's statements failed: retry each record in its own savepoint so only the
+    # records the database rejects are reported. Returns the ids, None for rejected records.
+    patient_ids = []
+    for line, values, record_readings in zip(lines, records, readings):
+        try:
+            with db.begin_nested():
+                patient_ids += _write_patients(db, doctor_id, [values], [record_readings], catalogs, now)
+        except Exception as e:
+            print(f"Patient import line {line} failed: {e}")
+            _report_error(report, line, [f"Not imported: {e}"])
+            patient_ids.append(None)
+    db.commit()
+    return patient_ids
+
+def import_chunk(db: Session, doctor_id: int, chunk: list, catalogs: dict, report: dict) -> list:
+    """
+    Validate and write one chunk of (line, record, error) entries in one transaction: patients,
+    doctor links, readings and audit rows. Invalid records are reported and skipped; if the
+    database rejects the chunk, its records are retried one at a time.
+    Returns the ids of imported patients that came with readings.
+    """
+    parsed = [(line, record) for line, record, error in chunk if record is not None]
+    for line, _, error in chunk:
+        if error is not None:
+            _report_error(report, line, [error])
+    if not parsed:
+        return []
+
+    frame, errors = validate_patients([record for _, record in parsed])
+    readings = [_readings(record, catalogs["vitals"], catalogs["tests"], errors[i]) for i, (_, record) in enumerate(parsed)]
+    valid = []
+    for i, (line, _) in enumerate(parsed):
+        if errors[i]:
+            _report_error(report, line, errors[i])
+        else:
+            valid.append(i)
+    if not valid:
+        return []
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    records = frame.iloc[valid].to_dict("records")
+    valid_readings = [readings[i] for i in valid]
+    try:
+        patient_ids = _write_patients(db, doctor_id, records, valid_readings, catalogs, now)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Patient import chunk failed, retrying its records one by one: {e}")
+        patient_ids = _write_one_by_one(db, doctor_id, [parsed[i][0] for i in valid], records, valid_readings,
+                                        catalogs, now, report)
+
+    imported = [(pid, record_readings) for pid, record_readings in zip(patient_ids, valid_readings) if pid is not None]
+    report["imported"] += len(imported)
+    report["patient_ids"].extend(pid for pid, _ in imported)
+    return [pid for pid, (vitals, tests) in imported if vitals or tests]
+
+def _report_error(report: dict, line: int, errors: list):
+    report["failed"] += 1
+    if len(report["errors"]) < IMPORT_ERROR_LIMIT:
+        report["errors"].append({"line": line, "errors": errors})
+    else:
+        report["errors_truncated"] = True
+
+def load_catalogs(db: Session) -> dict:
+    vitals, tests = vital_sign_names(db), test_names(db)
+    return {
+        "vitals": {"names": vitals, "lookup": {name.lower(): key for key, name in vitals.items()}},
+        "tests": {"names": tests, "lookup": {name.lower(): key for key, name in tests.items()}},
+    }
+
+def import_patients(db: Session, doctor_id: int, entries, chunk_size: int = IMPORT_CHUNK_SIZE):
+    """
+    Import a stream of (line, record, error) entries (see READERS) for a doctor, chunk_size
+    records per transaction. A bad record never stops the import; it is listed in the report.
+
+    Returns (report, ids of imported patients with readings, for rule evaluation).
+    """
+    catalogs = load_catalogs(db)
+    report = {"imported": 0, "failed": 0, "patient_ids": [], "errors": [], "errors_truncated": False}
+    with_readings = []
+    entries = iter(entries)
+    while True:
+        chunk = list(islice(entries, chunk_size))
+        if not chunk:
+            return report, with_readings
+        with_readings += import_chunk(db, doctor_id, chunk, catalogs, report)
@@ -0,0 +1,135 @@
+# services/patient_report.py
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import threading
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from backend.app.models.doctor import Doctor
+from backend.app.models.patient import Patient
+from backend.app.services.report_renderer import REPORT_TEMPLATE_VERSION, render_report_file
+
+# Rendered PDFs live at <dir>/<patient_id>/r<revision>-t<template>-g<YYYYMMDD>-d<doctor>-<variant>.pdf.
+# Any change to the patient's record bumps patients.revision; the report also prints its
+# generation date and the patient's age, so files are only reused on the day they were rendered.
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "deepcardio-reports"))
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+REPORT_BATCH_MAX = int(os.getenv("REPORT_BATCH_MAX", "500"))
+
+_pool = None
+_pool_lock = threading.Lock()
+# path -> asyncio.Future of a render in progress, so concurrent requests share one render
+_rendering = {}
+
+def get_report_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for PDF rendering, created on first use. Layout is CPU-bound pure Python,
+    so it runs outside the API process's GIL. "spawn" keeps the app's threads and DB
+    connections out of the workers.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=REPORT_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+def shutdown_report_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+def _discard_broken_pool(pool: ProcessPoolExecutor):
+    # A worker died (e.g. OOM-killed); the executor is unusable from then on, so start over
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def doctor_display_name(doctor: Doctor) -> str:
+    return f"{doctor.first_name or ''} {doctor.last_name or ''}".strip()
+
+def report_filename(patient: Patient, anonymous: bool) -> str:
+    if anonymous:
+        return f"patient_{patient.patient_id}_anonymous_report.pdf"
+    return f"{patient.first_name or 'patient'}_{patient.last_name or 'none'}_report.pdf"
+
+def _key_prefix(revision: int, generated_on: date) -> str:
+    return f"r{revision}-t{REPORT_TEMPLATE_VERSION}-g{generated_on:%Y%m%d}-"
+
+def report_path(patient_id: int, revision: int, doctor_id: int, anonymous: bool, generated_on: date = None) -> str:
+    variant = "anon" if anonymous else "full"
+    return os.path.join(
+        REPORT_CACHE_DIR, str(patient_id),
+        f"{_key_prefix(revision, generated_on or date.today())}d{doctor_id}-{variant}.pdf"
+    )
+
+def cached_report(patient_id: int, revision: int, doctor_id: int, anonymous: bool):
+    """
+    Path of today's cached PDF for this patient revision, or None if it hasn't been rendered.
+    """
+    path = report_path(patient_id, revision, doctor_id, anonymous)
+    return path if os.path.exists(path) else None
+
+def _prepare(revision: int, generated_on: date, path: str):
+    # Drop files for older revisions, templates or days of this patient; they can never be served again
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    current = _key_prefix(revision, generated_on)
+    for name in os.listdir(directory):
+        if not name.startswith(current):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+def render_report(report: dict, revision: int, doctor: Doctor, anonymous: bool = False) -> str:
+    """
+    Render (on the process pool) and cache one report; returns its path. Blocking, for sync code.
+    """
+    generated_on = date.today()
+    path = report_path(report["id"], revision, doctor.id, anonymous, generated_on)
+    if os.path.exists(path):
+        return path
+    _prepare(revision, generated_on, path)
+    pool = get_report_pool()
+    try:
+        return pool.submit(
+            render_report_file, report, doctor_display_name(doctor), anonymous, path, generated_on
+        ).result()
+    except BrokenProcessPool:
+        _discard_broken_pool(pool)
+        raise
+
+async def render_report_async(report: dict, revision: int, doctor: Doctor, anonymous: bool = False) -> str:
+    """
+    Async variant of render_report. Requests for a report that is already being rendered
+    wait for that render instead of starting another.
+    """
+    generated_on = date.today()
+    path = report_path(report["id"], revision, doctor.id, anonymous, generated_on)
+    if os.path.exists(path):
+        return path
+    pending, pool = _rendering.get(path), None
+    if pending is None:
+        _prepare(revision, generated_on, path)
+        pool = get_report_pool()
+        pending = asyncio.get_running_loop().run_in_executor(
+            pool, render_report_file, report, doctor_display_name(doctor), anonymous, path, generated_on
+        )
+        _rendering[path] = pending
+        pending.add_done_callback(lambda _: _rendering.pop(path, None))
+    try:
+        return await asyncio.shield(pending)
+    except BrokenProcessPool:
+        if pool is not None:
+            _discard_broken_pool(pool)
+        raise
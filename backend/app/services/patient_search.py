@@ -0,0 +1,230 @@
+# services/patient_search.py
+
+import itertools
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from backend.app.utils.lru_cache import LRUCache
+from backend.app.models.doctor_patient import DoctorPatient
+from backend.app.models.patient import Patient
+
+# doctor_id -> PatientNameIndex over the doctor's patients.
+# The patient endpoints keep cached indexes current in this process; the TTL bounds
+# staleness for changes made by other workers.
+PATIENT_SEARCH_CACHE_SIZE = int(os.getenv("PATIENT_SEARCH_CACHE_SIZE", "1000"))
+PATIENT_SEARCH_TTL_SECONDS = float(os.getenv("PATIENT_SEARCH_TTL_SECONDS", "60"))
+search_index_cache = LRUCache(PATIENT_SEARCH_CACHE_SIZE)
+
+# Ticks for index updates, so an index built from rows read before a commit isn't cached after it
+_ticks = itertools.count(1)
+_changed_at = {}  # doctor_id -> tick of the last change to that doctor's patients
+_any_changed_at = 0  # tick of the last change that may touch any doctor's index
+
+# Ranking weights per query token
+EXACT_WORD, PREFIX_WORD, PHONETIC_WORD = 3, 2, 1
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+def fold(text: str) -> str:
+    """
+    Accent- and case-insensitive form of a name: "  José-María " -> "jose maria".
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", stripped.casefold()).strip()
+
+_SOUNDEX_CODES = {ch: code for letters, code in (
+    ("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"), ("r", "6")
+) for ch in letters}
+
+def soundex(word: str) -> str:
+    """
+    American Soundex of a folded word ("smith" and "smyth" -> "S530"); "" if it has no letters.
+    """
+    letters = [ch for ch in word if ch.isalpha()]
+    if not letters:
+        return ""
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for ch in letters[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w don't separate letters with the same code; vowels do
+        if ch not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+def _prefix_ids(entries: list, prefix: str) -> set:
+    ids = set()
+    i = bisect_left(entries, (prefix,))
+    while i < len(entries) and entries[i][0].startswith(prefix):
+        ids.add(entries[i][1])
+        i += 1
+    return ids
+
+def _discard(entries: list, entry: tuple):
+    i = bisect_left(entries, entry)
+    if i < len(entries) and entries[i] == entry:
+        del entries[i]
+
+class PatientNameIndex:
+    """
+    Name lookup over one doctor's patients.
+
+    Folded first names, last names and individual name words are kept in sorted
+    (key, patient_id) lists, so a prefix lookup is a bisect plus the matches; Soundex
+    codes of the words map to patient ids for phonetic matching.
+    """
+    def __init__(self, patients=()):
+        self._lock = threading.Lock()
+        self._patients = {}   # patient_id -> (first_name, last_name, gender, dob, folded first, folded last)
+        self._first = []
+        self._last = []
+        self._words = []
+        self._sounds = {}
+        for patient in patients:
+            self._add(patient.patient_id, patient.first_name, patient.last_name, patient.gender, patient.dob)
+
+    def __contains__(self, patient_id: int) -> bool:
+        return patient_id in self._patients
+
+    def __len__(self):
+        return len(self._patients)
+
+    @staticmethod
+    def _words_of(folded_first: str, folded_last: str) -> set:
+        return set(folded_first.split()) | set(folded_last.split())
+
+    def _add(self, patient_id, first_name, last_name, gender, dob):
+        folded_first, folded_last = fold(first_name), fold(last_name)
+        self._patients[patient_id] = (first_name, last_name, gender, dob, folded_first, folded_last)
+        insort(self._first, (folded_first, patient_id))
+        insort(self._last, (folded_last, patient_id))
+        for word in self._words_of(folded_first, folded_last):
+            insort(self._words, (word, patient_id))
+            self._sounds.setdefault(soundex(word), set()).add(patient_id)
+
+    def _remove(self, patient_id):
+        entry = self._patients.pop(patient_id, None)
+        if entry is None:
+            return
+        folded_first, folded_last = entry[4], entry[5]
+        _discard(self._first, (folded_first, patient_id))
+        _discard(self._last, (folded_last, patient_id))
+        for word in self._words_of(folded_first, folded_last):
+            _discard(self._words, (word, patient_id))
+            self._sounds.get(soundex(word), set()).discard(patient_id)
+
+    def upsert(self, patient: Patient):
+        with self._lock:
+            self._remove(patient.patient_id)
+            self._add(patient.patient_id, patient.first_name, patient.last_name, patient.gender, patient.dob)
+
+    def remove(self, patient_id: int):
+        with self._lock:
+            self._remove(patient_id)
+
+    def search(self, q: str = None, first_name: str = None, last_name: str = None, dob: date = None,
+               phonetic: bool = False, limit: int = 20) -> list:
+        """
+        Patients matching every given criterion, best first, as
+        (patient_id, first_name, last_name, gender, dob) tuples.
+
+        `first_name` / `last_name` match the start of that name; each word of `q` must match
+        the start of some word of either name (or, with `phonetic`, sound like one).
+        """
+        with self._lock:
+            candidates = None
+            scores = {}
+
+            def narrow(ids):
+                nonlocal candidates
+                candidates = set(ids) if candidates is None else candidates & ids
+
+            if first_name:
+                narrow(_prefix_ids(self._first, fold(first_name)))
+            if last_name:
+                narrow(_prefix_ids(self._last, fold(last_name)))
+            for token in fold(q).split() if q else ():
+                matched = {}
+                for patient_id in _prefix_ids(self._words, token):
+                    words = self._words_of(self._patients[patient_id][4], self._patients[patient_id][5])
+                    matched[patient_id] = EXACT_WORD if token in words else PREFIX_WORD
+                if phonetic:
+                    for patient_id in self._sounds.get(soundex(token), ()):
+                        matched.setdefault(patient_id, PHONETIC_WORD)
+                narrow(set(matched))
+                for patient_id, score in matched.items():
+                    scores[patient_id] = scores.get(patient_id, 0) + score
+
+            if candidates is None:
+                candidates = self._patients.keys()
+            if dob is not None:
+                candidates = [pid for pid in candidates if self._patients[pid][3] == dob]
+
+            ranked = sorted(
+                candidates,
+                key=lambda pid: (-scores.get(pid, 0), self._patients[pid][5], self._patients[pid][4], pid)
+            )
+            return [(pid, *self._patients[pid][:4]) for pid in ranked[:limit]]
+
+def get_patient_search_index(db: Session, doctor_id: int) -> PatientNameIndex:
+    index = search_index_cache.get(doctor_id)
+    if index is None:
+        read_at = next(_ticks)
+        rows = db.execute(
+            select(Patient.patient_id, Patient.first_name, Patient.last_name, Patient.gender, Patient.dob)
+            .join(DoctorPatient, DoctorPatient.patient_id == Patient.patient_id)
+            .where(DoctorPatient.doctor_id == doctor_id)
+        ).all()
+        index = PatientNameIndex(rows)
+        # Changed while we were reading: the rows may predate that commit, so don't keep them
+        if _changed_at.get(doctor_id, 0) < read_at and _any_changed_at < read_at:
+            search_index_cache.set(doctor_id, index, expires_at=time.time() + PATIENT_SEARCH_TTL_SECONDS)
+    return index
+
+def _changed(doctor_id: int = None):
+    global _any_changed_at
+    if doctor_id is None:
+        _any_changed_at = next(_ticks)
+    else:
+        _changed_at[doctor_id] = next(_ticks)
+
+def index_new_patient(doctor_id: int, patient: Patient):
+    """
+    Add a just-created patient to the doctor's index, if it is loaded.
+    """
+    _changed(doctor_id)
+    index = search_index_cache.get(doctor_id)
+    if index is not None:
+        index.upsert(patient)
+
+def reindex_patient(patient: Patient):
+    """
+    Refresh a patient's names in every loaded index that contains it.
+    """
+    _changed()
+    for index in search_index_cache.values():
+        if patient.patient_id in index:
+            index.upsert(patient)
+
+def drop_patient_search_index(doctor_id: int):
+    """
+    Forget a doctor's index (e.g. after a bulk import); the next search rebuilds it.
+    """
+    _changed(doctor_id)
+    search_index_cache.pop(doctor_id)
+
+def unindex_patient(patient_id: int):
+    _changed()
+    for index in search_index_cache.values():
+        index.remove(patient_id)
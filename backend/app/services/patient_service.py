@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import or_
 from datetime import date
+from backend.app.core.config import SessionLocal
 from backend.app.models.patient import Patient
 from backend.app.models.symptom_dict import SymptomDict
 from backend.app.models.patient_symptom import PatientSymptom
@@ -11,6 +12,7 @@ from backend.app.models.vital_signs_dict import VitalSignsDict
 from backend.app.models.patient_vital_signs import PatientVitalSigns
 from backend.app.models.tests_dict import TestsDict
 from backend.app.models.patient_tests import PatientTests
+from backend.app.models.patient_latest_tests import PatientLatestTests
 from backend.app.models.follow_up_actions_catalog import FollowUpActionCatalog
 from backend.app.models.personal_history_decision_rules import PersonalHistoryDecisionRule
 from backend.app.models.tests_decision_rules import TestsDecisionRule
@@ -67,41 +69,63 @@ def get_patient_vital_signs(db: Session, patient_id: int):
     )
 
 def get_patient_tests(db: Session, patient_id: int):
-    # Subquery to get the most recent record for each test_id
-    subquery = (
-        db.query(
-            PatientTests.patient_id,
-            PatientTests.test_id,
-            func.max(PatientTests.recorded_at).label('max_recorded_at')
-        )
-        .filter(PatientTests.patient_id == patient_id)
-        .group_by(PatientTests.patient_id, PatientTests.test_id)
-        .subquery()
-    )
-
-    # Main query to join with subquery and TestsDict to get full records
-    results = (
+    # Current state is read from the patient_latest_tests projection (one row per test_id)
+    return (
         db.query(
-            PatientTests.test_id,
-            PatientTests.test_date,
-            PatientTests.result_value,
-            PatientTests.notes,
+            PatientLatestTests.test_id,
+            PatientLatestTests.test_date,
+            PatientLatestTests.result_value,
+            PatientLatestTests.notes,
             TestsDict.name,
             TestsDict.category,
             TestsDict.units
         )
-        .join(TestsDict, PatientTests.test_id == TestsDict.id)
-        .join(
-            subquery,
-            (PatientTests.patient_id == subquery.c.patient_id) &
-            (PatientTests.test_id == subquery.c.test_id) &
-            (PatientTests.recorded_at == subquery.c.max_recorded_at)
-        )
-        .filter(PatientTests.patient_id == patient_id)
+        .join(TestsDict, PatientLatestTests.test_id == TestsDict.id)
+        .filter(PatientLatestTests.patient_id == patient_id)
         .all()
     )
 
-    return results
+def get_current_patient_tests(db: Session, patient_id: int):
+    return db.query(PatientLatestTests).filter(PatientLatestTests.patient_id == patient_id).all()
+
+def refresh_latest_test(db: Session, patient_id: int, test_id: str):
+    """
+    Recompute the patient_latest_tests row for (patient_id, test_id) from patient_tests.
+    Does not commit, so the projection is written in the caller's transaction.
+    """
+    db.flush()
+
+    latest = (
+        db.query(PatientTests)
+        .filter(
+            PatientTests.patient_id == patient_id,
+            PatientTests.test_id == test_id,
+            PatientTests.resolved_at.is_(None)
+        )
+        .order_by(PatientTests.recorded_at.desc(), PatientTests.id.desc())
+        .first()
+    )
+
+    current = db.query(PatientLatestTests).filter(
+        PatientLatestTests.patient_id == patient_id,
+        PatientLatestTests.test_id == test_id
+    ).first()
+
+    if latest is None:
+        if current:
+            db.delete(current)
+        return None
+
+    if current is None:
+        current = PatientLatestTests(patient_id=patient_id, test_id=test_id)
+        db.add(current)
+
+    current.patient_test_id = latest.id
+    current.test_date = latest.test_date
+    current.result_value = latest.result_value
+    current.notes = latest.notes
+    current.recorded_at = latest.recorded_at
+    return current
 
 def get_age_group(age: int) -> str:
     if age < 45:
@@ -206,7 +230,7 @@ def get_follow_up_actions_from_tests(db: Session, patient_id: int):
     age = today.year - patient.dob.year - ((today.month, today.day) < (patient.dob.month, patient.dob.day))
     age_group = get_age_group(age)
 
-    tests = db.query(PatientTests).filter(PatientTests.patient_id == patient_id).all()
+    tests = get_current_patient_tests(db, patient_id)
     if not tests:
         return []
 
@@ -251,7 +275,7 @@ def get_follow_up_actions_from_vital_signs(db: Session, patient_id: int):
     action_keys = set()
 
     for vs in vitals:
-        patient_val = parse_float_or_none(vs.value)
+        patient_val = vs.numeric_value
         if patient_val is None:
             continue  # Skip invalid numeric values
 
@@ -330,7 +354,7 @@ def get_recommendations_from_vital_signs(db: Session, patient_id: int):
     recommendation_keys = set()
 
     for vs in vitals:
-        patient_val = parse_float_or_none(vs.value)
+        patient_val = vs.numeric_value
         if patient_val is None:
             continue
 
@@ -402,7 +426,7 @@ def get_recommendations_from_tests(db: Session, patient_id: int):
     age = today.year - patient.dob.year - ((today.month, today.day) < (patient.dob.month, patient.dob.day))
     age_group = get_age_group(age)
 
-    tests = db.query(PatientTests).filter(PatientTests.patient_id == patient_id).all()
+    tests = get_current_patient_tests(db, patient_id)
     if not tests:
         return []
 
@@ -522,7 +546,7 @@ def get_referrals_from_tests(db: Session, patient_id: int):
     age = today.year - patient.dob.year - ((today.month, today.day) < (patient.dob.month, patient.dob.day))
     age_group = get_age_group(age)
 
-    tests = db.query(PatientTests).filter(PatientTests.patient_id == patient_id).all()
+    tests = get_current_patient_tests(db, patient_id)
     if not tests:
         return []
 
@@ -567,7 +591,7 @@ def get_referrals_from_vital_signs(db: Session, patient_id: int):
     referral_keys = set()
 
     for vs in vitals:
-        patient_val = parse_float_or_none(vs.value)
+        patient_val = vs.numeric_value
         if patient_val is None:
             continue  # Skip invalid entries
 
@@ -679,7 +703,7 @@ def get_risks_from_tests(db: Session, patient_id: int):
     age = today.year - patient.dob.year - ((today.month, today.day) < (patient.dob.month, patient.dob.day))
     age_group = get_age_group(age)
 
-    tests = db.query(PatientTests).filter(PatientTests.patient_id == patient_id).all()
+    tests = get_current_patient_tests(db, patient_id)
     if not tests:
         return []
 
@@ -724,7 +748,7 @@ def get_risks_from_vital_signs(db: Session, patient_id: int):
     risk_keys = set()
 
     for vital in vitals:
-        value = parse_float_or_none(vital.value)
+        value = vital.numeric_value
         if value is None:
             continue
 
@@ -835,7 +859,7 @@ def get_lifestyle_advices_from_vital_signs(db: Session, patient_id: int):
     advice_keys = set()
 
     for vs in vitals:
-        value = parse_float_or_none(vs.value)
+        value = vs.numeric_value
         if value is None:
             continue
 
@@ -867,7 +891,7 @@ def get_lifestyle_advices_from_tests(db: Session, patient_id: int):
     age = today.year - patient.dob.year - ((today.month, today.day) < (patient.dob.month, patient.dob.day))
     age_group = get_age_group(age)
 
-    tests = db.query(PatientTests).filter(PatientTests.patient_id == patient_id).all()
+    tests = get_current_patient_tests(db, patient_id)
     if not tests:
         return []
 
@@ -974,7 +998,7 @@ def get_presumptive_diagnoses_from_tests(db: Session, patient_id: int):
     age = today.year - patient.dob.year - ((today.month, today.day) < (patient.dob.month, patient.dob.day))
     age_group = get_age_group(age)
 
-    tests = db.query(PatientTests).filter(PatientTests.patient_id == patient_id).all()
+    tests = get_current_patient_tests(db, patient_id)
     if not tests:
         return []
 
@@ -1019,7 +1043,7 @@ def get_presumptive_diagnoses_from_vital_signs(db: Session, patient_id: int):
     diagnosis_keys = set()
 
     for vital in vitals:
-        value = parse_float_or_none(vital.value)
+        value = vital.numeric_value
         if value is None:
             continue
 
@@ -1135,7 +1159,7 @@ def get_tests_to_order_from_vital_signs(db: Session, patient_id: int):
             VitalSignsDecisionRule.tests_key != None
         ).all()
 
-        patient_value = parse_float_or_none(vs.value)
+        patient_value = vs.numeric_value
 
         for rule in rules:
             if patient_value is not None and compare_values(patient_value, rule.min_value, rule.max_value):
@@ -1157,7 +1181,7 @@ def get_tests_to_order_from_tests(db: Session, patient_id: int):
     age = today.year - patient.dob.year - ((today.month, today.day) < (patient.dob.month, patient.dob.day))
     age_group = get_age_group(age)
 
-    tests = db.query(PatientTests).filter(PatientTests.patient_id == patient_id).all()
+    tests = get_current_patient_tests(db, patient_id)
     if not tests:
         return []
 
@@ -1412,6 +1436,19 @@ def auto_populate_patient_summary_data(db: Session, patient_id: int, doctor_id:
         print(f"Error in auto_populate_patient_summary_data: {str(e)}")
         return False
 
+def auto_populate_patients(patient_ids, doctor_id: int):
+    """
+    auto_populate_patient_summary_data once for each patient, in one session of its own.
+    Background-task entry point for writes that touch many patients at once (bulk import,
+    batch vital sign / test ingestion).
+    """
+    db = SessionLocal()
+    try:
+        for patient_id in patient_ids:
+            auto_populate_patient_summary_data(db, patient_id, doctor_id)
+    finally:
+        db.close()
+
 def cleanup_orphaned_auto_generated_items(db: Session, patient_id: int):
     """
     Remove auto-generated items that are no longer supported by current decision rules.
@@ -0,0 +1,104 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.models.patient import Patient
+from backend.app.models.doctor_patient import DoctorPatient
+from backend.app.models.symptom_dict import SymptomDict
+from backend.app.models.patient_symptom import PatientSymptom
+from backend.app.models.personal_history_dict import PersonalHistoryDict
+from backend.app.models.patient_personal_history import PatientPersonalHistory
+from backend.app.models.vital_signs_dict import VitalSignsDict
+from backend.app.models.patient_vital_signs import PatientVitalSigns
+from backend.app.models.tests_dict import TestsDict
+from backend.app.models.patient_latest_tests import PatientLatestTests
+from backend.app.models.patient_follow_up_action import PatientFollowUpAction
+from backend.app.models.patient_recommendations import PatientRecommendations
+from backend.app.models.patient_referrals import PatientReferrals
+from backend.app.models.patient_lifestyle_advices import PatientLifestyleAdvices
+from backend.app.models.patient_presumptive_diagnoses import PatientPresumptiveDiagnoses
+from backend.app.models.patient_tests_to_order import PatientTestsToOrder
+from backend.app.services import patient_service
+
+# Async counterparts of the patient_service loaders used by the read endpoints.
+# The rule engine itself stays synchronous and is run on the async session via run_sync.
+
+async def get_doctor_patients(db: AsyncSession, doctor_id: int):
+    result = await db.execute(
+        select(Patient)
+        .join(DoctorPatient, DoctorPatient.patient_id == Patient.patient_id)
+        .where(DoctorPatient.doctor_id == doctor_id)
+    )
+    return result.scalars().all()
+
+async def get_patient_symptoms(db: AsyncSession, patient_id: int):
+    result = await db.execute(
+        select(SymptomDict)
+        .join(PatientSymptom, SymptomDict.symptom_id == PatientSymptom.symptom_id)
+        .where(PatientSymptom.patient_id == patient_id)
+    )
+    return result.scalars().all()
+
+async def get_patient_personal_history(db: AsyncSession, patient_id: int):
+    result = await db.execute(
+        select(PersonalHistoryDict)
+        .join(PatientPersonalHistory, PersonalHistoryDict.id == PatientPersonalHistory.history_id)
+        .where(PatientPersonalHistory.patient_id == patient_id)
+    )
+    return result.scalars().all()
+
+async def get_patient_vital_signs(db: AsyncSession, patient_id: int):
+    result = await db.execute(
+        select(
+            VitalSignsDict.vital_sign_id,
+            VitalSignsDict.name,
+            VitalSignsDict.category,
+            VitalSignsDict.unit,
+            PatientVitalSigns.value
+        )
+        .join(PatientVitalSigns, VitalSignsDict.vital_sign_id == PatientVitalSigns.vital_sign_id)
+        .where(PatientVitalSigns.patient_id == patient_id)
+    )
+    return result.all()
+
+async def get_patient_tests(db: AsyncSession, patient_id: int):
+    result = await db.execute(
+        select(
+            PatientLatestTests.test_id,
+            PatientLatestTests.test_date,
+            PatientLatestTests.result_value,
+            PatientLatestTests.notes,
+            TestsDict.name,
+            TestsDict.category,
+            TestsDict.units
+        )
+        .join(TestsDict, PatientLatestTests.test_id == TestsDict.id)
+        .where(PatientLatestTests.patient_id == patient_id)
+    )
+    return result.all()
+
+async def get_patient_summary_items(db: AsyncSession, patient_id: int) -> dict:
+    """
+    Patient-specific summary rows (user-created and auto-generated), keyed like PatientResponse.
+    """
+    tables = {
+        "follow_up_actions": PatientFollowUpAction,
+        "recommendations": PatientRecommendations,
+        "referrals": PatientReferrals,
+        "life_style_advice": PatientLifestyleAdvices,
+        "presumptive_diagnoses": PatientPresumptiveDiagnoses,
+        "tests_to_order": PatientTestsToOrder,
+    }
+    items = {}
+    for key, model in tables.items():
+        result = await db.execute(select(model).where(model.patient_id == patient_id))
+        items[key] = result.scalars().all()
+    return items
+
+async def get_patient_risks(db: AsyncSession, patient_id: int):
+    def load(session):
+        return (
+            patient_service.get_risks_from_symptoms(session, patient_id)
+            + patient_service.get_risks_from_personal_history(session, patient_id)
+            + patient_service.get_risks_from_tests(session, patient_id)
+            + patient_service.get_risks_from_vital_signs(session, patient_id)
+        )
+    return await db.run_sync(load)
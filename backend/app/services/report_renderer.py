@@ -0,0 +1,169 @@
+# services/report_renderer.py
+
+# Patient summary PDF layout. Pure function of its inputs (no database, no app config), so
+# it can run in process-pool workers; keep imports here limited to the stdlib and reportlab.
+
+import io
+import os
+from datetime import date
+from functools import lru_cache
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+from PIL import Image as PILImage  # installed with reportlab
+
+# Bump whenever the layout below changes, so cached reports are re-rendered
+REPORT_TEMPLATE_VERSION = 1
+
+LOGO_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "deepcardio_logo.png")
+LOGO_SIZE = 40 * mm
+LOGO_PIXELS = 320  # 40 mm at ~200 dpi
+
+MARGIN = 15 * mm
+GRAY_800 = colors.Color(31 / 255, 41 / 255, 55 / 255)
+GRAY_700 = colors.Color(55 / 255, 65 / 255, 81 / 255)
+GRAY_500 = colors.Color(107 / 255, 114 / 255, 128 / 255)
+BLUE_600 = colors.Color(59 / 255, 130 / 255, 246 / 255)
+BLUE_300 = colors.Color(147 / 255, 197 / 255, 253 / 255)
+
+_styles = getSampleStyleSheet()
+TITLE = ParagraphStyle("ReportTitle", parent=_styles["Normal"], fontName="Helvetica", fontSize=16, leading=20, textColor=GRAY_800)
+META = ParagraphStyle("ReportMeta", parent=_styles["Normal"], fontName="Helvetica", fontSize=10, leading=13, textColor=GRAY_500)
+SECTION = ParagraphStyle("ReportSection", parent=_styles["Normal"], fontName="Helvetica", fontSize=12, leading=15,
+                         textColor=GRAY_800, spaceBefore=8, spaceAfter=4)
+HEAD = ParagraphStyle("ReportHead", parent=_styles["Normal"], fontName="Helvetica", fontSize=10, leading=12, textColor=colors.white)
+CELL = ParagraphStyle("ReportCell", parent=_styles["Normal"], fontName="Helvetica", fontSize=9, leading=11, textColor=GRAY_700)
+
+TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), BLUE_600),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.Color(0.8, 0.8, 0.8)),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("TOPPADDING", (0, 0), (-1, -1), 3),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+])
+
+def _text(value) -> str:
+    if value is None or value == "":
+        return "—"
+    return escape(str(value))
+
+def _table(title: str, head: list, rows: list) -> list:
+    width = A4[0] - 2 * MARGIN
+    data = [[Paragraph(_text(h), HEAD) for h in head]]
+    data += [[Paragraph(_text(v), CELL) for v in row] for row in rows]
+    table = Table(data, colWidths=[width / len(head)] * len(head), repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+    return [Paragraph(escape(title), SECTION), table, Spacer(1, 4 * mm)]
+
+@lru_cache(maxsize=1)
+def _logo_png():
+    # The source logo is ~0.5 MB; scaled to print size it adds a few KB per report instead
+    if not os.path.exists(LOGO_PATH):
+        return None
+    with PILImage.open(LOGO_PATH) as logo:
+        logo.thumbnail((LOGO_PIXELS, LOGO_PIXELS))
+        buffer = io.BytesIO()
+        logo.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+def _footer(canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Helvetica", 8)
+    canvas.setFillColor(GRAY_500)
+    canvas.drawString(MARGIN, 10 * mm, "Generated by DeepCardio")
+    canvas.drawRightString(A4[0] - MARGIN, 10 * mm, "Confidential - For Authorized Use Only")
+    canvas.restoreState()
+
+def render_patient_report(report: dict, doctor_name: str = "", anonymous: bool = False,
+                          generated_on: date = None) -> bytes:
+    """
+    Render a patient summary PDF from a PatientResponse dump (model_dump(mode="json")).
+    Same sections and look as the report the web app exports with jsPDF.
+    """
+    demographics = report["demographics"]
+    contact = report["contact_info"]
+    social = report["social_info"]
+
+    story = []
+    logo = _logo_png()
+    if logo:
+        story += [Image(io.BytesIO(logo), width=LOGO_SIZE, height=LOGO_SIZE), Spacer(1, 3 * mm)]
+    story += [
+        Paragraph("Anonymous Patient Summary Report" if anonymous else "Patient Summary Report", TITLE),
+        Table(
+            [[Paragraph(f"Prepared by: Dr. {_text(doctor_name or 'Unknown')}", META),
+              Paragraph(f"Generated: {generated_on or date.today():%B %d, %Y}", ParagraphStyle("MetaRight", parent=META, alignment=2))]],
+            colWidths=[(A4[0] - 2 * MARGIN) / 2] * 2,
+            style=TableStyle([
+                ("LINEBELOW", (0, 0), (-1, -1), 0.5 * mm, BLUE_300),
+                ("LEFTPADDING", (0, 0), (-1, -1), 0),
+                ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+            ]),
+        ),
+        Spacer(1, 4 * mm),
+    ]
+
+    if anonymous:
+        story += _table("Demographics (Anonymous)", ["Field", "Value"], [
+            ["Gender", demographics["gender"]],
+            ["Age", demographics["age"]],
+            ["Ethnicity", demographics.get("ethnicity")],
+        ])
+    else:
+        story += _table("Demographics", ["Field", "Value"], [
+            ["First Name", demographics["first_name"]],
+            ["Last Name", demographics["last_name"]],
+            ["Gender", demographics["gender"]],
+            ["Date of Birth", demographics["date_of_birth"]],
+            ["Age", demographics["age"]],
+            ["Ethnicity", demographics.get("ethnicity")],
+        ])
+        story += _table("Contact Information", ["Phone", "Email"], [[contact.get("phone"), contact.get("email")]])
+        story += _table("Social & Insurance", ["Occupation", "Address", "Marital Status", "Insurance"], [[
+            social.get("occupation"), social.get("address"), social.get("marital_status"), social.get("insurance_provider"),
+        ]])
+
+    sections = [
+        ("Symptoms", ["Category", "Symptom"], "symptoms", lambda s: [s.get("category") or "Other", s["name"]]),
+        ("Personal History", ["History Item"], "personal_history", lambda h: [h["name"]]),
+        ("Vital Signs", ["Category", "Name", "Value", "Unit"], "vital_signs",
+         lambda v: [v.get("category"), v["name"], v.get("value"), v.get("unit")]),
+        ("Test Results", ["Date", "Test", "Value", "Unit", "Notes"], "tests",
+         lambda t: [t.get("date"), t["name"], t.get("value"), t.get("unit"), t.get("notes")]),
+        ("Follow-up Actions", ["Action", "Interval"], "follow_up_actions", lambda f: [f["action"], f.get("interval")]),
+        ("Recommendations", ["Recommendation"], "recommendations", lambda r: [r["recommendation"]]),
+        ("Referrals", ["Specialist", "Reason"], "referrals", lambda r: [r["specialist"], r["reason"]]),
+        ("Risks", ["Risk", "Reason"], "risks", lambda r: [r["value"], r["reason"]]),
+        ("Lifestyle Advice", ["Advice"], "life_style_advice", lambda a: [a["advice"]]),
+        ("Presumptive Diagnoses", ["Diagnosis", "Confidence"], "presumptive_diagnoses",
+         lambda d: [d["diagnosis_name"], d.get("confidence_level")]),
+        ("Tests to Order", ["Test to Order"], "tests_to_order", lambda t: [t["test_to_order"]]),
+    ]
+    for title, head, key, row in sections:
+        items = report.get(key) or []
+        if items:
+            story += _table(title, head, [row(item) for item in items])
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4,
+        leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=20 * mm,
+        title="Patient Summary Report", author="DeepCardio",
+    )
+    doc.build(story, onFirstPage=_footer, onLaterPages=_footer)
+    return buffer.getvalue()
+
+def render_report_file(report: dict, doctor_name: str, anonymous: bool, path: str, generated_on: date = None) -> str:
+    """
+    Render to `path` atomically (temp file + rename), so readers never see a partial PDF.
+    Process-pool entry point; returns the path.
+    """
+    pdf = render_patient_report(report, doctor_name, anonymous, generated_on)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp_path, path)
+    return path
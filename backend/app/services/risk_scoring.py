@@ -0,0 +1,315 @@
+# services/risk_scoring.py
+
+import hashlib
+import os
+import sys
+from datetime import date, datetime, timezone
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, delete, insert, update, and_, or_
+from sqlalchemy.orm import Session
+from backend.app.models.patient import Patient
+from backend.app.models.vital_signs_dict import VitalSignsDict
+from backend.app.models.patient_vital_signs import PatientVitalSigns
+from backend.app.models.tests_dict import TestsDict
+from backend.app.models.patient_latest_tests import PatientLatestTests
+from backend.app.models.patient_risk_score import PatientRiskScore
+from backend.app.models.patient_prediction import PatientPrediction
+
+# Add deepcardio root folder to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from core.cardio_model import CardioModel, FEATURE_NAMES
+
+# Catalog names the features are read from (same ones the patient page sends to /predict)
+SYSTOLIC_VITAL = os.getenv("RISK_SYSTOLIC_VITAL", "Systolic Blood Pressure")
+DIASTOLIC_VITAL = os.getenv("RISK_DIASTOLIC_VITAL", "Diastolic Blood Pressure")
+CHOLESTEROL_TEST = os.getenv("RISK_CHOLESTEROL_TEST", "Cholesterol (Total)")
+GLUCOSE_TEST = os.getenv("RISK_GLUCOSE_TEST", "Fasting Plasma Glucose")
+
+# Used when a patient has no usable reading; recorded in missing_features
+FEATURE_DEFAULTS = {"ap_hi": 120.0, "ap_lo": 80.0, "cholesterol": 1.0, "gluc": 1.0}
+
+# Patients loaded and scored per pass (one predict_proba call per model per batch)
+RISK_SCORING_BATCH_SIZE = int(os.getenv("RISK_SCORING_BATCH_SIZE", "10000"))
+# Worker threads for models that support it (KNN neighbour search dominates a batch); -1 = all cores
+RISK_SCORING_N_JOBS = int(os.getenv("RISK_SCORING_N_JOBS", "-1"))
+
+COLUMN = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def load_cardio_model(model_dir: str = "models", n_jobs: int = RISK_SCORING_N_JOBS) -> CardioModel:
+    model = CardioModel(model_dir=model_dir)
+    model.load_trained_models()
+    for estimator in model.models.values():
+        if "n_jobs" in estimator.get_params():
+            estimator.set_params(n_jobs=n_jobs)
+    return model
+
+def grade(mg_dl: np.ndarray) -> np.ndarray:
+    """
+    mg/dL -> the dataset's 1 (normal) / 2 (above normal) / 3 (well above) scale,
+    as ceil(value / 100) like the patient page, clipped to the scale. NaN stays NaN.
+    """
+    return np.clip(np.ceil(mg_dl / 100), 1, 3)
+
+def resolve_feature_sources(db: Session) -> dict:
+    """
+    Catalog ids of the vitals/tests behind the lab features; a name missing from the
+    catalogs maps to None and the feature falls back to its default.
+    """
+    vitals = dict(db.execute(
+        select(VitalSignsDict.name, VitalSignsDict.vital_sign_id)
+        .where(VitalSignsDict.name.in_((SYSTOLIC_VITAL, DIASTOLIC_VITAL)))
+    ).all())
+    tests = dict(db.execute(
+        select(TestsDict.name, TestsDict.id).where(TestsDict.name.in_((CHOLESTEROL_TEST, GLUCOSE_TEST)))
+    ).all())
+    return {
+        "ap_hi": vitals.get(SYSTOLIC_VITAL),
+        "ap_lo": vitals.get(DIASTOLIC_VITAL),
+        "cholesterol": tests.get(CHOLESTEROL_TEST),
+        "gluc": tests.get(GLUCOSE_TEST),
+    }
+
+def _patient_filter(column, ids: np.ndarray):
+    # A dense batch (a full-table pass) reads as one range; sparse ones (changed patients) by id
+    first_id, last_id = int(ids[0]), int(ids[-1])
+    if last_id - first_id + 1 <= 2 * len(ids):
+        return column.between(first_id, last_id)
+    return column.in_(ids.tolist())
+
+def _scatter(ids: np.ndarray, column: np.ndarray, row_ids: np.ndarray, values: np.ndarray):
+    # row_ids are a subset of the sorted ids
+    column[np.searchsorted(ids, row_ids)] = values
+
+def load_features(db: Session, patients: list, sources: dict, today: date = None):
+    """
+    Feature matrix for a batch of patients (rows ordered by patient_id): demographics from
+    `patients`, latest blood pressure from patient_vital_signs and latest cholesterol/glucose
+    from patient_latest_tests, each fetched with one query over the batch's patient ids.
+
+    Returns (patient_ids, X, missing) where missing is a boolean matrix over
+    FEATURE_DEFAULTS' features, True where the default was used.
+    """
+    today = today or date.today()
+    n = len(patients)
+    ids = np.fromiter((p.patient_id for p in patients), dtype=np.int64, count=n)
+    X = np.empty((n, len(FEATURE_NAMES)), dtype=np.float64)
+    X[:, COLUMN["age"]] = today.toordinal() - np.fromiter((p.dob.toordinal() for p in patients), dtype=np.float64, count=n)
+    X[:, COLUMN["gender"]] = np.fromiter((2 if p.gender == "Male" else 1 for p in patients), dtype=np.float64, count=n)
+    for name in ("height", "weight", "smoke", "alco", "active"):
+        X[:, COLUMN[name]] = np.fromiter((getattr(p, name) for p in patients), dtype=np.float64, count=n)
+
+    lab = {name: np.full(n, np.nan) for name in FEATURE_DEFAULTS}
+
+    vital_ids = {sources[name]: name for name in ("ap_hi", "ap_lo") if sources.get(name) is not None}
+    if vital_ids:
+        rows = db.execute(
+            select(PatientVitalSigns.patient_id, PatientVitalSigns.vital_sign_id, PatientVitalSigns.numeric_value)
+            .where(
+                _patient_filter(PatientVitalSigns.patient_id, ids),
+                PatientVitalSigns.vital_sign_id.in_(list(vital_ids)),
+                PatientVitalSigns.resolved_at.is_(None),
+                PatientVitalSigns.numeric_value.isnot(None),
+            )
+            .order_by(PatientVitalSigns.patient_id, PatientVitalSigns.vital_sign_id,
+                      PatientVitalSigns.measurement_date.desc(), PatientVitalSigns.id.desc())
+        ).all()
+        if rows:
+            pid, vid, value = (np.asarray(col) for col in zip(*rows))
+            # Newest reading per (patient, vital) is the first of each run
+            first = np.r_[True, (pid[1:] != pid[:-1]) | (vid[1:] != vid[:-1])]
+            for vital_sign_id, name in vital_ids.items():
+                pick = first & (vid == vital_sign_id) & np.isin(pid, ids)
+                _scatter(ids, lab[name], pid[pick], value[pick].astype(np.float64))
+
+    test_ids = {sources[name]: name for name in ("cholesterol", "gluc") if sources.get(name) is not None}
+    if test_ids:
+        rows = db.execute(
+            select(PatientLatestTests.patient_id, PatientLatestTests.test_id, PatientLatestTests.result_value)
+            .where(
+                _patient_filter(PatientLatestTests.patient_id, ids),
+                PatientLatestTests.test_id.in_(list(test_ids)),
+            )
+        ).all()
+        if rows:
+            pid, tid, raw = (np.asarray(col, dtype=object) for col in zip(*rows))
+            pid = pid.astype(np.int64)
+            value = pd.to_numeric(pd.Series(raw), errors="coerce").to_numpy(dtype=np.float64)
+            for test_id, name in test_ids.items():
+                pick = (tid == test_id) & np.isin(pid, ids)
+                _scatter(ids, lab[name], pid[pick], grade(value[pick]))
+
+    missing = np.column_stack([np.isnan(lab[name]) for name in FEATURE_DEFAULTS])
+    for name, default in FEATURE_DEFAULTS.items():
+        X[:, COLUMN[name]] = np.where(np.isnan(lab[name]), default, lab[name])
+    return ids, X, missing
+
+def _missing_labels(missing: np.ndarray) -> list:
+    names = list(FEATURE_DEFAULTS)
+    return [",".join(n for n, m in zip(names, row) if m) or None for row in missing.tolist()]
+
+def feature_fingerprints(X: np.ndarray, missing: np.ndarray) -> list:
+    """
+    Short hash of each feature row (and which features were defaulted), with age in whole
+    years so a patient isn't rescored every day just for getting a day older.
+    """
+    rows = X.copy()
+    rows[:, COLUMN["age"]] = np.floor(rows[:, COLUMN["age"]] / 365.25)
+    return [
+        hashlib.blake2b(row.tobytes() + flags.tobytes(), digest_size=8).hexdigest()
+        for row, flags in zip(rows, missing)
+    ]
+
+def score_batch(db: Session, cardio_model: CardioModel, patients: list, sources: dict, scored_at: datetime,
+                force: bool = False) -> int:
+    """
+    Score one batch of patients with every model, in one transaction.
+
+    Patients whose features and model versions match their stored score are not run through
+    the models again; only their patient_revision is brought up to date. The others get their
+    patient_risk_scores rows replaced and a patient_predictions history entry per model.
+    `force` rescores everyone. Returns the number of patients rescored.
+    """
+    ids, X, missing = load_features(db, patients, sources, today=scored_at.date())
+    fingerprints = feature_fingerprints(X, missing)
+    revisions = [p.revision for p in patients]
+    versions = {name: cardio_model.versions.get(name, "unknown") for name in cardio_model.models}
+
+    stored = {}
+    for row in db.execute(
+        select(PatientRiskScore.patient_id, PatientRiskScore.model_name,
+               PatientRiskScore.model_version, PatientRiskScore.features_hash)
+        .where(PatientRiskScore.patient_id.in_(ids.tolist()))
+    ):
+        entry = stored.setdefault(row.patient_id, {"hash": row.features_hash, "versions": {}})
+        entry["versions"][row.model_name] = row.model_version
+
+    changed = np.fromiter((
+        force or pid not in stored or stored[pid]["hash"] != fingerprint or stored[pid]["versions"] != versions
+        for pid, fingerprint in zip(ids.tolist(), fingerprints)
+    ), dtype=bool, count=len(ids))
+
+    unchanged = [
+        {"patient_id": pid, "model_name": name, "patient_revision": revision}
+        for pid, revision, is_changed in zip(ids.tolist(), revisions, changed.tolist()) if not is_changed
+        for name in versions
+    ]
+    if unchanged:
+        db.execute(update(PatientRiskScore), unchanged)  # bulk UPDATE by primary key
+
+    if changed.any():
+        changed_ids = ids[changed].tolist()
+        labels = _missing_labels(missing[changed])
+        changed_fingerprints = [f for f, c in zip(fingerprints, changed.tolist()) if c]
+        changed_revisions = [r for r, c in zip(revisions, changed.tolist()) if c]
+        scores, history = [], []
+        for name, proba in cardio_model.predict_proba_batch(X[changed]).items():
+            predictions = (proba >= 0.5).astype(int)
+            for patient_id, probability, prediction, label, fingerprint, revision in zip(
+                    changed_ids, proba.tolist(), predictions.tolist(), labels, changed_fingerprints, changed_revisions):
+                score = {
+                    "patient_id": patient_id,
+                    "model_name": name,
+                    "model_version": versions[name],
+                    "probability": probability,
+                    "prediction": prediction,
+                    "patient_revision": revision,
+                }
+                scores.append({**score, "missing_features": label, "features_hash": fingerprint, "scored_at": scored_at})
+                history.append({**score, "source": "job", "created_at": scored_at})
+
+        db.execute(delete(PatientRiskScore).where(PatientRiskScore.patient_id.in_(changed_ids)))
+        db.execute(insert(PatientRiskScore), scores)
+        db.execute(insert(PatientPrediction), history)
+
+    db.commit()
+    return int(changed.sum())
+
+PATIENT_FEATURE_COLUMNS = (Patient.patient_id, Patient.gender, Patient.dob, Patient.height, Patient.weight,
+                           Patient.smoke, Patient.alco, Patient.active, Patient.revision)
+
+def score_all_patients(db: Session, cardio_model: CardioModel, batch_size: int = RISK_SCORING_BATCH_SIZE,
+                       force: bool = False) -> tuple:
+    """
+    Check every patient, walking the patients table in patient_id order, batch_size at a time.
+    Returns (patients checked, patients rescored).
+    """
+    sources = resolve_feature_sources(db)
+    scored_at = _utcnow()
+    checked = rescored = 0
+    last_id = None
+    while True:
+        query = select(*PATIENT_FEATURE_COLUMNS).order_by(Patient.patient_id).limit(batch_size)
+        if last_id is not None:
+            query = query.where(Patient.patient_id > last_id)
+        patients = db.execute(query).all()
+        if not patients:
+            return checked, rescored
+        checked += len(patients)
+        rescored += score_batch(db, cardio_model, patients, sources, scored_at, force=force)
+        last_id = patients[-1].patient_id
+
+# Model version sets already confirmed current in the store (checked once per process)
+_versions_confirmed = set()
+
+def _has_outdated_versions(db: Session, versions: dict) -> bool:
+    key = tuple(sorted(versions.items()))
+    if key in _versions_confirmed:
+        return False
+    outdated = db.execute(
+        select(PatientRiskScore.patient_id).where(or_(*(
+            and_(PatientRiskScore.model_name == name, PatientRiskScore.model_version != version)
+            for name, version in versions.items()
+        ))).limit(1)
+    ).first()
+    if outdated is None:
+        _versions_confirmed.add(key)
+    return outdated is not None
+
+def rescore_changed_patients(db: Session, cardio_model: CardioModel,
+                             batch_size: int = RISK_SCORING_BATCH_SIZE) -> tuple:
+    """
+    Incremental pass: only patients never scored, scored by another model version, or whose
+    patients.revision moved since their score. Revision is bumped by every write to the
+    patient or their vitals/tests (see models/patient_revision.py); score_batch then skips
+    the ones whose model inputs turn out unchanged. Returns (candidates, patients rescored).
+    """
+    versions = {name: cardio_model.versions.get(name, "unknown") for name in cardio_model.models}
+    if _has_outdated_versions(db, versions):
+        # A retrained model: every patient needs a new score anyway
+        return score_all_patients(db, cardio_model, batch_size=batch_size)
+
+    sources = resolve_feature_sources(db)
+    scored_at = _utcnow()
+    # All models are scored together, so one model's row stands for the patient
+    name = next(iter(cardio_model.models))
+    version = versions[name]
+    checked = rescored = 0
+    last_id = None
+    while True:
+        query = (
+            select(*PATIENT_FEATURE_COLUMNS)
+            .outerjoin(PatientRiskScore, and_(
+                PatientRiskScore.patient_id == Patient.patient_id,
+                PatientRiskScore.model_name == name,
+            ))
+            .where(or_(
+                PatientRiskScore.patient_id.is_(None),
+                PatientRiskScore.patient_revision != Patient.revision,
+                PatientRiskScore.model_version != version,
+            ))
+            .order_by(Patient.patient_id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            query = query.where(Patient.patient_id > last_id)
+        patients = db.execute(query).all()
+        if not patients:
+            return checked, rescored
+        checked += len(patients)
+        rescored += score_batch(db, cardio_model, patients, sources, scored_at)
+        last_id = patients[-1].patient_id
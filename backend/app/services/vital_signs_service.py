@@ -0,0 +1,143 @@
+import numpy as np
+from datetime import date
+from typing import Optional
+from sqlalchemy.orm import Session
+from backend.app.models.patient_vital_signs import PatientVitalSigns
+
+DOWNSAMPLE_METHODS = ("none", "buckets", "lttb")
+
+def get_vital_sign_series(db: Session, patient_id: int, vital_sign_id: int,
+                          start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """
+    Load the numeric readings of one vital sign for a patient as two numpy arrays:
+    day ordinals (x) and values (y), sorted by measurement date.
+    Uses the (patient_id, vital_sign_id, measurement_date) index.
+    """
+    query = (
+        db.query(PatientVitalSigns.measurement_date, PatientVitalSigns.numeric_value)
+        .filter(
+            PatientVitalSigns.patient_id == patient_id,
+            PatientVitalSigns.vital_sign_id == vital_sign_id,
+            PatientVitalSigns.measurement_date.isnot(None),
+            PatientVitalSigns.numeric_value.isnot(None)
+        )
+    )
+    if start_date:
+        query = query.filter(PatientVitalSigns.measurement_date >= start_date)
+    if end_date:
+        query = query.filter(PatientVitalSigns.measurement_date <= end_date)
+
+    rows = query.order_by(PatientVitalSigns.measurement_date, PatientVitalSigns.recorded_at).all()
+
+    x = np.fromiter((r.measurement_date.toordinal() for r in rows), dtype=np.float64, count=len(rows))
+    y = np.fromiter((r.numeric_value for r in rows), dtype=np.float64, count=len(rows))
+    return x, y
+
+def downsample_buckets(x: np.ndarray, y: np.ndarray, max_points: int):
+    """
+    Split the time range into `max_points` equal-width buckets and return
+    (bucket_start, min, max, mean, count) arrays for the non-empty buckets.
+    """
+    span = x[-1] - x[0]
+    if span == 0:
+        idx = np.zeros(len(x), dtype=np.int64)
+    else:
+        idx = np.minimum(((x - x[0]) / span * max_points).astype(np.int64), max_points - 1)
+
+    # x is sorted so bucket indices are non-decreasing; reduceat works on run starts
+    starts = np.flatnonzero(np.r_[True, idx[1:] != idx[:-1]])
+    counts = np.diff(np.r_[starts, len(x)])
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    means = np.add.reduceat(y, starts) / counts
+    bucket_start = x[0] + idx[starts] * (span / max_points)
+    return bucket_start, mins, maxs, means, counts
+
+def downsample_lttb(x: np.ndarray, y: np.ndarray, max_points: int):
+    """
+    Largest-Triangle-Three-Buckets: keep `max_points` points that best preserve the
+    visual shape of the series. First and last points are always kept.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+def compute_trend(x: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Least-squares slope (units per day) and variability statistics for a series.
+    """
+    count = len(y)
+    if count == 0:
+        return {"count": 0, "min": None, "max": None, "mean": None, "std": None,
+                "coefficient_of_variation": None, "slope_per_day": None, "change": None}
+
+    mean = float(y.mean())
+    std = float(y.std(ddof=1)) if count > 1 else 0.0
+
+    slope = None
+    if count > 1 and x[-1] != x[0]:
+        dx = x - x.mean()
+        slope = float((dx * (y - mean)).sum() / (dx * dx).sum())
+
+    return {
+        "count": count,
+        "min": float(y.min()),
+        "max": float(y.max()),
+        "mean": mean,
+        "std": std,
+        "coefficient_of_variation": std / mean if mean else None,
+        "slope_per_day": slope,
+        "change": float(y[-1] - y[0]),
+    }
+
+def build_vital_sign_series(x: np.ndarray, y: np.ndarray, method: str, max_points: int) -> list:
+    """
+    Turn raw arrays into chart points, downsampling when there are more than `max_points`.
+    """
+    if len(x) == 0:
+        return []
+
+    if method == "none" or len(x) <= max_points:
+        return [
+            {"date": date.fromordinal(int(d)), "value": float(v)}
+            for d, v in zip(x, y)
+        ]
+
+    if method == "lttb":
+        keep = downsample_lttb(x, y, max_points)
+        return [
+            {"date": date.fromordinal(int(x[i])), "value": float(y[i])}
+            for i in keep
+        ]
+
+    bucket_start, mins, maxs, means, counts = downsample_buckets(x, y, max_points)
+    return [
+        {
+            "date": date.fromordinal(int(start)),
+            "value": float(mean),
+            "min": float(lo),
+            "max": float(hi),
+            "count": int(c),
+        }
+        for start, lo, hi, mean, c in zip(bucket_start, mins, maxs, means, counts)
+    ]
@@ -0,0 +1,116 @@
+# utils/audit_codec.py
+
+import base64
+import json
+import os
+import zlib
+
+# Compact on-disk form of audit_logs.action_details.
+#
+# Stored rows look like {"v": 1, "f": {...}, "d": {...}, "n": [...]}:
+#   f  remaining fields, keyed by field code
+#   d  update diff, {code: [old, new]} for fields whose value actually changed
+#   n  codes of fields whose value was null
+# When that JSON is larger than AUDIT_COMPRESS_MIN_BYTES it is stored as
+# {"v": 1, "z": "<base64 zlib>"} instead. Rows without "v" predate this format and are
+# returned unchanged, so old and new rows can live side by side.
+#
+# A field code is "#" + the field's position in _FIELD_NAMES; any other key that starts with
+# "#" is stored with one more "#" in front, so no real key is ever mistaken for a code.
+AUDIT_CODEC_VERSION = 1
+AUDIT_COMPRESS_MIN_BYTES = int(os.getenv("AUDIT_COMPRESS_MIN_BYTES", "256"))
+
+# Field code = position in this list. Append only: reordering or removing a name would
+# change the meaning of rows already stored. Names not listed are stored as-is.
+_FIELD_NAMES = [
+    "patient_id", "first_name", "last_name", "gender", "dob", "ethnicity", "phone", "email",
+    "marital_status", "occupation", "insurance_provider", "address", "weight", "height",
+    "smoke", "alco", "active", "appointment_id", "datetime", "type", "symptom_id",
+    "onset_date", "history_id", "date_recorded", "vital_sign_id", "value",
+    "measurement_date", "test_id", "result_value", "test_date", "resolved_at", "notes",
+]
+_CODE_BY_NAME = {name: f"#{code}" for code, name in enumerate(_FIELD_NAMES)}
+
+def _code(name: str) -> str:
+    if name in _CODE_BY_NAME:
+        return _CODE_BY_NAME[name]
+    return "#" + name if name.startswith("#") else name
+
+def _name(key: str) -> str:
+    if key.startswith("##"):
+        return key[1:]
+    if key.startswith("#") and key[1:].isdigit() and int(key[1:]) < len(_FIELD_NAMES):
+        return _FIELD_NAMES[int(key[1:])]
+    return key
+
+def _encode_fields(fields: dict, nulls: list = None) -> dict:
+    # Top-level nulls are moved to `nulls`; nested dicts keep theirs
+    encoded = {}
+    for key, value in fields.items():
+        if value is None and nulls is not None:
+            nulls.append(_code(key))
+        elif isinstance(value, dict):
+            encoded[_code(key)] = _encode_fields(value)
+        else:
+            encoded[_code(key)] = value
+    return encoded
+
+def _decode_fields(fields: dict) -> dict:
+    return {
+        _name(key): _decode_fields(value) if isinstance(value, dict) else value
+        for key, value in fields.items()
+    }
+
+def encode_action_details(details: dict):
+    """
+    Encode action_details for storage. Updates given as old_values/new_values keep only the
+    fields that changed.
+    """
+    if not isinstance(details, dict):
+        return details
+
+    fields = dict(details)
+    old_values = fields.pop("old_values", None)
+    new_values = fields.pop("new_values", None)
+
+    nulls = []
+    encoded = {"v": AUDIT_CODEC_VERSION}
+    compact = _encode_fields(fields, nulls)
+    if compact:
+        encoded["f"] = compact
+    if isinstance(old_values, dict) and isinstance(new_values, dict):
+        encoded["d"] = {
+            _code(key): [old_values.get(key), new_values.get(key)]
+            for key in [*old_values, *(k for k in new_values if k not in old_values)]
+            if old_values.get(key) != new_values.get(key)
+        }
+    elif old_values is not None or new_values is not None:
+        # Not a dict pair we can diff; keep it verbatim
+        encoded["f"] = {**encoded.get("f", {}), "old_values": old_values, "new_values": new_values}
+    if nulls:
+        encoded["n"] = nulls
+
+    raw = json.dumps(encoded, separators=(",", ":"), default=str)
+    if len(raw) >= AUDIT_COMPRESS_MIN_BYTES:
+        packed = base64.b64encode(zlib.compress(raw.encode(), 9)).decode()
+        if len(packed) < len(raw):
+            return {"v": AUDIT_CODEC_VERSION, "z": packed}
+    return json.loads(raw)
+
+def decode_action_details(stored):
+    """
+    Return the JSON shape the API has always exposed for a stored action_details value.
+    """
+    if not isinstance(stored, dict) or "v" not in stored:
+        return stored
+
+    if "z" in stored:
+        stored = json.loads(zlib.decompress(base64.b64decode(stored["z"])))
+
+    details = _decode_fields(stored.get("f", {}))
+    for code in stored.get("n", []):
+        details[_name(code)] = None
+    if "d" in stored:
+        details["old_values"] = {_name(code): pair[0] for code, pair in stored["d"].items()}
+        details["new_values"] = {_name(code): pair[1] for code, pair in stored["d"].items()}
+    return details
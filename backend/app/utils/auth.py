@@ -3,17 +3,25 @@
 from jose import jwt
 from jose.exceptions import JWTError
 from fastapi import HTTPException, Request, status
-from urllib.request import urlopen
-import json
+from backend.app.utils.jwks_cache import get_jwks_cache, jwks_url_for
+from backend.app.utils.lru_cache import LRUCache
+import hashlib
+import os
+import time
 
 AUTH0_DOMAIN = "dev-i263g127pvf7d11w.us.auth0.com"
 API_AUDIENCE = "https://deepcardio-api"
 ALGORITHMS = ["RS256"]
 
-# Automatically get the Auth0 public keys
-def get_jwks():
-    jsonurl = urlopen(f"https://{AUTH0_DOMAIN}/.well-known/jwks.json")
-    return json.loads(jsonurl.read())
+# Auth0 public keys, cached by kid and refreshed in the background
+jwks_cache = get_jwks_cache(jwks_url_for(AUTH0_DOMAIN))
+
+# Claims of tokens we already verified, keyed by token hash and dropped at the token's exp
+VERIFIED_TOKEN_CACHE_SIZE = int(os.getenv("VERIFIED_TOKEN_CACHE_SIZE", "10000"))
+verified_claims_cache = LRUCache(VERIFIED_TOKEN_CACHE_SIZE)
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 def get_token_auth_header(request: Request):
     auth = request.headers.get("Authorization")
@@ -22,25 +30,26 @@ def get_token_auth_header(request: Request):
     return auth.split(" ")[1]
 
 def verify_jwt(token: str):
-    jwks = get_jwks()
-    unverified_header = jwt.get_unverified_header(token)
-    rsa_key = {}
-
-    for key in jwks["keys"]:
-        if key["kid"] == unverified_header["kid"]:
-            rsa_key = {
-                "kty": key["kty"],
-                "kid": key["kid"],
-                "use": key["use"],
-                "n": key["n"],
-                "e": key["e"]
-            }
+    cache_key = token_hash(token)
+    cached = verified_claims_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        unverified_header = jwt.get_unverified_header(token)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Token is invalid or expired")
 
+    rsa_key = jwks_cache.get_key(unverified_header.get("kid"))
     if not rsa_key:
         raise HTTPException(status_code=401, detail="RSA key not found")
 
     try:
         payload = jwt.decode(token, rsa_key, algorithms=ALGORITHMS, audience=API_AUDIENCE, issuer=f"https://{AUTH0_DOMAIN}/")
-        return payload
     except JWTError as e:
         raise HTTPException(status_code=401, detail="Token is invalid or expired")
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp > time.time():
+        verified_claims_cache.set(cache_key, payload, expires_at=exp)
+    return payload
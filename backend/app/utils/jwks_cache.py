@@ -0,0 +1,123 @@
+# utils/jwks_cache.py
+
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Optional
+from urllib.request import urlopen
+
+JWKS_CACHE_TTL_SECONDS = float(os.getenv("JWKS_CACHE_TTL_SECONDS", "86400"))  # keys older than this are dropped
+JWKS_REFRESH_INTERVAL_SECONDS = float(os.getenv("JWKS_REFRESH_INTERVAL_SECONDS", "600"))
+JWKS_MIN_REFETCH_SECONDS = float(os.getenv("JWKS_MIN_REFETCH_SECONDS", "30"))  # throttle for unknown kids
+JWKS_FETCH_TIMEOUT_SECONDS = float(os.getenv("JWKS_FETCH_TIMEOUT_SECONDS", "5"))
+
+class JWKSCache:
+    """
+    In-process cache of a JWKS document, keyed by `kid`.
+
+    - Known kids are served from memory; a daemon thread refreshes the set every `refresh_interval`.
+    - An unknown kid (key rotation) triggers one refetch: concurrent callers wait on the same
+      fetch instead of each hitting the issuer, and refetches are throttled to `min_refetch`.
+    - If the issuer is unreachable the last good keys keep being served until `ttl` expires.
+    """
+    def __init__(self, jwks_url: str, ttl: float = JWKS_CACHE_TTL_SECONDS,
+                 refresh_interval: float = JWKS_REFRESH_INTERVAL_SECONDS,
+                 min_refetch: float = JWKS_MIN_REFETCH_SECONDS):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.min_refetch = min_refetch
+        self._keys = {}
+        self._fetched_at = None
+        self._attempted_at = None
+        self._fetch_lock = threading.Lock()
+        self._refresher_lock = threading.Lock()
+        self._refresher = None
+
+    def _fetch(self) -> dict:
+        with urlopen(self.jwks_url, timeout=JWKS_FETCH_TIMEOUT_SECONDS) as response:
+            document = json.loads(response.read())
+        return {key["kid"]: key for key in document.get("keys", []) if "kid" in key}
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Refetch the key set (single-flight). Returns True if a fetch was performed by this call
+        or by a concurrent caller we waited for.
+        """
+        attempted_before = self._attempted_at
+        with self._fetch_lock:
+            if self._attempted_at != attempted_before:
+                # Someone else fetched while we were waiting for the lock
+                return True
+            if (not force and self._attempted_at is not None
+                    and time.monotonic() - self._attempted_at < self.min_refetch):
+                return False
+            self._attempted_at = time.monotonic()
+            try:
+                keys = self._fetch()
+            except Exception as e:
+                print(f"JWKS refresh from {self.jwks_url} failed: {e}")
+                return False
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            return True
+
+    def _expired(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at > self.ttl
+
+    def get_key(self, kid: str) -> Optional[dict]:
+        """
+        JWK dict for `kid`, or None if the issuer doesn't publish it.
+        """
+        self.start_background_refresh()
+
+        if self._expired():
+            self.refresh()
+            if self._expired():
+                # Never verify against keys we haven't been able to confirm within the TTL
+                self._keys = {}
+
+        key = self._keys.get(kid)
+        if key is None and self.refresh():
+            key = self._keys.get(kid)
+        return key
+
+    async def get_key_async(self, kid: str) -> Optional[dict]:
+        # Cache hits stay on the event loop; only a refetch is pushed to a worker thread
+        key = self._keys.get(kid)
+        if key is not None and not self._expired():
+            self.start_background_refresh()
+            return key
+        return await asyncio.to_thread(self.get_key, kid)
+
+    def start_background_refresh(self):
+        if self._refresher is not None or self.refresh_interval <= 0:
+            return
+        with self._refresher_lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="jwks-refresh", daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            self.refresh(force=True)
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_jwks_cache(jwks_url: str) -> JWKSCache:
+    """
+    Process-wide cache per JWKS URL, shared by every token verifier that uses the same issuer.
+    """
+    with _caches_lock:
+        cache = _caches.get(jwks_url)
+        if cache is None:
+            cache = _caches[jwks_url] = JWKSCache(jwks_url)
+        return cache
+
+def jwks_url_for(domain: str) -> str:
+    return os.getenv("AUTH0_JWKS_URL") or f"https://{domain}/.well-known/jwks.json"
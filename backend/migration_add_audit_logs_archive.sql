@@ -0,0 +1,78 @@
+-- Migration: Keyset pagination and archival for audit logs
+-- GET /audit-logs pages newest-first on (created_at, id); rows older than AUDIT_HOT_DAYS
+-- are moved to audit_logs_archive by `python -m backend.app.archive_audit_logs`
+
+CREATE INDEX idx_audit_logs_created_id ON audit_logs(created_at, id);
+
+-- Same columns as audit_logs. created_at is part of the primary key because MySQL
+-- requires the partitioning column in every unique key.
+CREATE TABLE IF NOT EXISTS audit_logs_archive (
+    id INT NOT NULL,
+    patient_id INT NOT NULL,
+    doctor_id INT NOT NULL,
+    action_type VARCHAR(50) NOT NULL,
+    entity_type VARCHAR(50) NOT NULL,
+    action_details JSON NULL,
+    description VARCHAR(255) NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id, created_at),
+    INDEX idx_audit_logs_archive_patient_created (patient_id, created_at),
+    INDEX idx_audit_logs_archive_created_id (created_at, id)
+)
+PARTITION BY RANGE COLUMNS(created_at) (
+    PARTITION p202401 VALUES LESS THAN ('2024-02-01'),
+    PARTITION p202402 VALUES LESS THAN ('2024-03-01'),
+    PARTITION p202403 VALUES LESS THAN ('2024-04-01'),
+    PARTITION p202404 VALUES LESS THAN ('2024-05-01'),
+    PARTITION p202405 VALUES LESS THAN ('2024-06-01'),
+    PARTITION p202406 VALUES LESS THAN ('2024-07-01'),
+    PARTITION p202407 VALUES LESS THAN ('2024-08-01'),
+    PARTITION p202408 VALUES LESS THAN ('2024-09-01'),
+    PARTITION p202409 VALUES LESS THAN ('2024-10-01'),
+    PARTITION p202410 VALUES LESS THAN ('2024-11-01'),
+    PARTITION p202411 VALUES LESS THAN ('2024-12-01'),
+    PARTITION p202412 VALUES LESS THAN ('2025-01-01'),
+    PARTITION p202501 VALUES LESS THAN ('2025-02-01'),
+    PARTITION p202502 VALUES LESS THAN ('2025-03-01'),
+    PARTITION p202503 VALUES LESS THAN ('2025-04-01'),
+    PARTITION p202504 VALUES LESS THAN ('2025-05-01'),
+    PARTITION p202505 VALUES LESS THAN ('2025-06-01'),
+    PARTITION p202506 VALUES LESS THAN ('2025-07-01'),
+    PARTITION p202507 VALUES LESS THAN ('2025-08-01'),
+    PARTITION p202508 VALUES LESS THAN ('2025-09-01'),
+    PARTITION p202509 VALUES LESS THAN ('2025-10-01'),
+    PARTITION p202510 VALUES LESS THAN ('2025-11-01'),
+    PARTITION p202511 VALUES LESS THAN ('2025-12-01'),
+    PARTITION p202512 VALUES LESS THAN ('2026-01-01'),
+    PARTITION p202601 VALUES LESS THAN ('2026-02-01'),
+    PARTITION p202602 VALUES LESS THAN ('2026-03-01'),
+    PARTITION p202603 VALUES LESS THAN ('2026-04-01'),
+    PARTITION p202604 VALUES LESS THAN ('2026-05-01'),
+    PARTITION p202605 VALUES LESS THAN ('2026-06-01'),
+    PARTITION p202606 VALUES LESS THAN ('2026-07-01'),
+    PARTITION p202607 VALUES LESS THAN ('2026-08-01'),
+    PARTITION p202608 VALUES LESS THAN ('2026-09-01'),
+    PARTITION p202609 VALUES LESS THAN ('2026-10-01'),
+    PARTITION p202610 VALUES LESS THAN ('2026-11-01'),
+    PARTITION p202611 VALUES LESS THAN ('2026-12-01'),
+    PARTITION p202612 VALUES LESS THAN ('2027-01-01'),
+    PARTITION p202801 VALUES LESS THAN ('2028-02-01'),
+    PARTITION p202702 VALUES LESS THAN ('2027-03-01'),
+    PARTITION p202703 VALUES LESS THAN ('2027-04-01'),
+    PARTITION p202704 VALUES LESS THAN ('2027-05-01'),
+    PARTITION p202705 VALUES LESS THAN ('2027-06-01'),
+    PARTITION p202706 VALUES LESS THAN ('2027-07-01'),
+    PARTITION p202707 VALUES LESS THAN ('2027-08-01'),
+    PARTITION p202708 VALUES LESS THAN ('2027-09-01'),
+    PARTITION p202709 VALUES LESS THAN ('2027-10-01'),
+    PARTITION p202710 VALUES LESS THAN ('2027-11-01'),
+    PARTITION p202711 VALUES LESS THAN ('2027-12-01'),
+    PARTITION p202712 VALUES LESS THAN ('2028-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+-- New monthly partitions are split off pmax ahead of time, e.g.:
+-- ALTER TABLE audit_logs_archive REORGANIZE PARTITION pmax INTO (
+--     PARTITION p202801 VALUES LESS THAN ('2028-02-01'),
+--     PARTITION pmax VALUES LESS THAN (MAXVALUE)
+-- );
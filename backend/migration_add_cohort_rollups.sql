@@ -0,0 +1,28 @@
+-- Migration: Per-doctor cohort counters
+-- Maintained by the API's cohort refresher; fill (or repair) them with
+-- `python -m backend.app.rebuild_cohort_rollups`
+
+CREATE TABLE IF NOT EXISTS doctor_cohort_rollups (
+    doctor_id INT NOT NULL,
+    dimension VARCHAR(30) NOT NULL,
+    bucket VARCHAR(150) NOT NULL,
+    patient_count INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (doctor_id, dimension, bucket)
+);
+
+-- No foreign keys: rows of deleted patients/links must survive until they are subtracted
+CREATE TABLE IF NOT EXISTS patient_cohort_memberships (
+    doctor_id INT NOT NULL,
+    patient_id INT NOT NULL,
+    dimension VARCHAR(30) NOT NULL,
+    bucket VARCHAR(150) NOT NULL,
+    patient_revision INT NOT NULL,
+    refreshed_at DATETIME NOT NULL,
+    PRIMARY KEY (doctor_id, patient_id, dimension, bucket),
+    INDEX idx_patient_cohort_memberships_patient (patient_id, dimension)
+);
+
+-- The refresher also looks up a patient's doctors. On MySQL the index InnoDB created for the
+-- doctor_patient.patient_id foreign key serves that; models/doctor_patient.py declares it for
+-- databases built with create_all.
@@ -0,0 +1,23 @@
+-- Migration: Email outbox
+-- /send-email stores the message here and returns; a background sender delivers it,
+-- retrying with exponential backoff until EMAIL_MAX_ATTEMPTS
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    requested_by VARCHAR(255) NULL,
+    patient_id INT NULL,
+    to_email VARCHAR(255) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    html TEXT NOT NULL,
+    attachment_filename VARCHAR(255) NULL,
+    attachment_content_type VARCHAR(100) NULL,
+    attachment LONGBLOB NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME NOT NULL,
+    last_error TEXT NULL,
+    provider_id VARCHAR(255) NULL,
+    created_at DATETIME NULL,
+    sent_at DATETIME NULL,
+    INDEX idx_email_outbox_status_next (status, next_attempt_at)
+);
@@ -0,0 +1,25 @@
+-- Migration: Secondary indexes for hot query paths
+-- Every request filters these tables by patient, rule lookup key or time; without
+-- these indexes each of those filters is a full table scan.
+-- Index names match the __table_args__ declared on the SQLAlchemy models.
+-- doctor_patient needs nothing extra: its (doctor_id, patient_id) primary key
+-- already serves doctor_id lookups.
+
+-- Per-patient clinical facts
+CREATE INDEX idx_patient_symptom_patient ON patient_symptom(patient_id, symptom_id);
+CREATE INDEX idx_patient_personal_history_patient ON patient_personal_history(patient_id, history_id);
+CREATE INDEX idx_patient_tests_patient_test ON patient_tests(patient_id, test_id, recorded_at);
+-- patient_vital_signs is covered by idx_patient_vital_signs_series (migration_add_vital_signs_numeric_value.sql)
+
+-- Decision rule lookups by (fact id, gender, age group)
+CREATE INDEX idx_symptoms_rules_lookup ON symptoms_decision_rules(symptom_id, gender, age_group);
+CREATE INDEX idx_personal_history_rules_lookup ON personal_history_decision_rules(history_id, gender, age_group);
+CREATE INDEX idx_tests_rules_lookup ON tests_decision_rules(test_id, gender, age_group);
+CREATE INDEX idx_vital_signs_rules_lookup ON vital_signs_decision_rules(vital_id, gender, age_group);
+
+-- Audit trail per patient, most recent first
+CREATE INDEX idx_audit_logs_patient_created ON audit_logs(patient_id, created_at);
+
+-- Calendar queries
+CREATE INDEX idx_appointments_datetime ON appointments(appointment_datetime);
+CREATE INDEX idx_appointments_patient_datetime ON appointments(patient_id, appointment_datetime);
@@ -0,0 +1,44 @@
+-- Migration: Add patient_latest_tests projection table
+-- Holds the newest unresolved patient_tests row per (patient_id, test_id) so reads
+-- don't have to aggregate over the whole test history
+
+CREATE TABLE IF NOT EXISTS patient_latest_tests (
+    patient_id INT NOT NULL,
+    test_id VARCHAR(100) NOT NULL,
+    patient_test_id INT NOT NULL,
+    test_date DATE NULL,
+    result_value VARCHAR(50) NULL,
+    notes TEXT NULL,
+    recorded_at DATETIME NOT NULL,
+
+    PRIMARY KEY (patient_id, test_id),
+
+    CONSTRAINT fk_latest_tests_patient
+        FOREIGN KEY (patient_id)
+        REFERENCES patients(patient_id)
+        ON DELETE CASCADE,
+
+    CONSTRAINT fk_latest_tests_test
+        FOREIGN KEY (test_id)
+        REFERENCES tests_dict(id)
+        ON DELETE CASCADE,
+
+    CONSTRAINT fk_latest_tests_record
+        FOREIGN KEY (patient_test_id)
+        REFERENCES patient_tests(id)
+        ON DELETE CASCADE
+);
+
+-- Backfill from existing history (newest unresolved record per test, ties broken by id)
+INSERT INTO patient_latest_tests (patient_id, test_id, patient_test_id, test_date, result_value, notes, recorded_at)
+SELECT pt.patient_id, pt.test_id, pt.id, pt.test_date, pt.result_value, pt.notes, pt.recorded_at
+FROM patient_tests pt
+WHERE pt.resolved_at IS NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM patient_tests newer
+      WHERE newer.patient_id = pt.patient_id
+        AND newer.test_id = pt.test_id
+        AND newer.resolved_at IS NULL
+        AND (newer.recorded_at > pt.recorded_at
+             OR (newer.recorded_at = pt.recorded_at AND newer.id > pt.id))
+  );
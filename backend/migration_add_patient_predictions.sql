@@ -0,0 +1,25 @@
+-- Migration: Prediction history and incremental rescoring
+-- patient_predictions keeps every score per patient/model for trend views; features_hash lets
+-- the scoring job skip patients whose model inputs haven't changed since their last score
+
+CREATE TABLE IF NOT EXISTS patient_predictions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    patient_id INT NOT NULL,
+    model_name VARCHAR(50) NOT NULL,
+    model_version VARCHAR(20) NOT NULL,
+    probability DOUBLE NOT NULL,
+    prediction INT NOT NULL,
+    source VARCHAR(20) NOT NULL,
+    patient_revision INT NULL,
+    created_at DATETIME NOT NULL,
+    FOREIGN KEY (patient_id) REFERENCES patients(patient_id) ON DELETE CASCADE,
+    INDEX idx_patient_predictions_patient_model_created (patient_id, model_name, created_at)
+);
+
+ALTER TABLE patient_risk_scores
+ADD COLUMN features_hash VARCHAR(16) NULL;
+
+-- Existing scores become history entries, so trends start from the first scoring run
+INSERT INTO patient_predictions (patient_id, model_name, model_version, probability, prediction, source, patient_revision, created_at)
+SELECT patient_id, model_name, model_version, probability, prediction, 'job', patient_revision, scored_at
+FROM patient_risk_scores;
@@ -0,0 +1,6 @@
+-- Migration: Patient revision counter
+-- Incremented whenever a patient or any of their clinical rows change, so derived data
+-- (chat prompt context, reports, scores) can be cached per (patient_id, revision)
+
+ALTER TABLE patients
+ADD COLUMN revision INT NOT NULL DEFAULT 0;
@@ -0,0 +1,15 @@
+-- Migration: Persisted CardioModel scores
+-- One row per (patient, model), refreshed by `python -m backend.app.score_patients`
+
+CREATE TABLE IF NOT EXISTS patient_risk_scores (
+    patient_id INT NOT NULL,
+    model_name VARCHAR(50) NOT NULL,
+    model_version VARCHAR(20) NOT NULL,
+    probability DOUBLE NOT NULL,
+    prediction INT NOT NULL,
+    missing_features VARCHAR(100) NULL,
+    patient_revision INT NOT NULL,
+    scored_at DATETIME NOT NULL,
+    PRIMARY KEY (patient_id, model_name),
+    FOREIGN KEY (patient_id) REFERENCES patients(patient_id) ON DELETE CASCADE
+);
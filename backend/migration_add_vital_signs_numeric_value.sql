@@ -0,0 +1,14 @@
+-- Migration: Typed numeric storage for vital sign readings
+-- Adds a DOUBLE copy of patient_vital_signs.value so rule evaluation and trend
+-- queries don't have to parse the VARCHAR on every read
+
+ALTER TABLE patient_vital_signs
+ADD COLUMN numeric_value DOUBLE NULL;
+
+-- Backfill from existing readings; non-numeric values stay NULL
+UPDATE patient_vital_signs
+SET numeric_value = TRIM(value) + 0
+WHERE TRIM(value) REGEXP '^[-+]?[0-9]*\\.?[0-9]+([eE][-+]?[0-9]+)?$';
+
+-- Time-series lookups: one patient, one vital, ordered/ranged by date
+CREATE INDEX idx_patient_vital_signs_series ON patient_vital_signs(patient_id, vital_sign_id, measurement_date);
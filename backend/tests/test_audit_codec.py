@@ -0,0 +1,31 @@
+import json
+from backend.app.utils.audit_codec import encode_action_details, decode_action_details
+
+def round_trip(details):
+    # Through JSON, as the column stores it
+    return decode_action_details(json.loads(json.dumps(encode_action_details(details))))
+
+def test_known_fields_round_trip():
+    details = {"patient_id": 7, "first_name": "Jane", "phone": None, "extra": "kept"}
+    assert round_trip(details) == details
+
+def test_update_diff_keeps_changed_fields():
+    details = {"old_values": {"weight": 70, "height": 170}, "new_values": {"weight": 72, "height": 170}}
+    assert round_trip(details) == {"old_values": {"weight": 70}, "new_values": {"weight": 72}}
+
+def test_digit_keys_round_trip():
+    details = {"counts": {"3": 1, "99": 2}, "7": "seven", "by_day": {"1": {"0": "x"}}}
+    assert round_trip(details) == details
+
+def test_hash_keys_round_trip():
+    details = {"#3": "a", "##x": "b", "nested": {"#12": None}}
+    assert round_trip(details) == details
+
+def test_large_details_are_compressed():
+    details = {"notes": "x" * 5000, "counts": {"3": 1}}
+    stored = encode_action_details(details)
+    assert "z" in stored
+    assert decode_action_details(stored) == details
+
+def test_rows_without_version_are_returned_unchanged():
+    assert decode_action_details({"3": "legacy"}) == {"3": "legacy"}
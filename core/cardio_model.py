@@ -7,9 +7,16 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
 from sklearn.neighbors import KNeighborsClassifier
+import hashlib
 import joblib
 import os
 
+# Column order the models were trained on (cardio_train.csv without id/cardio)
+FEATURE_NAMES = [
+    "age", "gender", "height", "weight", "ap_hi", "ap_lo",
+    "cholesterol", "gluc", "smoke", "alco", "active"
+]
+
 class CardioModel:
     def __init__(self, model_dir="models"):
         self.scaler = None
@@ -22,6 +29,7 @@ class CardioModel:
         self.model_dir = model_dir
         os.makedirs(model_dir, exist_ok=True)
         self.trained = False
+        self.versions = {}
 
     def load_data(self, file_path, sep=';'):
         """Load and preprocess the dataset."""
@@ -78,9 +86,33 @@ class CardioModel:
                 results[name] = {"prediction": pred, "status": "Disease" if pred == 1 else "Healthy"}
         return results
 
+    def predict_proba_batch(self, X):
+        """
+        Disease probability for every row of X (n x 11, FEATURE_NAMES order):
+        one scaler pass and one predict_proba pass per model. Returns {model name: array}.
+        """
+        if not self.trained:
+            raise ValueError("Model must be trained before prediction.")
+        X_scaled = self.scaler.transform(pd.DataFrame(X, columns=FEATURE_NAMES))
+        return {name: model.predict_proba(X_scaled)[:, 1] for name, model in self.models.items()}
+
     def load_trained_models(self):
         """Load previously trained models."""
         self.scaler = joblib.load(os.path.join(self.model_dir, "scaler.pkl"))
         for name in self.models:
             self.models[name] = joblib.load(os.path.join(self.model_dir, f"{name.replace(' ', '_')}.pkl"))
-        self.trained = True
\ No newline at end of file
+        self.versions = self.model_versions()
+        self.trained = True
+
+    def model_versions(self):
+        """
+        Version of each saved model: a short hash of its pickle plus the shared scaler's,
+        so it changes whenever either is retrained.
+        """
+        with open(os.path.join(self.model_dir, "scaler.pkl"), "rb") as f:
+            scaler_bytes = f.read()
+        versions = {}
+        for name in self.models:
+            with open(os.path.join(self.model_dir, f"{name.replace(' ', '_')}.pkl"), "rb") as f:
+                versions[name] = hashlib.sha256(scaler_bytes + f.read()).hexdigest()[:12]
+        return versions
\ No newline at end of file
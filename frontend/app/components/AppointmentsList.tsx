@@ -82,6 +82,7 @@ export function AppointmentsList() {
                 setError(null);
                 const token = await getAccessTokenSilently();
                 const res = await fetch(`${API}/appointments/today`, {
+                    credentials: 'include',
                     headers: { Authorization: `Bearer ${token}` },
                 });
                 if (!res.ok) throw new Error(await res.text());
@@ -285,31 +285,43 @@ export function AuditLogSection({ patientId, patientName }: AuditLogSectionProps
     const { getAccessTokenSilently } = useAuth0();
     const [logs, setLogs] = useState<AuditLog[]>([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [actionTypeFilter, setActionTypeFilter] = useState<string | null>(null);
     const [entityTypeFilter, setEntityTypeFilter] = useState<string | null>(null);
 
+    // /audit-logs is paginated (newest first); X-Next-Cursor points at the next, older page
+    const fetchPage = async (cursor: string | null) => {
+        const token = await getAccessTokenSilently();
+        const queryParams = new URLSearchParams();
+        queryParams.append('patient_id', patientId);
+        // Events older than AUDIT_HOT_DAYS live in the archive table; the trail must include them
+        queryParams.append('include_archived', 'true');
+        if (actionTypeFilter) queryParams.append('action_type', actionTypeFilter);
+        if (entityTypeFilter) queryParams.append('entity_type', entityTypeFilter);
+        if (cursor) queryParams.append('cursor', cursor);
+
+        const response = await fetch(`${API}/audit-logs?${queryParams.toString()}`, {
+            credentials: 'include',
+            headers: { Authorization: `Bearer ${token}` },
+        });
+
+        if (!response.ok) throw new Error(await response.text());
+
+        const data: AuditLog[] = await response.json();
+        setNextCursor(response.headers.get('X-Next-Cursor'));
+        return data.filter(log => log.action_type !== 'READ');
+    };
+
     useEffect(() => {
         const fetchLogs = async () => {
             setLoading(true);
             try {
-                const token = await getAccessTokenSilently();
-                const queryParams = new URLSearchParams();
-                queryParams.append('patient_id', patientId);
-                if (actionTypeFilter) queryParams.append('action_type', actionTypeFilter);
-                if (entityTypeFilter) queryParams.append('entity_type', entityTypeFilter);
-
-                const response = await fetch(`${API}/audit-logs?${queryParams.toString()}`, {
-                    headers: { Authorization: `Bearer ${token}` },
-                });
-
-                if (!response.ok) throw new Error(await response.text());
-
-                const data: AuditLog[] = await response.json();
-                const filteredData = data.filter(log => log.action_type !== 'READ');
-                setLogs(filteredData);
+                setLogs(await fetchPage(null));
             } catch (err) {
                 console.error('Failed to load audit logs', err);
                 setLogs([]);
+                setNextCursor(null);
             } finally {
                 setLoading(false);
             }
@@ -318,6 +330,19 @@ export function AuditLogSection({ patientId, patientName }: AuditLogSectionProps
         fetchLogs();
     }, [patientId, actionTypeFilter, entityTypeFilter, getAccessTokenSilently]);
 
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const older = await fetchPage(nextCursor);
+            setLogs(previous => [...previous, ...older]);
+        } catch (err) {
+            console.error('Failed to load older audit logs', err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const actionTypes = ['CREATE', 'UPDATE', 'DELETE'];
     const entityTypes = ['PATIENT', 'SYMPTOM', 'VITAL_SIGN', 'TEST', 'PERSONAL_HISTORY', 'APPOINTMENT'];
 
@@ -546,12 +571,24 @@ export function AuditLogSection({ patientId, patientName }: AuditLogSectionProps
                                 <div className="relative flex items-center mt-8">
                                     <div className="absolute left-5 w-3 h-3 rounded-full bg-gray-400 ring-4 ring-gray-100 ring-offset-2 ring-offset-white"></div>
                                     <div className="ml-12">
-                                        <div className="bg-gray-50 rounded-lg p-4 border border-gray-200">
-                                            <p className="text-gray-600 text-sm flex items-center gap-2">
-                                                <Shield className="w-4 h-4" />
-                                                Medical audit trail complete - All events logged securely
-                                            </p>
-                                        </div>
+                                        {nextCursor ? (
+                                            <Button
+                                                variant="outline"
+                                                onClick={loadMore}
+                                                disabled={loadingMore}
+                                                className="border-blue-200 text-blue-600 hover:bg-blue-50"
+                                            >
+                                                {loadingMore && <Loader2 className="w-4 h-4 mr-2 animate-spin" />}
+                                                Load older events
+                                            </Button>
+                                        ) : (
+                                            <div className="bg-gray-50 rounded-lg p-4 border border-gray-200">
+                                                <p className="text-gray-600 text-sm flex items-center gap-2">
+                                                    <Shield className="w-4 h-4" />
+                                                    Medical audit trail complete - All events logged securely
+                                                </p>
+                                            </div>
+                                        )}
                                     </div>
                                 </div>
                             </div>
@@ -93,6 +93,7 @@ export function CreatePatientModal({ open, onClose }: Props) {
       setLoading(true);
       const token = await getAccessTokenSilently();
       const res = await fetch(`${API}/patients`, {
+        credentials: 'include',
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -167,6 +167,7 @@ export function DoctorCalendar() {
                 const endDate = weekDates[6].toISOString().split('T')[0];
                 
                 const res = await fetch(`${API}/appointments/range?start_date=${startDate}&end_date=${endDate}`, {
+                    credentials: 'include',
                     headers: { Authorization: `Bearer ${token}` },
                 });
                 
@@ -83,6 +83,7 @@ export function EmailDialog({ open, onOpenChange, patient, doctorName }: EmailDi
             formData.append('pdf_file', pdfFile);
 
             const res = await fetch(`${API}/send-email`, {
+                credentials: 'include',
                 method: 'POST',
                 headers: {
                     Authorization: `Bearer ${token}`,
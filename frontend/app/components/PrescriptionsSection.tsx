@@ -127,6 +127,7 @@ export function PrescriptionsSection({
         try {
             const token = await getAccessTokenSilently();
             const res = await fetch(`${API}/patient-prescriptions/by-patient/${patientId}`, {
+                credentials: 'include',
                 headers: { Authorization: `Bearer ${token}` },
             });
             if (!res.ok) throw new Error(await res.text());
@@ -142,6 +143,7 @@ export function PrescriptionsSection({
         try {
             const token = await getAccessTokenSilently();
             const res = await fetch(`${API}/patient-prescriptions/history/${patientId}`, {
+                credentials: 'include',
                 headers: { Authorization: `Bearer ${token}` },
             });
             if (!res.ok) throw new Error(await res.text());
@@ -179,6 +181,7 @@ export function PrescriptionsSection({
                 : { ...formData, patient_id: patientId };
 
             const res = await fetch(url, {
+                credentials: 'include',
                 method,
                 headers: {
                     'Content-Type': 'application/json',
@@ -216,6 +219,7 @@ export function PrescriptionsSection({
         try {
             const token = await getAccessTokenSilently();
             const res = await fetch(`${API}/patient-prescriptions/${id}`, {
+                credentials: 'include',
                 method: 'DELETE',
                 headers: { Authorization: `Bearer ${token}` },
             });
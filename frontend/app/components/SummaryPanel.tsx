@@ -351,6 +351,7 @@ export const SummaryPanel = memo(function SummaryPanel({ patient_id, ...data }:
             const token = await getAccessTokenSilently();
             const body = config.updatePayload(label, extra);
             const res = await fetch(`${API}/${config.endpoint}/${id}`, {
+                credentials: 'include',
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json',
@@ -390,6 +391,7 @@ export const SummaryPanel = memo(function SummaryPanel({ patient_id, ...data }:
             
             // Delete directly from the patient-specific table
             const res = await fetch(`${API}/${config.endpoint}/${id}`, {
+                credentials: 'include',
                 method: 'DELETE',
                 headers: {
                     Authorization: `Bearer ${token}`,
@@ -469,6 +471,7 @@ export const SummaryPanel = memo(function SummaryPanel({ patient_id, ...data }:
             const token = await getAccessTokenSilently();
             const body = config.createPayload(label, extra);
             const res = await fetch(`${API}/${config.endpoint}`, {
+                credentials: 'include',
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -539,6 +542,7 @@ export const SummaryPanel = memo(function SummaryPanel({ patient_id, ...data }:
             // Delete all items directly from the patient-specific table
             const deletePromises = currentItems.map(async (item: any) => {
                 return fetch(`${API}/${config.endpoint}/${item.id}`, {
+                    credentials: 'include',
                     method: 'DELETE',
                     headers: {
                         Authorization: `Bearer ${token}`,
@@ -117,6 +117,7 @@ export const SymptomsSection = memo(function SymptomsSection({
                 if (symptomToRemove) {
                     const token = await getAccessTokenSilently();
                     const res = await fetch(`${API}/symptoms/delete/${symptomToRemove.id}`, {
+                        credentials: 'include',
                         method: 'DELETE',
                         headers: { Authorization: `Bearer ${token}` },
                     });
@@ -134,6 +135,7 @@ export const SymptomsSection = memo(function SymptomsSection({
                 // Add symptom
                 const token = await getAccessTokenSilently();
                 const res = await fetch(`${API}/symptoms`, {
+                    credentials: 'include',
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
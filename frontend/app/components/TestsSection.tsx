@@ -98,6 +98,7 @@ export function TestsSection({
 
                 // 1) Fetch test dictionary
                 const dictRes = await fetch(`${API}/tests/dict`, {
+                    credentials: 'include',
                     headers: { Authorization: `Bearer ${token}` },
                 });
                 if (!dictRes.ok) throw new Error(await dictRes.text());
@@ -105,6 +106,7 @@ export function TestsSection({
 
                 // 2) Fetch this patient's recorded tests
                 const patRes = await fetch(`${API}/tests/by-patient/${patientId}`, {
+                    credentials: 'include',
                     headers: { Authorization: `Bearer ${token}` },
                 });
                 const patData: PatientTest[] = patRes.ok ? await patRes.json() : [];
@@ -141,6 +143,7 @@ export function TestsSection({
                 if (newValue === '') {
                     // Delete the record
                     const res = await fetch(`${API}/tests/delete/${existing.id}`, {
+                        credentials: 'include',
                         method: 'DELETE',
                         headers: {
                             Authorization: `Bearer ${token}`,
@@ -163,6 +166,7 @@ export function TestsSection({
                 } else {
                     // Update existing test result
                     const res = await fetch(`${API}/tests/${existing.id}`, {
+                        credentials: 'include',
                         method: 'PUT',
                         headers: {
                             'Content-Type': 'application/json',
@@ -194,6 +198,7 @@ export function TestsSection({
                 // Create a new test record for today
                 const today = new Date().toISOString().split('T')[0];
                 const res = await fetch(`${API}/tests`, {
+                    credentials: 'include',
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
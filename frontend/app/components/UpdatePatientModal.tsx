@@ -81,6 +81,7 @@ export default function UpdatePatientModal({
             };
 
             const res = await fetch(`${API}/patients/${patient.id}`, {
+                credentials: 'include',
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json',
@@ -98,6 +98,7 @@ export function VitalSignsSection({
 
                 // 1) Full dictionary
                 const dictRes = await fetch(`${API}/vital-signs/dict`, {
+                    credentials: 'include',
                     headers: { Authorization: `Bearer ${token}` },
                 });
                 if (!dictRes.ok) throw new Error(await dictRes.text());
@@ -106,7 +107,7 @@ export function VitalSignsSection({
                 // 2) This patient's records
                 const patRes = await fetch(
                     `${API}/vital-signs/by-patient/${patientId}`,
-                    { headers: { Authorization: `Bearer ${token}` } }
+                    { credentials: 'include', headers: { Authorization: `Bearer ${token}` } }
                 );
                 if (!dictRes.ok) throw new Error(await dictRes.text());
                 const patData: PatientVitalSign[] = await patRes.json();
@@ -159,6 +160,7 @@ export function VitalSignsSection({
                 if (val === '') {
                     // DELETE if cleared
                     const res = await fetch(`${API}/vital-signs/delete/${rec.id}`, {
+                        credentials: 'include',
                         method: 'DELETE',
                         headers: {
                             Authorization: `Bearer ${token}`,
@@ -180,6 +182,7 @@ export function VitalSignsSection({
                 } else {
                     // UPDATE existing
                     const res = await fetch(`${API}/vital-signs/${rec.id}`, {
+                        credentials: 'include',
                         method: 'PUT',
                         headers: {
                             'Content-Type': 'application/json',
@@ -207,6 +210,7 @@ export function VitalSignsSection({
                 // CREATE new for today
                 const today = new Date().toISOString().split('T')[0];
                 const res = await fetch(`${API}/vital-signs`, {
+                    credentials: 'include',
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
@@ -275,6 +275,7 @@ export default function PatientPage() {
                         active: fullData.demographics.active || 1
                     };
                     const res = await fetch(`${API}/predict`, {
+                        credentials: 'include',
                         method: 'POST',
                         headers: {
                             'Content-Type': 'application/json',
@@ -327,6 +328,7 @@ export default function PatientPage() {
             setApptLoading(true);
             const token = await getAccessTokenSilently();
             const res = await fetch(`${API}/appointments/by-patient/${patient.id}`, {
+                credentials: 'include',
                 headers: { Authorization: `Bearer ${token}` },
             });
             if (res.ok) setAppointments(await res.json());
@@ -377,6 +379,7 @@ export default function PatientPage() {
             const method = modalMode === 'create' ? 'POST' : 'PUT';
             const body = { patient_id: patient.id, datetime: iso, type: apptType };
             const res = await fetch(url, {
+                credentials: 'include',
                 method,
                 headers: {
                     'Content-Type': 'application/json',
@@ -388,6 +391,7 @@ export default function PatientPage() {
             setModalOpen(false);
             const token2 = await getAccessTokenSilently();
             const r2 = await fetch(`${API}/appointments/by-patient/${patient.id}`, {
+                credentials: 'include',
                 headers: { Authorization: `Bearer ${token2}` },
             });
             if (r2.ok) setAppointments(await r2.json());
@@ -407,6 +411,7 @@ export default function PatientPage() {
             setDeletingAppt(true);
             const token = await getAccessTokenSilently();
             const res = await fetch(`${API}/appointments/${toDeleteId}`, {
+                credentials: 'include',
                 method: 'DELETE',
                 headers: { Authorization: `Bearer ${token}` },
             });
@@ -415,6 +420,7 @@ export default function PatientPage() {
             setToDeleteId(null);
             const token2 = await getAccessTokenSilently();
             const r2 = await fetch(`${API}/appointments/by-patient/${patient.id}`, {
+                credentials: 'include',
                 headers: { Authorization: `Bearer ${token2}` },
             });
             if (r2.ok) setAppointments(await r2.json());
@@ -434,6 +440,7 @@ export default function PatientPage() {
             setSaving(true);
             const token = await getAccessTokenSilently();
             const res = await fetch(`${API}/patients/${patient.id}`, {
+                credentials: 'include',
                 method: 'PUT',
                 headers: {
                     'Content-Type': 'application/json',
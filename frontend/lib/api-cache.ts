@@ -12,6 +12,7 @@ export const useApiRequest = () => {
     try {
       const token = await getAccessTokenSilently();
       const response = await fetch(`${API}${url}`, {
+        credentials: 'include',
         headers: { Authorization: `Bearer ${token}` }
       });
       
@@ -32,6 +33,7 @@ export const useApiRequest = () => {
   const postData = useCallback(async (url: string, data: any) => {
     const token = await getAccessTokenSilently();
     const response = await fetch(`${API}${url}`, {
+      credentials: 'include',
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -50,6 +52,7 @@ export const useApiRequest = () => {
   const putData = useCallback(async (url: string, data: any) => {
     const token = await getAccessTokenSilently();
     const response = await fetch(`${API}${url}`, {
+      credentials: 'include',
       method: 'PUT',
       headers: {
         'Content-Type': 'application/json',
@@ -68,6 +71,7 @@ export const useApiRequest = () => {
   const deleteData = useCallback(async (url: string) => {
     const token = await getAccessTokenSilently();
     const response = await fetch(`${API}${url}`, {
+      credentials: 'include',
       method: 'DELETE',
       headers: { Authorization: `Bearer ${token}` },
     });